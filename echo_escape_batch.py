@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+Echo Escape - Batched Environment
+Steps many independent Echo Escape levels at once for playtesting and agent
+training. Every level lives in struct-of-arrays NumPy form and the rules of
+GameState.step (echo cooldown, interaction, movement and traps) are applied
+to all of them with vectorized operations.
+
+Run directly for a throughput benchmark against stepping separate GameStates,
+optionally after checking that bot games play out the same in both:
+    python3 echo_escape_batch.py --envs 1000 --steps 300 --check 20
+"""
+
+import argparse
+import time
+import numpy as np
+
+from echo_escape_core import (
+    FPS, GRID_SIZE, MAZE_WIDTH, MAZE_HEIGHT, PLAYER_SPEED, PLAYER_HALF_EXTENT, ECHO_COOLDOWN,
+    ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN, ACTION_ECHO,
+    ACTION_INTERACT, GameState)
+
+# Integer object type codes
+TYPE_NONE = 0
+TYPE_SMALL_KEY = 1
+TYPE_CHEST = 2
+TYPE_CODE_PUZZLE = 3
+TYPE_TERMINAL = 4
+TYPE_EXIT = 5
+TRAP_TYPES = ["trap_spike", "trap_laser", "trap_shock", "trap_pit", "trap_gas", "trap_blade", "trap_fire"]
+TYPE_CODES = {"small_key": TYPE_SMALL_KEY, "chest": TYPE_CHEST, "code_puzzle": TYPE_CODE_PUZZLE,
+              "terminal": TYPE_TERMINAL, "exit": TYPE_EXIT}
+for trap_index, trap_name in enumerate(TRAP_TYPES):
+    TYPE_CODES[trap_name] = 10 + trap_index
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+
+# Object flag bits
+FLAG_ACTIVE = 1
+FLAG_COLLECTED = 2
+FLAG_UNLOCKED = 4
+FLAG_TRIGGERED = 8
+
+# Inventory and code bits
+ITEM_SMALL_KEY = 1
+ITEM_DOCUMENT = 2
+ITEM_TOOL = 4
+ITEM_LARGE_KEY = 8
+ALL_ITEMS = ITEM_SMALL_KEY | ITEM_DOCUMENT | ITEM_TOOL | ITEM_LARGE_KEY
+CODE_2048 = 1
+CODE_ECHO = 2
+CODE_NEURAL = 4
+ITEM_NAMES = {ITEM_SMALL_KEY: "small_key", ITEM_DOCUMENT: "document",
+              ITEM_TOOL: "tool", ITEM_LARGE_KEY: "large_key"}
+CODE_NAMES = {CODE_2048: "2048", CODE_ECHO: "ECHO", CODE_NEURAL: "NEURAL"}
+
+# Episode status
+STATUS_PLAYING = 0
+STATUS_DEAD = 1
+STATUS_WON = 2
+
+# Object slots per level: key, 3 chests, 3 puzzles, 3 terminals, 7 traps, exit
+MAX_OBJECTS = 18
+EXIT_SLOT = MAX_OBJECTS - 1
+
+# For each held-codes mask, the code bits still obtainable from a puzzle
+_MISSING_CODES = np.zeros((8, 3), dtype=np.uint8)
+_MISSING_COUNT = np.zeros(8, dtype=np.int64)
+for _held in range(8):
+    _missing = [bit for bit in (CODE_2048, CODE_ECHO, CODE_NEURAL) if not _held & bit]
+    _MISSING_COUNT[_held] = len(_missing)
+    _MISSING_CODES[_held, :len(_missing)] = _missing
+
+
+class BatchedEscapeEnv:
+    """N independent levels held as arrays: maze stack, player positions, object
+    tables and inventory/code bitmasks. step() takes one ACTION_* bitmask per level."""
+    def __init__(self, num_envs, seed=None, step_ms=1000 / FPS):
+        self.num_envs = num_envs
+        self.step_ms = step_ms
+        # Same move per tick and sub-steps as GameState and Player.move
+        self.player_step = PLAYER_SPEED if step_ms == 1000 / FPS else PLAYER_SPEED * step_ms * FPS / 1000
+        self.move_steps = int(self.player_step // PLAYER_HALF_EXTENT) + 1
+        self.rng = np.random.default_rng(seed)
+        self.env_index = np.arange(num_envs)
+
+        self.maze = np.zeros((num_envs, MAZE_HEIGHT, MAZE_WIDTH), dtype=np.uint8)
+        self.player_x = np.zeros(num_envs, dtype=np.float64)
+        self.player_y = np.zeros(num_envs, dtype=np.float64)
+        self.time = np.zeros(num_envs)
+        self.last_echo_time = np.zeros(num_envs)
+        self.echoes_emitted = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+        self.obj_x = np.zeros((num_envs, MAX_OBJECTS), dtype=np.int64)
+        self.obj_y = np.zeros((num_envs, MAX_OBJECTS), dtype=np.int64)
+        self.obj_size = np.zeros((num_envs, MAX_OBJECTS), dtype=np.int64)
+        self.obj_type = np.zeros((num_envs, MAX_OBJECTS), dtype=np.int64)
+        self.obj_flags = np.zeros((num_envs, MAX_OBJECTS), dtype=np.uint8)
+
+        self.inventory = np.zeros(num_envs, dtype=np.uint8)
+        self.codes = np.zeros(num_envs, dtype=np.uint8)
+        self.terminals_solved = np.zeros(num_envs, dtype=np.int64)
+        self.status = np.zeros(num_envs, dtype=np.int8)
+        self.death_type = np.zeros(num_envs, dtype=np.int64)
+
+        # Each level's GameState keeps its random.Random: code puzzles draw from
+        # it and the exit is placed with it when it spawns, in GameState's order
+        self.levels = [None] * num_envs
+        self.exit_spawned = np.zeros(num_envs, dtype=bool)
+
+    def reset(self, seeds=None, env_ids=None):
+        """Generate fresh levels with GameState's generators. env_ids limits the
+        reset to some levels; seeds (one per reset level) makes them reproducible."""
+        env_ids = self.env_index if env_ids is None else np.asarray(env_ids)
+        if seeds is None:
+            seeds = self.rng.integers(0, 2**63, size=len(env_ids))
+
+        for env_id, seed in zip(env_ids.tolist(), list(seeds)):
+            self.load_state(env_id, GameState(seed=int(seed)))
+        return self.status
+
+    def load_state(self, env_id, state):
+        """Copy a freshly reset GameState's level into slot env_id"""
+        state.reset()
+        self.levels[env_id] = state
+
+        self.maze[env_id] = state.wall_mask
+        self.player_x[env_id] = state.player.x
+        self.player_y[env_id] = state.player.y
+        self.time[env_id] = 0
+        self.last_echo_time[env_id] = state.player.last_echo_time
+        self.echoes_emitted[env_id] = 0
+        self.steps[env_id] = 0
+
+        self.obj_flags[env_id] = 0
+        self.obj_type[env_id] = TYPE_NONE
+        for slot, obj in enumerate(state.objects[:EXIT_SLOT]):
+            self.obj_x[env_id, slot] = obj.x
+            self.obj_y[env_id, slot] = obj.y
+            self.obj_size[env_id, slot] = obj.size
+            self.obj_type[env_id, slot] = TYPE_CODES[obj.type]
+            self.obj_flags[env_id, slot] = FLAG_ACTIVE
+
+        self.exit_spawned[env_id] = False
+        self.obj_size[env_id, EXIT_SLOT] = 24
+        self.obj_type[env_id, EXIT_SLOT] = TYPE_EXIT
+
+        self.inventory[env_id] = 0
+        self.codes[env_id] = 0
+        self.terminals_solved[env_id] = 0
+        self.status[env_id] = STATUS_PLAYING
+        self.death_type[env_id] = TYPE_NONE
+
+    def step(self, actions):
+        """Advance every level one tick. Finished levels stay frozen until reset.
+        Returns the per-level status array."""
+        actions = np.asarray(actions)
+        playing = self.status == STATUS_PLAYING
+
+        # Echo cooldown
+        wants_echo = playing & (actions & ACTION_ECHO != 0)
+        echoed = wants_echo & (self.time - self.last_echo_time > ECHO_COOLDOWN)
+        self.last_echo_time[echoed] = self.time[echoed]
+        self.echoes_emitted += echoed
+
+        interacting = np.nonzero(playing & (actions & ACTION_INTERACT != 0))[0]
+        if len(interacting):
+            self.handle_interaction(interacting)
+            playing = self.status == STATUS_PLAYING
+
+        self.move(actions, playing)
+        self.check_traps(playing)
+
+        self.time += self.step_ms
+        self.steps += 1
+        return self.status
+
+    def move(self, actions, playing):
+        """Player.move for every level: slide the collision box along walls, x
+        first, in sub-steps no longer than the box is wide"""
+        step = self.player_step
+        dx = np.where(actions & ACTION_RIGHT, step, np.where(actions & ACTION_LEFT, -step, 0))
+        dy = np.where(actions & ACTION_DOWN, step, np.where(actions & ACTION_UP, -step, 0))
+        dx = np.where(playing, dx, 0)
+        dy = np.where(playing, dy, 0)
+        if self.move_steps > 1:
+            dx = dx / self.move_steps
+            dy = dy / self.move_steps
+        for _ in range(self.move_steps):
+            self.player_x = self.sweep(self.player_x, self.player_y, dx, True)
+            self.player_y = self.sweep(self.player_y, self.player_x, dy, False)
+
+    def sweep(self, position, across, delta, horizontal):
+        """One axis of Player.move. move() keeps delta under the box width, which
+        is shorter than a tile, so the leading edge enters at most one new line
+        of tiles, and the box is narrower than a tile, so it spans at most two
+        tiles along that line."""
+        edge = position + np.where(delta > 0, PLAYER_HALF_EXTENT, -PLAYER_HALF_EXTENT)
+        new_edge = edge + delta
+        forward_line = (-(-edge // GRID_SIZE)).astype(np.int64)
+        backward_line = (edge // GRID_SIZE).astype(np.int64) - 1
+        line = np.where(delta > 0, forward_line, backward_line)
+        enters = np.where(delta > 0, -(-new_edge // GRID_SIZE) > forward_line,
+                          (delta < 0) & (new_edge // GRID_SIZE <= backward_line))
+
+        first = ((across - PLAYER_HALF_EXTENT) // GRID_SIZE).astype(np.int64)
+        last = (-(-(across + PLAYER_HALF_EXTENT) // GRID_SIZE)).astype(np.int64) - 1
+        line_size, across_size = (MAZE_WIDTH, MAZE_HEIGHT) if horizontal else (MAZE_HEIGHT, MAZE_WIDTH)
+        clipped_line = np.clip(line, 0, line_size - 1)
+        blocked = (line < 0) | (line >= line_size)
+        for tiles in (first, last):
+            clipped = np.clip(tiles, 0, across_size - 1)
+            if horizontal:
+                walls = self.maze[self.env_index, clipped, clipped_line]
+            else:
+                walls = self.maze[self.env_index, clipped_line, clipped]
+            blocked |= (walls != 0) | (tiles < 0) | (tiles >= across_size)
+
+        stop = np.where(delta > 0, line * GRID_SIZE - PLAYER_HALF_EXTENT,
+                        (line + 1) * GRID_SIZE + PLAYER_HALF_EXTENT)
+        return np.where(enters & blocked, stop, position + delta)
+
+    def check_traps(self, playing):
+        """check_traps for every level: the first untriggered trap overlapping the
+        player's collision box kills it"""
+        live_traps = ((self.obj_type >= 10) & (self.obj_flags & FLAG_ACTIVE != 0) &
+                      (self.obj_flags & FLAG_TRIGGERED == 0) & playing[:, np.newaxis])
+        trap_left = self.obj_x - self.obj_size // 2
+        trap_top = self.obj_y - self.obj_size // 2
+        player_left = (self.player_x - PLAYER_HALF_EXTENT)[:, np.newaxis]
+        player_top = (self.player_y - PLAYER_HALF_EXTENT)[:, np.newaxis]
+        box = PLAYER_HALF_EXTENT * 2
+
+        hit = (live_traps &
+               (player_left < trap_left + self.obj_size) & (trap_left < player_left + box) &
+               (player_top < trap_top + self.obj_size) & (trap_top < player_top + box))
+        dead = np.nonzero(hit.any(axis=1))[0]
+        if len(dead):
+            slots = hit[dead].argmax(axis=1)
+            self.obj_flags[dead, slots] |= FLAG_TRIGGERED
+            self.status[dead] = STATUS_DEAD
+            self.death_type[dead] = self.obj_type[dead, slots]
+
+    def handle_interaction(self, envs):
+        """handle_interaction for the given levels: act on the first overlapping
+        object that reacts to E, exactly one per level"""
+        flags = self.obj_flags[envs]
+        types = self.obj_type[envs]
+        sizes = self.obj_size[envs]
+        left = self.obj_x[envs] - sizes
+        top = self.obj_y[envs] - sizes
+        player_left = (self.player_x[envs] - 16)[:, np.newaxis]
+        player_top = (self.player_y[envs] - 16)[:, np.newaxis]
+
+        # A code puzzle is passed over, like an object without rules, once every code is held
+        reacts = (((types == TYPE_SMALL_KEY) | (types == TYPE_TERMINAL) | (types == TYPE_EXIT)) |
+                  ((types == TYPE_CHEST) & (flags & FLAG_UNLOCKED == 0)) |
+                  ((types == TYPE_CODE_PUZZLE) & (_MISSING_COUNT[self.codes[envs]] > 0)[:, np.newaxis]))
+        hit = (reacts & (flags & FLAG_ACTIVE != 0) & (flags & FLAG_COLLECTED == 0) &
+               (player_left < left + sizes * 2) & (left < player_left + 32) &
+               (player_top < top + sizes * 2) & (top < player_top + 32))
+        has_hit = hit.any(axis=1)
+        envs = envs[has_hit]
+        slots = hit[has_hit].argmax(axis=1)
+        hit_types = self.obj_type[envs, slots]
+
+        # Small key
+        picked = hit_types == TYPE_SMALL_KEY
+        self.obj_flags[envs[picked], slots[picked]] |= FLAG_COLLECTED
+        self.inventory[envs[picked]] |= ITEM_SMALL_KEY
+
+        # Chests open in sequence: small key -> document -> tool -> large key
+        chest = hit_types == TYPE_CHEST
+        chest_envs, chest_slots = envs[chest], slots[chest]
+        held = self.inventory[chest_envs]
+        first = (held & ITEM_SMALL_KEY != 0) & (held & ITEM_DOCUMENT == 0)
+        second = ~first & (held & ITEM_DOCUMENT != 0) & (held & ITEM_TOOL == 0)
+        third = ~first & ~second & (held & ITEM_TOOL != 0) & (held & ITEM_LARGE_KEY == 0)
+        opened = first | second | third
+        self.obj_flags[chest_envs[opened], chest_slots[opened]] |= FLAG_UNLOCKED
+        reward = np.where(first, ITEM_DOCUMENT, np.where(second, ITEM_TOOL, ITEM_LARGE_KEY))
+        self.inventory[chest_envs[opened]] |= reward[opened].astype(np.uint8)
+
+        # Code puzzles reveal a random code that is not currently held, drawn
+        # from the level's RNG the way Progression.apply draws it
+        puzzle = hit_types == TYPE_CODE_PUZZLE
+        puzzle_envs = envs[puzzle]
+        for env_id in puzzle_envs.tolist():
+            held_codes = self.codes[env_id]
+            missing = _MISSING_CODES[held_codes, :_MISSING_COUNT[held_codes]].tolist()
+            self.codes[env_id] |= self.levels[env_id].rng.choice(missing)
+        self.obj_flags[puzzle_envs, slots[puzzle]] |= FLAG_COLLECTED
+
+        # Terminals: 2048 alone, ECHO + document, NEURAL + large key
+        terminal = hit_types == TYPE_TERMINAL
+        term_envs, term_slots = envs[terminal], slots[terminal]
+        codes = self.codes[term_envs]
+        held = self.inventory[term_envs]
+        use_2048 = codes & CODE_2048 != 0
+        use_echo = ~use_2048 & (codes & CODE_ECHO != 0) & (held & ITEM_DOCUMENT != 0)
+        use_neural = ~use_2048 & ~use_echo & (codes & CODE_NEURAL != 0) & (held & ITEM_LARGE_KEY != 0)
+        solved = use_2048 | use_echo | use_neural
+        used_code = np.where(use_2048, CODE_2048, np.where(use_echo, CODE_ECHO, CODE_NEURAL)).astype(np.uint8)
+        solved_envs = term_envs[solved]
+        self.obj_flags[solved_envs, term_slots[solved]] |= FLAG_COLLECTED
+        self.terminals_solved[solved_envs] += 1
+        self.codes[solved_envs] &= ~used_code[solved]
+        if len(solved_envs):
+            self.spawn_exits(solved_envs)
+
+        # Exit
+        self.status[envs[hit_types == TYPE_EXIT]] = STATUS_WON
+
+    def spawn_exits(self, envs):
+        """check_all_requirements_met + spawn_exit_with_message for the given levels"""
+        chests_opened = ((self.obj_type[envs] == TYPE_CHEST) &
+                         (self.obj_flags[envs] & FLAG_UNLOCKED != 0)).sum(axis=1)
+        ready = ((self.terminals_solved[envs] >= 3) & (self.inventory[envs] == ALL_ITEMS) &
+                 (chests_opened >= 3) & (self.codes[envs] == 0))
+        ready_envs = envs[ready]
+        self.exit_spawned[ready_envs] = True
+        for env_id in ready_envs.tolist():
+            # Same placer and RNG state as spawn_exit_with_message; object
+            # positions never change, so the placer sees the same level
+            position = self.levels[env_id].find_valid_position()
+            if position:
+                self.obj_x[env_id, EXIT_SLOT], self.obj_y[env_id, EXIT_SLOT] = position
+                self.obj_flags[env_id, EXIT_SLOT] = FLAG_ACTIVE
+
+
+def random_actions(rng, num_envs, steps):
+    """Random movement with occasional echo and interaction presses"""
+    actions = rng.integers(0, 16, size=(steps, num_envs))
+    actions |= np.where(rng.random((steps, num_envs)) < 0.05, ACTION_ECHO, 0)
+    actions |= np.where(rng.random((steps, num_envs)) < 0.2, ACTION_INTERACT, 0)
+    return actions
+
+
+def benchmark(num_envs, steps, seed=0):
+    """Time stepping num_envs levels for steps ticks, batched and one GameState at a
+    time (the rules Game runs each frame), with the same random action stream"""
+    rng = np.random.default_rng(seed)
+    actions = random_actions(rng, num_envs, steps)
+    level_seeds = rng.integers(0, 2**63, size=num_envs)
+
+    env = BatchedEscapeEnv(num_envs, seed=seed)
+    env.reset(seeds=level_seeds)
+    start = time.perf_counter()
+    for tick in range(steps):
+        env.step(actions[tick])
+    batched_time = time.perf_counter() - start
+
+    states = []
+    for level_seed in level_seeds.tolist():
+        state = GameState(seed=level_seed)
+        state.reset()
+        states.append(state)
+    action_lists = actions.tolist()
+    start = time.perf_counter()
+    for tick in range(steps):
+        for state, action in zip(states, action_lists[tick]):
+            state.step(action)
+    separate_time = time.perf_counter() - start
+
+    total = num_envs * steps
+    return {
+        "envs": num_envs,
+        "steps": steps,
+        "batched_steps_per_sec": total / batched_time,
+        "separate_steps_per_sec": total / separate_time,
+        "speedup": separate_time / batched_time,
+    }
+
+
+def state_status(state):
+    return STATUS_WON if state.game_won else STATUS_DEAD if state.game_over else STATUS_PLAYING
+
+
+def compare_with_states(level_seeds, policy, max_steps=3000, step_ms=1000 / FPS):
+    """Play every seeded level as a GameState driven by policy (anything with
+    reset(state) and act(state), such as EscapeBot), replay the same actions in
+    one batch and return the first (seed, step, what) where they part ways in
+    each level that does; an empty list means the batch matched throughout"""
+    trajectories = []
+    for level_seed in level_seeds:
+        state = GameState(seed=level_seed, step_ms=step_ms)
+        state.reset()
+        policy.reset(state)
+        actions, trajectory = [], []
+        while state.steps < max_steps and not state.game_over and not state.game_won:
+            action = policy.act(state)
+            state.step(action)
+            actions.append(action)
+            trajectory.append((state.player.x, state.player.y, state_status(state)))
+        trajectories.append((actions, trajectory))
+
+    env = BatchedEscapeEnv(len(level_seeds), step_ms=step_ms)
+    env.reset(seeds=level_seeds)
+    longest = max(len(actions) for actions, _ in trajectories)
+    mismatches = {}
+    for tick in range(longest):
+        env.step([actions[tick] if tick < len(actions) else ACTION_NONE for actions, _ in trajectories])
+        for env_id, (_, trajectory) in enumerate(trajectories):
+            if tick >= len(trajectory) or env_id in mismatches:
+                continue
+            x, y, status = trajectory[tick]
+            if (env.player_x[env_id], env.player_y[env_id]) != (x, y):
+                mismatches[env_id] = (tick, f"player at {env.player_x[env_id]:.1f},{env.player_y[env_id]:.1f} "
+                                            f"instead of {x:.1f},{y:.1f}")
+            elif env.status[env_id] != status:
+                mismatches[env_id] = (tick, f"status {env.status[env_id]} instead of {status}")
+    return [(level_seeds[env_id], tick, what) for env_id, (tick, what) in sorted(mismatches.items())]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched Echo Escape environment")
+    parser.add_argument("--envs", type=int, default=1000, help="number of levels stepped together")
+    parser.add_argument("--steps", type=int, default=300, help="ticks to step each level")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", type=int, default=0, metavar="LEVELS",
+                        help="first replay the autoplayer on this many seeded levels and "
+                             "compare the batch with GameState")
+    args = parser.parse_args()
+
+    if args.check:
+        from echo_escape_bot import EscapeBot
+        mismatches = compare_with_states(list(range(args.seed, args.seed + args.check)), EscapeBot())
+        for level_seed, tick, what in mismatches:
+            print(f"Seed {level_seed} step {tick}: {what}")
+        print(f"Bot replay: {args.check - len(mismatches)}/{args.check} levels match GameState")
+
+    result = benchmark(args.envs, args.steps, args.seed)
+    print(f"{result['envs']} levels x {result['steps']} steps")
+    print(f"Batched:  {result['batched_steps_per_sec']:,.0f} level-steps/s")
+    print(f"Separate: {result['separate_steps_per_sec']:,.0f} level-steps/s")
+    print(f"Speedup:  {result['speedup']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
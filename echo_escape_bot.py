@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Echo Escape - Autoplayer
+A bot that plays a level end to end: small key, chests, code puzzles,
+terminals, then the exit. It follows the flow fields of the state's shared
+NavigationService and steers around traps once an echo has revealed them. It
+only reads GameState and returns ACTION_* bitmasks, so it can play headless or
+through Game.run.
+"""
+
+from echo_escape_core import (
+    GRID_SIZE, ECHO_COOLDOWN,
+    ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN, ACTION_ECHO, ACTION_INTERACT)
+
+
+def cell_of(x, y):
+    return int(x // GRID_SIZE), int(y // GRID_SIZE)
+
+
+def cell_center(cell):
+    return cell[0] * GRID_SIZE + GRID_SIZE // 2, cell[1] * GRID_SIZE + GRID_SIZE // 2
+
+
+class EscapeBot:
+    """Follows the key -> chests -> code puzzles -> terminals -> exit progression.
+    Objective positions are known from the start; traps are only avoided once a
+    ping has shown them, unless omniscient is set. Paths are cached and replanned
+    only when the goal changes or a newly seen trap lies on the remaining path."""
+    def __init__(self, omniscient=False, echo=True):
+        self.omniscient = omniscient
+        self.echo = echo
+        self.objects = None
+
+    def reset(self, state, rng=None):
+        self.objects = state.objects
+        self.known_traps = set()
+        self.goal = None
+        self.path = None
+        self.replans = 0
+
+    def update_known_traps(self, state):
+        """Remember traps that are lit by an active ping or were seen by an old one"""
+        new_trap = False
+        for obj in state.objects:
+            if not obj.type.startswith("trap_") or obj.triggered:
+                continue
+            cell = cell_of(obj.x, obj.y)
+            if cell in self.known_traps:
+                continue
+            if (self.omniscient or state.echo_visibility[cell[1], cell[0]] or
+                    state.memory_last_seen[cell[1], cell[0]] >= 0):
+                self.known_traps.add(cell)
+                new_trap = True
+        return new_trap
+
+    def plan(self, state, start):
+        """Follow the objective flow field to the nearest reachable target and
+        cache the path to it"""
+        field = state.navigation.objective_field(self.known_traps)
+        path = field.path(start)
+        if path is None:
+            self.goal = None
+            self.path = None
+            return
+        
+        goal_cell = path[-1] if path else start
+        self.goal = next(obj for obj in state.navigation.objective_targets()
+                         if cell_of(obj.x, obj.y) == goal_cell)
+        # Walk back to the current cell's center first if between cells
+        if (state.player.x, state.player.y) != cell_center(start):
+            path.insert(0, start)
+        self.path = path
+        self.replans += 1
+
+    def act(self, state):
+        """Choose this tick's ACTION_* bitmask"""
+        if state.objects is not self.objects:
+            self.reset(state)
+        if state.game_over or state.game_won:
+            return ACTION_NONE
+
+        player = state.player
+        start = cell_of(player.x, player.y)
+        new_trap = self.update_known_traps(state)
+
+        if self.goal not in state.navigation.objective_targets():
+            self.plan(state, start)
+        elif new_trap and any(cell in self.known_traps for cell in self.path):
+            self.plan(state, start)
+
+        action = ACTION_NONE
+        if self.echo and state.now() - player.last_echo_time > ECHO_COOLDOWN:
+            action |= ACTION_ECHO
+        if self.goal is None:
+            return action
+
+        # Press E once the player box overlaps the goal's interaction box
+        if (abs(player.x - self.goal.x) < 16 + self.goal.size and
+                abs(player.y - self.goal.y) < 16 + self.goal.size):
+            return action | ACTION_INTERACT
+
+        # Waypoints are cell centers one cell apart, so every leg is a straight
+        # line and the player's center never cuts a wall corner
+        if self.path and (player.x, player.y) == cell_center(self.path[0]):
+            self.path.pop(0)
+        if not self.path:
+            return action
+        target_x, target_y = cell_center(self.path[0])
+
+        if player.x != target_x:
+            action |= ACTION_RIGHT if target_x > player.x else ACTION_LEFT
+        elif player.y != target_y:
+            action |= ACTION_DOWN if target_y > player.y else ACTION_UP
+
+        return action
@@ -0,0 +1,1077 @@
+"""
+Echo Escape - Simulation Core
+Game rules without any pygame dependency: maze, objects, inventory, codes,
+terminals, traps and echo timing. The pygame front end in echo_escape_main
+renders a GameState; headless tools step it directly.
+"""
+
+import random
+import math
+from collections import deque
+import numpy as np
+
+from echo_escape_progression import DEFAULT_PROGRESSION, Progression
+
+# Constants
+SCREEN_WIDTH = 1024
+SCREEN_HEIGHT = 768
+FPS = 60
+
+# Enhanced Colors (Tech-noir palette with more depth)
+BLACK = (0, 0, 0)
+DARK_GRAY = (15, 15, 20)
+DARKER_GRAY = (8, 8, 12)
+CYAN = (0, 255, 255)
+NEON_GREEN = (57, 255, 20)
+NEON_BLUE = (0, 191, 255)
+NEON_PINK = (255, 20, 147)
+NEON_PURPLE = (138, 43, 226)
+WHITE = (255, 255, 255)
+GRAY = (128, 128, 128)
+RED = (255, 0, 0)
+GOLD = (255, 215, 0)
+SILVER = (192, 192, 192)
+
+# Game settings
+GRID_SIZE = 32
+MAZE_WIDTH = SCREEN_WIDTH // GRID_SIZE
+MAZE_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
+ECHO_RADIUS = 150
+ECHO_DURATION = 2000  # milliseconds
+PLAYER_SPEED = 4  # pixels per 1/FPS second
+PLAYER_HALF_EXTENT = 12  # Half width of the player's collision box, for walls and traps
+ECHO_COOLDOWN = 500  # milliseconds between pings
+ECHO_WAVE_SPEED = 0.4  # pixels per millisecond the echo ring travels
+ECHO_EDGE_FLASH = 150  # milliseconds a cell stays highlighted after the ring passes
+
+# Safety indicator ranges in pixels from the player to a trap the echo revealed
+DANGER_RANGE = 60
+CAUTION_RANGE = 120
+
+# Minimum distance in pixels a newly placed object keeps from already placed
+# objects, by placement class ("trap" for every trap type, else the type name;
+# "*" means any class). Classes without an entry only need a free cell.
+PLACEMENT_SPACING = {
+    "trap": {"trap": 100},
+    "exit": {"*": 64},
+}
+
+# Object type codes used by the typed object store, filled by register_object_type
+OBJECT_TYPES = []
+OBJECT_TYPE_CODES = {}
+TRAP_TYPE_MASK = np.zeros(0, dtype=bool)  # Indexed by type code
+LABEL_HANDLERS = []  # Indexed by type code
+
+# Object flag bits
+OBJECT_COLLECTED = 1
+OBJECT_UNLOCKED = 2
+OBJECT_TRIGGERED = 4
+
+# Actions accepted by GameState.step, combined as a bitmask
+ACTION_NONE = 0
+ACTION_LEFT = 1
+ACTION_RIGHT = 2
+ACTION_UP = 4
+ACTION_DOWN = 8
+ACTION_ECHO = 16
+ACTION_INTERACT = 32
+
+# 4-way moves on the maze grid as (column, row) offsets
+NEIGHBOURS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+# Pixel centers of every maze cell, shared by the per-ping distance fields
+CELL_CENTER_X, CELL_CENTER_Y = np.meshgrid(
+    np.arange(MAZE_WIDTH) * GRID_SIZE + GRID_SIZE // 2,
+    np.arange(MAZE_HEIGHT) * GRID_SIZE + GRID_SIZE // 2)
+
+def ray_reaches_cell(maze, start_x, start_y, end_x, end_y):
+    """Walk the grid cells on the segment start->end (DDA) and report whether
+    the end cell is reached before any wall cell blocks the ray"""
+    cell_x, cell_y = int(start_x // GRID_SIZE), int(start_y // GRID_SIZE)
+    target_x, target_y = int(end_x // GRID_SIZE), int(end_y // GRID_SIZE)
+    dx = end_x - start_x
+    dy = end_y - start_y
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    
+    # Ray parameter (0..1) at which the next vertical / horizontal grid line is crossed
+    if dx != 0:
+        next_boundary = (cell_x + 1) * GRID_SIZE if dx > 0 else cell_x * GRID_SIZE
+        t_max_x = (next_boundary - start_x) / dx
+        t_delta_x = GRID_SIZE / abs(dx)
+    else:
+        t_max_x = t_delta_x = math.inf
+    if dy != 0:
+        next_boundary = (cell_y + 1) * GRID_SIZE if dy > 0 else cell_y * GRID_SIZE
+        t_max_y = (next_boundary - start_y) / dy
+        t_delta_y = GRID_SIZE / abs(dy)
+    else:
+        t_max_y = t_delta_y = math.inf
+    
+    for _ in range(abs(target_x - cell_x) + abs(target_y - cell_y)):
+        if t_max_x < t_max_y:
+            cell_x += step_x
+            t_max_x += t_delta_x
+        else:
+            cell_y += step_y
+            t_max_y += t_delta_y
+        
+        if cell_x == target_x and cell_y == target_y:
+            return True
+        if maze[cell_y][cell_x] == 1:
+            return False
+    
+    return True
+
+def compute_visibility_mask(maze, origin_x, origin_y, radius):
+    """Return a (MAZE_HEIGHT, MAZE_WIDTH) bool array of the cells an echo emitted at
+    the origin can reach: cell center within radius and not hidden behind a wall"""
+    visible = np.zeros((MAZE_HEIGHT, MAZE_WIDTH), dtype=bool)
+    min_x = max(0, int((origin_x - radius) // GRID_SIZE))
+    max_x = min(MAZE_WIDTH - 1, int((origin_x + radius) // GRID_SIZE))
+    min_y = max(0, int((origin_y - radius) // GRID_SIZE))
+    max_y = min(MAZE_HEIGHT - 1, int((origin_y + radius) // GRID_SIZE))
+    
+    for y in range(min_y, max_y + 1):
+        for x in range(min_x, max_x + 1):
+            cell_center_x = x * GRID_SIZE + GRID_SIZE // 2
+            cell_center_y = y * GRID_SIZE + GRID_SIZE // 2
+            if math.sqrt((cell_center_x - origin_x)**2 + (cell_center_y - origin_y)**2) > radius:
+                continue
+            if ray_reaches_cell(maze, origin_x, origin_y, cell_center_x, cell_center_y):
+                visible[y, x] = True
+    
+    return visible
+
+def compute_echo_reveal_times(visibility, origin_x, origin_y):
+    """Per-cell time (ms after the ping) at which the echo ring reaches each cell.
+    Cells the echo cannot reach get infinity. Also returns the distance falloff."""
+    distance = np.hypot(CELL_CENTER_X - origin_x, CELL_CENTER_Y - origin_y)
+    reveal_times = np.where(visibility, distance / ECHO_WAVE_SPEED, np.inf)
+    distance_factor = np.clip(1 - distance / ECHO_RADIUS, 0.0, 1.0)
+    return reveal_times, distance_factor
+
+def rects_overlap(ax, ay, aw, ah, bx, by, bw, bh):
+    """Axis-aligned rectangle overlap with the same edge rules as pygame.Rect.colliderect"""
+    return (aw > 0 and ah > 0 and bw > 0 and bh > 0 and
+            ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah)
+
+class EchoPing:
+    """One echo emission. Its origin is fixed for the whole ECHO_DURATION, so the
+    visibility and reveal-time arrays are computed once and reused every frame."""
+    def __init__(self, maze, origin_x, origin_y, start_time):
+        self.center = (origin_x, origin_y)
+        self.start_time = start_time
+        self.visibility = compute_visibility_mask(maze, origin_x, origin_y, ECHO_RADIUS)
+        self.reveal_times, self.distance_factor = compute_echo_reveal_times(
+            self.visibility, origin_x, origin_y)
+
+def tiles_blocked(maze, line, first, last, vertical):
+    """Whether any tile from first to last along one grid line is a wall or off
+    the grid. vertical: line is a column and first..last are rows; otherwise
+    line is a row and first..last are columns."""
+    if vertical:
+        if not 0 <= line < MAZE_WIDTH:
+            return True
+        for row in range(first, last + 1):
+            if not 0 <= row < MAZE_HEIGHT or maze[row][line]:
+                return True
+    else:
+        if not 0 <= line < MAZE_HEIGHT:
+            return True
+        tiles = maze[line]
+        for column in range(first, last + 1):
+            if not 0 <= column < MAZE_WIDTH or tiles[column]:
+                return True
+    return False
+
+class Player:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.size = 16
+        self.last_echo_time = 0
+        
+    def move(self, dx, dy, maze):
+        """Move the collision box by (dx, dy), sliding along walls. x and y are
+        resolved separately, so a blocked axis does not stop the other one, and
+        moves longer than the box are cut into sub-steps so diagonal moves cannot
+        cut wall corners. Each axis sweep checks every tile the leading edge
+        passes, so no wall is skipped at any speed."""
+        steps = int(max(abs(dx), abs(dy)) // PLAYER_HALF_EXTENT) + 1
+        if steps > 1:
+            dx /= steps
+            dy /= steps
+        for _ in range(steps):
+            if dx:
+                self.sweep_x(dx, maze)
+            if dy:
+                self.sweep_y(dy, maze)
+    
+    def sweep_x(self, dx, maze):
+        half = PLAYER_HALF_EXTENT
+        top_row = int((self.y - half) // GRID_SIZE)
+        bottom_row = int(-(-(self.y + half) // GRID_SIZE)) - 1
+        if dx > 0:
+            # Columns the right edge enters, nearest first
+            for column in range(int(-(-(self.x + half) // GRID_SIZE)), int(-(-(self.x + half + dx) // GRID_SIZE))):
+                if tiles_blocked(maze, column, top_row, bottom_row, True):
+                    self.x = column * GRID_SIZE - half
+                    return
+        else:
+            for column in range(int((self.x - half) // GRID_SIZE) - 1, int((self.x - half + dx) // GRID_SIZE) - 1, -1):
+                if tiles_blocked(maze, column, top_row, bottom_row, True):
+                    self.x = (column + 1) * GRID_SIZE + half
+                    return
+        self.x += dx
+    
+    def sweep_y(self, dy, maze):
+        half = PLAYER_HALF_EXTENT
+        left_column = int((self.x - half) // GRID_SIZE)
+        right_column = int(-(-(self.x + half) // GRID_SIZE)) - 1
+        if dy > 0:
+            for row in range(int(-(-(self.y + half) // GRID_SIZE)), int(-(-(self.y + half + dy) // GRID_SIZE))):
+                if tiles_blocked(maze, row, left_column, right_column, False):
+                    self.y = row * GRID_SIZE - half
+                    return
+        else:
+            for row in range(int((self.y - half) // GRID_SIZE) - 1, int((self.y - half + dy) // GRID_SIZE) - 1, -1):
+                if tiles_blocked(maze, row, left_column, right_column, False):
+                    self.y = (row + 1) * GRID_SIZE + half
+                    return
+        self.y += dy
+    
+    def emit_echo(self, current_time):
+        if current_time - self.last_echo_time > ECHO_COOLDOWN:  # Cooldown
+            self.last_echo_time = current_time
+            return True
+        return False
+
+def store_field(name):
+    """Property reading and writing one element of an ObjectStore array"""
+    def get(self):
+        return getattr(self.store, name)[self.index].item()
+    def set(self, value):
+        getattr(self.store, name)[self.index] = value
+    return property(get, set)
+
+def store_flag(bit):
+    """Boolean property backed by one bit of the ObjectStore flags array"""
+    def get(self):
+        return bool(self.store.flags[self.index] & bit)
+    def set(self, value):
+        if value:
+            self.store.flags[self.index] |= bit
+        else:
+            self.store.flags[self.index] &= ~bit
+        self.store.revision += 1
+    return property(get, set)
+
+class GameObject:
+    """Thin view of one object in an ObjectStore. Attributes read and write the
+    store's arrays, so call sites keep using obj.x, obj.type, obj.collected, ..."""
+    __slots__ = ("store", "index")
+    
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+    
+    def __eq__(self, other):
+        return isinstance(other, GameObject) and self.store is other.store and self.index == other.index
+    
+    def __hash__(self):
+        return hash((id(self.store), self.index))
+    
+    x = store_field("x")
+    y = store_field("y")
+    size = store_field("size")
+    pulse_time = store_field("pulse_time")
+    collected = store_flag(OBJECT_COLLECTED)
+    unlocked = store_flag(OBJECT_UNLOCKED)
+    triggered = store_flag(OBJECT_TRIGGERED)  # For traps
+    
+    @property
+    def type(self):
+        return OBJECT_TYPES[self.store.type_code[self.index]]
+    
+    @property
+    def color(self):
+        return tuple(self.store.color[self.index].tolist())
+        
+    def get_label(self, game_inventory=None, game_codes=None):
+        return LABEL_HANDLERS[self.store.type_code[self.index]].text(self, game_inventory, game_codes)
+
+class StaticLabel:
+    """Label text that never changes"""
+    def __init__(self, label):
+        self.label = label
+    
+    def text(self, obj, inventory, codes):
+        return self.label
+
+class ChestLabel:
+    def text(self, obj, inventory, codes):
+        if obj.unlocked:
+            return "Open Chest - Already looted"
+        else:
+            if not inventory:
+                return "Locked Chest - Need small key"
+            elif "small_key" in inventory and "document" not in inventory:
+                return "Locked Chest - Use small key to open"
+            elif "document" in inventory and "tool" not in inventory:
+                return "Locked Chest - Use document to open"
+            elif "tool" in inventory and "large_key" not in inventory:
+                return "Locked Chest - Use tool to open"
+            else:
+                return "Locked Chest - Need correct item"
+
+class TerminalLabel:
+    def text(self, obj, inventory, codes):
+        if not codes:
+            return "Terminal - Need code from puzzle"
+        elif "2048" in codes:
+            return "Terminal - Use code 2048"
+        elif "ECHO" in codes:
+            if "document" in inventory:
+                return "Terminal - Use code ECHO + document"
+            else:
+                return "Terminal - Need code ECHO + document"
+        elif "NEURAL" in codes:
+            if "large_key" in inventory:
+                return "Terminal - Use code NEURAL + large key"
+            else:
+                return "Terminal - Need code NEURAL + large key"
+        else:
+            return "Terminal - Need correct code + items"
+
+class TrapLabel:
+    """Traps are only named once they have gone off"""
+    def __init__(self, name):
+        self.name = name
+    
+    def text(self, obj, inventory, codes):
+        return self.name if obj.triggered else ""
+
+def register_object_type(name, label=None, trap=False):
+    """Add an object kind and return its type code. Existing kinds keep their
+    codes, so new kinds cost nothing for the ones already registered."""
+    global TRAP_TYPE_MASK
+    if name in OBJECT_TYPE_CODES:
+        raise ValueError(f"Object type {name} is already registered")
+    code = len(OBJECT_TYPES)
+    OBJECT_TYPES.append(name)
+    OBJECT_TYPE_CODES[name] = code
+    TRAP_TYPE_MASK = np.append(TRAP_TYPE_MASK, trap)
+    LABEL_HANDLERS.append(label or StaticLabel(""))
+    return code
+
+register_object_type("small_key", StaticLabel("Small Key - Use to open first chest"))
+register_object_type("large_key", StaticLabel("Large Key - Needed for Terminal 3"))
+register_object_type("document", StaticLabel("Document - Needed for Terminal 2"))
+register_object_type("tool", StaticLabel("Tool - Use to open third chest"))
+register_object_type("chest", ChestLabel())
+register_object_type("code_puzzle", StaticLabel("Code Puzzle - Interact to reveal terminal code"))
+register_object_type("terminal", TerminalLabel())
+register_object_type("exit", StaticLabel("EXIT - Escape to victory!"))
+register_object_type("trap_spike", TrapLabel("Spike Trap"), trap=True)
+register_object_type("trap_laser", TrapLabel("Laser Grid"), trap=True)
+register_object_type("trap_shock", TrapLabel("Electric Trap"), trap=True)
+register_object_type("trap_pit", TrapLabel("Pit Trap"), trap=True)
+register_object_type("trap_gas", TrapLabel("Gas Trap"), trap=True)
+register_object_type("trap_blade", TrapLabel("Blade Trap"), trap=True)
+register_object_type("trap_fire", TrapLabel("Fire Trap"), trap=True)
+
+class ObjectStore:
+    """All objects of one level in typed arrays: positions, type codes, sizes,
+    colors and collected/unlocked/triggered bit flags. It behaves like the list
+    it replaces: iteration and indexing yield view objects in insertion order.
+    Views are made on demand and compare equal when they point at the same
+    object, so nothing per object lives outside the arrays. Per-frame queries
+    work on the arrays directly. revision goes up whenever an object is added
+    or a flag changes, so caches can tell when to refresh."""
+    def __init__(self, view_class=GameObject, capacity=32):
+        self.view_class = view_class
+        self.count = 0
+        self.revision = 0
+        self.allocate(capacity)
+    
+    def allocate(self, capacity):
+        """Grow the arrays to capacity, keeping existing objects"""
+        count = self.count
+        old = getattr(self, "x", None)
+        fields = {
+            "x": np.zeros(capacity, dtype=np.int32),
+            "y": np.zeros(capacity, dtype=np.int32),
+            "size": np.zeros(capacity, dtype=np.int16),
+            "type_code": np.zeros(capacity, dtype=np.int8),
+            "flags": np.zeros(capacity, dtype=np.uint8),
+            "color": np.zeros((capacity, 3), dtype=np.uint8),
+            "pulse_time": np.zeros(capacity),
+        }
+        for name, array in fields.items():
+            if old is not None:
+                array[:count] = getattr(self, name)[:count]
+            setattr(self, name, array)
+        self.capacity = capacity
+    
+    def add(self, x, y, obj_type, color, size=12):
+        """Append an object and return its view"""
+        index = self.count
+        if index == self.capacity:
+            self.allocate(self.capacity * 2)
+        self.x[index] = x
+        self.y[index] = y
+        self.size[index] = size
+        self.type_code[index] = OBJECT_TYPE_CODES[obj_type]
+        self.flags[index] = 0
+        self.color[index] = color
+        self.pulse_time[index] = 0
+        self.count += 1
+        self.revision += 1
+        return self.view_class(self, index)
+    
+    def __len__(self):
+        return self.count
+    
+    def __iter__(self):
+        view_class = self.view_class
+        return (view_class(self, index) for index in range(self.count))
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.view_class(self, i) for i in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("object index out of range")
+        return self.view_class(self, int(index))
+    
+    def distances(self, x, y):
+        """Euclidean distance from (x, y) to every object"""
+        count = self.count
+        return np.hypot(self.x[:count] - x, self.y[:count] - y)
+    
+    def cells(self):
+        """Grid (row, column) index arrays of every object's cell"""
+        count = self.count
+        return self.y[:count] // GRID_SIZE, self.x[:count] // GRID_SIZE
+    
+    def live_traps(self):
+        """Mask of traps that have not been triggered"""
+        count = self.count
+        return TRAP_TYPE_MASK[self.type_code[:count]] & (self.flags[:count] & OBJECT_TRIGGERED == 0)
+
+def placement_class(obj_type):
+    return "trap" if TRAP_TYPE_MASK[OBJECT_TYPE_CODES[obj_type]] else obj_type
+
+class PoissonPlacer:
+    """Poisson-disk placement over a set of candidate cell centers.
+    
+    Candidates are shuffled once. Placed points are hashed into a grid of
+    buckets as wide as the largest spacing, so a spacing check only looks at
+    the 3x3 neighbouring buckets. Every placement class keeps a cursor into
+    the shuffled candidates: a candidate rejected for a class stays rejected
+    (points are only ever added), so the cursor never moves back. Placement
+    therefore scans each candidate at most once per class, which keeps it
+    linear in the level size and guarantees a position is found whenever one
+    exists."""
+    def __init__(self, candidates, rng, spacing=PLACEMENT_SPACING):
+        self.candidates = list(candidates)
+        rng.shuffle(self.candidates)
+        self.spacing = spacing
+        self.bucket_size = max([distance for rules in spacing.values() for distance in rules.values()] or [GRID_SIZE])
+        self.buckets = {}  # (bucket x, bucket y) -> [(x, y, class)]
+        self.used = set()
+        self.cursors = {}
+    
+    def add(self, x, y, obj_class):
+        """Record an object placed by someone else"""
+        self.used.add((x, y))
+        key = (x // self.bucket_size, y // self.bucket_size)
+        self.buckets.setdefault(key, []).append((x, y, obj_class))
+    
+    def fits(self, x, y, obj_class):
+        if (x, y) in self.used:
+            return False
+        rules = self.spacing.get(obj_class)
+        if not rules:
+            return True
+        
+        any_distance = rules.get("*", 0)
+        bucket_x, bucket_y = x // self.bucket_size, y // self.bucket_size
+        for neighbour_y in range(bucket_y - 1, bucket_y + 2):
+            for neighbour_x in range(bucket_x - 1, bucket_x + 2):
+                for other_x, other_y, other_class in self.buckets.get((neighbour_x, neighbour_y), ()):
+                    distance = max(any_distance, rules.get(other_class, 0))
+                    if (other_x - x)**2 + (other_y - y)**2 < distance * distance:
+                        return False
+        return True
+    
+    def place(self, obj_type):
+        """Position for a new object of obj_type, or None if no candidate fits"""
+        obj_class = placement_class(obj_type)
+        index = self.cursors.get(obj_class, 0)
+        while index < len(self.candidates):
+            x, y = self.candidates[index]
+            index += 1
+            if self.fits(x, y, obj_class):
+                self.cursors[obj_class] = index
+                self.add(x, y, obj_class)
+                return (x, y)
+        self.cursors[obj_class] = index
+        return None
+
+class TrapDangerField:
+    """Per-cell distance to the nearest live trap, and the live traps within
+    caution range of anywhere in each cell, nearest first (padded with -1).
+    Built with one vectorized pass over cells x traps and rebuilt only when a
+    trap changes state, so the safety indicator looks up the player's cell
+    instead of scanning every object."""
+    def __init__(self, objects, reach=CAUTION_RANGE):
+        self.objects = objects
+        self.reach = reach + GRID_SIZE * math.sqrt(2) / 2  # From a cell center to its corners
+        self.rebuild()
+    
+    def rebuild(self):
+        objects = self.objects
+        live = np.flatnonzero(objects.live_traps())
+        distances = np.hypot(CELL_CENTER_X[:, :, None] - objects.x[live],
+                             CELL_CENTER_Y[:, :, None] - objects.y[live])
+        self.distance = distances.min(axis=2) if len(live) else np.full(CELL_CENTER_X.shape, np.inf)
+        
+        within = distances <= self.reach
+        order = np.argsort(distances, axis=2)[:, :, :within.sum(axis=2).max(initial=0)]
+        self.nearby = np.where(np.take_along_axis(within, order, axis=2), live[order], -1)
+    
+    def traps_near(self, x, y):
+        """Indices of live traps that may be within caution range of (x, y)"""
+        row = min(max(int(y) // GRID_SIZE, 0), MAZE_HEIGHT - 1)
+        column = min(max(int(x) // GRID_SIZE, 0), MAZE_WIDTH - 1)
+        if self.distance[row, column] > self.reach:
+            return self.nearby[row, column, :0]
+        candidates = self.nearby[row, column]
+        return candidates[candidates >= 0]
+
+class FlowField:
+    """Breadth-first distance in cells from every free cell to the nearest of
+    a set of target cells; -1 where no target can be reached. Stepping to a
+    neighbour one closer at every cell follows a shortest 4-way path. Cells
+    are (column, row); blocked cells are impassable unless they are targets."""
+    def __init__(self, walls, targets, blocked=()):
+        height, width = walls.shape
+        passable = (~walls).tolist()
+        for column, row in blocked:
+            passable[row][column] = False
+        distance = [[-1] * width for _ in range(height)]
+        
+        queue = deque()
+        for column, row in targets:
+            if not walls[row, column] and distance[row][column] < 0:
+                distance[row][column] = 0
+                queue.append((column, row))
+        
+        while queue:
+            column, row = queue.popleft()
+            next_distance = distance[row][column] + 1
+            for dx, dy in NEIGHBOURS:
+                x, y = column + dx, row + dy
+                if 0 <= x < width and 0 <= y < height and passable[y][x] and distance[y][x] < 0:
+                    distance[y][x] = next_distance
+                    queue.append((x, y))
+        
+        self.targets = list(targets)
+        self.distance = np.array(distance, dtype=np.int32)
+    
+    def distance_at(self, cell):
+        column, row = cell
+        if 0 <= row < self.distance.shape[0] and 0 <= column < self.distance.shape[1]:
+            return int(self.distance[row, column])
+        return -1
+    
+    def next_cell(self, cell):
+        """Neighbour one step closer to a target, or None on a target or when
+        no target is reachable"""
+        here = self.distance_at(cell)
+        if here <= 0:
+            return None
+        for dx, dy in NEIGHBOURS:
+            neighbour = (cell[0] + dx, cell[1] + dy)
+            if self.distance_at(neighbour) == here - 1:
+                return neighbour
+        return None
+    
+    def path(self, cell):
+        """Cells after cell up to and including the nearest target; None when
+        unreachable"""
+        if self.distance_at(cell) < 0:
+            return None
+        path = []
+        cell = self.next_cell(cell)
+        while cell is not None:
+            path.append(cell)
+            cell = self.next_cell(cell)
+        return path
+
+class NavigationService:
+    """Flow fields shared by hint arrows, bots and level analysis. Fields are
+    cached per set of targets and blocked cells and dropped when a new maze is
+    generated. The current objective (next key, chests, puzzles, terminals or
+    exit) is recomputed only when the objects or inventory change, e.g. when an
+    object is collected or the exit spawns."""
+    def __init__(self, state, max_fields=64):
+        self.state = state
+        self.max_fields = max_fields
+        self.fields = {}
+        self.walls = None
+        self.objective_key = None
+        self.objective = []
+    
+    def field(self, targets, blocked=()):
+        """FlowField toward the target cells, avoiding the blocked cells"""
+        if self.walls is not self.state.wall_mask:
+            self.walls = self.state.wall_mask
+            self.fields.clear()
+        
+        key = (tuple(sorted(targets)), frozenset(blocked))
+        field = self.fields.get(key)
+        if field is None:
+            if len(self.fields) >= self.max_fields:
+                del self.fields[next(iter(self.fields))]
+            field = self.fields[key] = FlowField(self.walls, key[0], key[1])
+        return field
+    
+    def objective_targets(self):
+        """Objects worth walking to next, in progression order"""
+        state = self.state
+        key = (state.objects, state.objects.revision, state.progression.held)
+        if key == self.objective_key:
+            return self.objective
+        self.objective_key = key
+        
+        inventory = state.inventory
+        remaining = [obj for obj in state.objects if not obj.collected]
+        
+        can_open = (("document" not in inventory) or
+                    ("tool" not in inventory) or
+                    ("large_key" not in inventory))
+        chests = [obj for obj in remaining if obj.type == "chest" and not obj.unlocked]
+        # Collect every puzzle before using a code: held codes are never handed out twice
+        puzzles = [obj for obj in remaining if obj.type == "code_puzzle"]
+        
+        if "small_key" not in inventory:
+            self.objective = [obj for obj in remaining if obj.type == "small_key"]
+        elif chests and can_open:
+            self.objective = chests
+        elif puzzles:
+            self.objective = puzzles
+        elif state.codes_found:
+            self.objective = [obj for obj in remaining if obj.type == "terminal"]
+        else:
+            self.objective = [obj for obj in remaining if obj.type == "exit"]
+        return self.objective
+    
+    def objective_field(self, blocked=()):
+        return self.field([(obj.x // GRID_SIZE, obj.y // GRID_SIZE) for obj in self.objective_targets()], blocked)
+    
+    def route_length(self, start, stages):
+        """Cells walked from start through every target of each stage in turn,
+        always to the nearest remaining one; None if a target is unreachable"""
+        total = 0
+        cell = start
+        for stage in stages:
+            remaining = list(stage)
+            while remaining:
+                field = self.field(remaining)
+                distance = field.distance_at(cell)
+                if distance < 0:
+                    return None
+                total += distance
+                if distance:
+                    cell = field.path(cell)[-1]
+                remaining.remove(cell)
+        return total
+
+class GameState:
+    """Complete rules state of one Echo Escape session.
+    
+    Time comes from the injected clock (a callable returning milliseconds). Without
+    one, the state keeps its own simulation time and advances it by step_ms on every
+    step, so headless runs are deterministic and independent of wall time. Side
+    effects the front end cares about (sounds, newly remembered walls) are queued
+    in self.events as (kind, payload) tuples."""
+    def __init__(self, seed=None, clock=None, step_ms=1000 / FPS,
+                 player_class=Player, object_class=GameObject, rules=DEFAULT_PROGRESSION):
+        self.clock = clock
+        self.step_ms = step_ms
+        # Distance per step; coarse simulated steps move further in one go
+        self.player_step = PLAYER_SPEED if step_ms == 1000 / FPS else PLAYER_SPEED * step_ms * FPS / 1000
+        self.sim_time = 0
+        self.player_class = player_class
+        self.object_class = object_class
+        self.rules = rules
+        self.rng = random.Random(seed)
+        self.events = []
+        
+        self.player = None
+        self.objects = ObjectStore(self.object_class)
+        self.danger = TrapDangerField(self.objects)
+        self.navigation = NavigationService(self)
+        self.maze = []
+        self.wall_mask = np.zeros((MAZE_HEIGHT, MAZE_WIDTH), dtype=bool)
+        
+        # Echo system: any number of overlapping pings can be active at once
+        self.echo_generation = 0
+        self.reset_echo()
+        self.clear_progress()
+    
+    def now(self):
+        """Current time in milliseconds"""
+        return self.clock() if self.clock else self.sim_time
+    
+    @property
+    def inventory(self):
+        return self.progression.inventory
+    
+    @property
+    def codes_found(self):
+        return self.progression.codes
+    
+    @property
+    def terminals_solved(self):
+        return self.progression.counters.get("terminals", 0)
+    
+    def clear_progress(self):
+        self.progression = Progression(self.rules)
+        self.game_won = False
+        self.game_over = False
+        self.death_message = ""
+        self.flash_message = ""
+        self.flash_message_time = 0
+        self.steps = 0
+        self.memory_last_seen = np.full((MAZE_HEIGHT, MAZE_WIDTH), -1, dtype=np.int64)
+    
+    def reset(self, seed=None):
+        """Start a new level; a seed makes maze and object placement reproducible"""
+        if seed is not None:
+            self.rng.seed(seed)
+        self.sim_time = 0
+        self.events = []
+        self.clear_progress()
+        self.reset_echo()
+        
+        # Generate maze and objects
+        self.generate_maze()
+        self.place_objects()
+        
+        # Create player at middle left position
+        start_x = GRID_SIZE * 2  # Left side of screen
+        start_y = SCREEN_HEIGHT // 2  # Middle height
+        self.player = self.player_class(start_x, start_y)
+    
+    def step(self, action=ACTION_NONE):
+        """Advance one tick: echo, interaction, movement, traps and echo timing.
+        Returns the interaction or death message of this tick, if any."""
+        current_time = self.now()
+        message = None
+        self.events.clear()
+        
+        if not self.game_over and not self.game_won:
+            if action & ACTION_ECHO and self.player.emit_echo(current_time):
+                self.start_echo(current_time)
+                self.events.append(("sound", "echo"))
+            
+            if action & ACTION_INTERACT:
+                message = self.handle_interaction()
+        
+        # Movement and traps stop as soon as the game is decided
+        if not self.game_over and not self.game_won:
+            dx = dy = 0
+            if action & ACTION_LEFT:
+                dx = -self.player_step
+            if action & ACTION_RIGHT:
+                dx = self.player_step
+            if action & ACTION_UP:
+                dy = -self.player_step
+            if action & ACTION_DOWN:
+                dy = self.player_step
+            
+            self.player.move(dx, dy, self.maze)
+            
+            # Check for traps
+            if self.check_traps():
+                message = self.death_message
+        
+        if self.flash_message and current_time - self.flash_message_time >= 5000:
+            self.flash_message = ""  # Clear flash message after 5 seconds
+        
+        self.expire_echoes(current_time)
+        self.steps += 1
+        if not self.clock:
+            self.sim_time += self.step_ms
+        return message
+    
+    def reset_echo(self):
+        """Clear all active echo pings and their cached per-ping fields"""
+        self.echo_pings = []
+        self.stack_echo_pings()
+    
+    def stack_echo_pings(self):
+        """Rebuild the stacked per-ping arrays after a ping starts or expires, so
+        each frame merges every active ping in one vectorized pass"""
+        if self.echo_pings:
+            latest = self.echo_pings[-1]
+            self.echo_active = True
+            self.echo_start_time = latest.start_time
+            self.echo_center = latest.center
+            self.echo_ping_starts = np.array([ping.start_time for ping in self.echo_pings],
+                                             dtype=float)[:, np.newaxis, np.newaxis]
+            self.echo_ping_reveal_times = np.stack([ping.reveal_times for ping in self.echo_pings])
+            self.echo_ping_falloff = np.stack([ping.distance_factor for ping in self.echo_pings])
+            self.echo_visibility = np.logical_or.reduce([ping.visibility for ping in self.echo_pings])
+        else:
+            self.echo_active = False
+            self.echo_start_time = 0
+            self.echo_center = (0, 0)
+            self.echo_visibility = np.zeros((MAZE_HEIGHT, MAZE_WIDTH), dtype=bool)
+        
+        self.echo_generation += 1
+        self._intensity_cache = (None, None)
+    
+    def remember_echo(self, ping):
+        """Fold a finished ping's revealed cells into the last-seen timestamps and
+        report the walls it newly revealed to the renderer"""
+        if not ping.visibility.any():
+            return
+        
+        newly_seen_walls = ping.visibility & self.wall_mask & (self.memory_last_seen < 0)
+        self.memory_last_seen[ping.visibility] = ping.start_time
+        
+        if newly_seen_walls.any():
+            self.events.append(("remember", newly_seen_walls))
+    
+    def start_echo(self, current_time):
+        """Emit an echo from the player; earlier pings keep fading independently"""
+        self.echo_pings.append(EchoPing(self.maze, self.player.x, self.player.y, current_time))
+        self.stack_echo_pings()
+    
+    def expire_echoes(self, current_time):
+        """Drop pings older than ECHO_DURATION, folding them into the memory map"""
+        active = [ping for ping in self.echo_pings
+                  if current_time - ping.start_time < ECHO_DURATION]
+        if len(active) == len(self.echo_pings):
+            return
+        
+        for ping in self.echo_pings:
+            if ping not in active:
+                self.remember_echo(ping)
+        self.echo_pings = active
+        self.stack_echo_pings()
+    
+    def echo_intensity(self, current_time):
+        """Per-cell reveal intensity (0..1) for this frame, merged over every active
+        ping with a max so overlapping wavefronts never add up past full brightness"""
+        cache_key = (current_time, self.echo_generation)
+        if self._intensity_cache[0] == cache_key:
+            return self._intensity_cache[1]
+        
+        if not self.echo_pings:
+            intensity = np.zeros((MAZE_HEIGHT, MAZE_WIDTH))
+        else:
+            elapsed = current_time - self.echo_ping_starts
+            time_factor = np.clip(1 - elapsed / ECHO_DURATION, 0.0, 1.0)
+            since_reached = elapsed - self.echo_ping_reveal_times
+            
+            # Cells light up as each ring passes, flash briefly, then fade with their ping
+            edge_flash = np.clip(1 - since_reached / ECHO_EDGE_FLASH, 0.0, 1.0)
+            per_ping = np.minimum(1.0, self.echo_ping_falloff * time_factor + 0.5 * edge_flash)
+            per_ping[since_reached < 0] = 0.0
+            intensity = per_ping.max(axis=0)
+        
+        self._intensity_cache = (cache_key, intensity)
+        return intensity
+    
+    def visible_object_indices(self, current_time, distances=None):
+        """Store indices of the objects the player can see: revealed once an echo
+        wavefront reaches their cell, and always when within 40 pixels"""
+        if distances is None:
+            distances = self.objects.distances(self.player.x, self.player.y)
+        visible = distances <= 40
+        if self.echo_pings:
+            visible |= self.echo_intensity(current_time)[self.objects.cells()] > 0
+        return np.flatnonzero(visible)
+    
+    def visible_objects(self, current_time):
+        return [self.objects[index] for index in self.visible_object_indices(current_time)]
+    
+    def generate_maze(self):
+        # Simple maze generation - create walls and open spaces
+        self.maze = [[0 for _ in range(MAZE_WIDTH)] for _ in range(MAZE_HEIGHT)]
+        
+        # Add border walls
+        for x in range(MAZE_WIDTH):
+            self.maze[0][x] = 1
+            self.maze[MAZE_HEIGHT-1][x] = 1
+        for y in range(MAZE_HEIGHT):
+            self.maze[y][0] = 1
+            self.maze[y][MAZE_WIDTH-1] = 1
+            
+        # Add some internal walls randomly (avoid starting area)
+        start_grid_x = 2
+        start_grid_y = SCREEN_HEIGHT // 2 // GRID_SIZE
+        
+        for _ in range(50):
+            x = self.rng.randint(2, MAZE_WIDTH-3)
+            y = self.rng.randint(2, MAZE_HEIGHT-3)
+            
+            # Don't place walls too close to starting position
+            if abs(x - start_grid_x) > 2 or abs(y - start_grid_y) > 2:
+                self.maze[y][x] = 1
+            
+        # Add some wall clusters for more interesting layout (avoid start area)
+        for _ in range(10):
+            x = self.rng.randint(3, MAZE_WIDTH-4)
+            y = self.rng.randint(3, MAZE_HEIGHT-4)
+            
+            # Don't place wall clusters too close to starting position
+            if abs(x - start_grid_x) > 3 or abs(y - start_grid_y) > 3:
+                for dx in range(-1, 2):
+                    for dy in range(-1, 2):
+                        if 0 <= x+dx < MAZE_WIDTH and 0 <= y+dy < MAZE_HEIGHT:
+                            self.maze[y+dy][x+dx] = 1
+        
+        # Wall mask for the vectorized echo passes
+        self.wall_mask = np.array(self.maze, dtype=bool)
+    
+    def place_objects(self):
+        self.objects = ObjectStore(self.object_class)
+        
+        # Find valid positions (not walls, not too close to start)
+        start_grid_x = 2  # Player starts at x = GRID_SIZE * 2
+        start_grid_y = SCREEN_HEIGHT // 2 // GRID_SIZE  # Player starts at middle height
+        
+        valid_positions = []
+        for y in range(2, MAZE_HEIGHT-2):
+            for x in range(2, MAZE_WIDTH-2):
+                if (self.maze[y][x] == 0 and 
+                    abs(x - start_grid_x) > 4 and abs(y - start_grid_y) > 3):  # Avoid start area
+                    valid_positions.append((x * GRID_SIZE + GRID_SIZE//2, 
+                                          y * GRID_SIZE + GRID_SIZE//2))
+        
+        placer = PoissonPlacer(valid_positions, self.rng)
+        
+        # Place objects for three-chest progression
+        if len(valid_positions) >= 12:
+            # Only place small key as standalone object (others come from chests),
+            # three chests for progression (document, tool, large_key come from these),
+            # code puzzles (3 needed for terminals) and terminals (3 needed to complete game)
+            layout = ([("small_key", NEON_GREEN, 8)] + [("chest", NEON_PINK, 16)] * 3 +
+                      [("code_puzzle", CYAN, 12)] * 3 + [("terminal", WHITE, 20)] * 3)
+            
+            # 7 deadly traps, well spaced
+            trap_types = ["trap_spike", "trap_laser", "trap_shock", "trap_pit", "trap_gas", "trap_blade", "trap_fire"]
+            layout += [(trap_type, RED, 20) for trap_type in trap_types]
+            
+            for obj_type, color, size in layout:
+                pos = placer.place(obj_type)
+                if pos:
+                    self.objects.add(pos[0], pos[1], obj_type, color, size)
+        
+        self.danger = TrapDangerField(self.objects)
+    
+    def handle_interaction(self):
+        player_x, player_y = self.player.x, self.player.y
+        progression = self.progression
+        
+        for obj in self.objects:
+            if obj.collected or obj.unlocked:
+                continue
+            
+            object_rules = self.rules.objects.get(obj.type)
+            if object_rules is None:
+                continue
+                
+            if rects_overlap(player_x - 16, player_y - 16, 32, 32,
+                             obj.x - obj.size, obj.y - obj.size, obj.size * 2, obj.size * 2):
+                for rule in object_rules.rules:
+                    if not progression.allows(rule):
+                        continue
+                    
+                    given = progression.apply(rule, self.rng)
+                    if rule.marks:
+                        setattr(obj, rule.marks, True)
+                    if rule.sound:
+                        self.events.append(("sound", rule.sound))
+                    if rule.wins:
+                        self.game_won = True
+                    if rule.check_exit and self.check_all_requirements_met():
+                        return self.spawn_exit_with_message()
+                    return rule.message.format(given=given)
+                
+                if object_rules.otherwise:
+                    return object_rules.otherwise
+        
+        return None
+    
+    def check_all_requirements_met(self):
+        """Check if all requirements are met before allowing exit to spawn"""
+        return self.progression.allows(self.rules.exit)
+    
+    def spawn_exit_with_message(self):
+        # Spawn exit
+        valid_pos = self.find_valid_position()
+        if valid_pos:
+            self.objects.add(valid_pos[0], valid_pos[1],
+                             "exit", NEON_GREEN, 24)
+        self.events.append(("exit", valid_pos))  # None when no free spot was found
+        
+        # Set flash message
+        self.flash_message = "ALL TERMINALS SOLVED! FIND THE EXIT!"
+        self.flash_message_time = self.now()
+        
+        return f"All terminals solved! The exit has appeared - find it to escape!"
+    
+    def check_traps(self):
+        # Player box against every untriggered trap box at once (colliderect rules)
+        store = self.objects
+        count = len(store)
+        player_left = self.player.x - PLAYER_HALF_EXTENT
+        player_top = self.player.y - PLAYER_HALF_EXTENT
+        sizes = store.size[:count]
+        left = store.x[:count] - sizes // 2
+        top = store.y[:count] - sizes // 2
+        hits = (store.live_traps() & (sizes > 0) &
+                (player_left < left + sizes) & (left < player_left + PLAYER_HALF_EXTENT * 2) &
+                (player_top < top + sizes) & (top < player_top + PLAYER_HALF_EXTENT * 2))
+        if not hits.any():
+            return False
+        
+        obj = store[int(hits.argmax())]
+        obj.triggered = True
+        self.danger.rebuild()
+        self.game_over = True
+        self.events.append(("trap", obj.type))
+        self.events.append(("sound", "trap"))
+        self.events.append(("sound", "death"))
+        
+        trap_messages = {
+            "trap_spike": "GAME OVER: Impaled by hidden spikes!",
+            "trap_laser": "GAME OVER: Disintegrated by laser grid!",
+            "trap_shock": "GAME OVER: Electrocuted by shock trap!",
+            "trap_pit": "GAME OVER: Fell into a deadly pit!",
+            "trap_gas": "GAME OVER: Poisoned by toxic gas!",
+            "trap_blade": "GAME OVER: Sliced by spinning blades!",
+            "trap_fire": "GAME OVER: Incinerated by flames!"
+        }
+        
+        self.death_message = trap_messages.get(obj.type, "GAME OVER: Killed by trap!")
+        return True
+    
+    def find_valid_position(self):
+        """Free cell for the exit, clear of every object; None only when the
+        maze has no such cell"""
+        candidates = [(x * GRID_SIZE + GRID_SIZE//2, y * GRID_SIZE + GRID_SIZE//2)
+                      for y, x in (np.argwhere(~self.wall_mask[2:MAZE_HEIGHT-2, 2:MAZE_WIDTH-2]) + 2).tolist()]
+        placer = PoissonPlacer(candidates, self.rng)
+        for obj in self.objects:
+            placer.add(int(obj.x), int(obj.y), placement_class(obj.type))
+        return placer.place("exit")
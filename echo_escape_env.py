@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Echo Escape - Agent Environment
+Gym-style wrapper around Game: reset(seed) and step(action) return structured
+observations for external agents. Pixels are optional; without them no draw_*
+pass runs, so an agent only pays for the rules.
+"""
+
+import pygame
+
+from echo_escape_core import SCREEN_WIDTH, SCREEN_HEIGHT, ACTION_NONE
+from echo_escape_main import Game
+
+
+class EscapeEnv:
+    """Wraps a Game and advances it one simulated frame per step.
+
+    Observations are dicts with:
+        maze      read-only (MAZE_HEIGHT, MAZE_WIDTH) bool view of the walls
+        player    (x, y) in pixels
+        objects   visible objects as dicts (type, x, y, size, collected, unlocked)
+        inventory, codes, terminals_solved, steps
+        pixels    only with pixels=True: (SCREEN_WIDTH, SCREEN_HEIGHT, 3) view
+                  of the rendered frame from pygame.surfarray.pixels3d
+
+    The pixel view is not a copy. Frames alternate between two surfaces, so a
+    view stays valid until the step after next; copy it to keep it longer.
+    """
+    def __init__(self, pixels=False, game=None):
+        self.game = game or Game()
+        self.game.state.clock = None  # Each step advances simulated time by one frame
+        self.pixels = pixels
+        self.maze_view = None
+        self.message = ""
+        self.message_time = 0
+
+        if pixels:
+            self.frames = [pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) for _ in range(2)]
+            self.frame_index = 0
+
+    def reset(self, seed=None):
+        """Start a new level and return its first observation"""
+        self.game.start_new_game(seed)
+        self.maze_view = self.game.state.wall_mask.view()
+        self.maze_view.flags.writeable = False
+        self.message = ""
+        self.message_time = 0
+        return self.observe(self.render())
+
+    def step(self, action=ACTION_NONE):
+        """Apply one ACTION_* bitmask. Returns (observation, reward, done, info);
+        reward is 1 for escaping, -1 for dying and 0 otherwise."""
+        state = self.game.state
+        message = state.step(action)
+        if message:
+            self.message = message
+            self.message_time = state.now()
+
+        # Sounds are left to the caller; the memory map only matters for pixels
+        if self.pixels:
+            for kind, payload in state.events:
+                if kind == "remember":
+                    self.game.remember_walls(payload)
+
+        done = state.game_over or state.game_won
+        reward = 1.0 if state.game_won else -1.0 if state.game_over else 0.0
+        info = {"message": message, "events": list(state.events)}
+        return self.observe(self.render()), reward, done, info
+
+    def render(self):
+        """Draw the frame into the next buffer and return a view of it"""
+        if not self.pixels:
+            return None
+
+        self.frame_index = 1 - self.frame_index
+        frame = self.frames[self.frame_index]
+        if frame.get_locked():
+            raise RuntimeError("A pixel observation from two steps ago is still alive; "
+                               "copy frames that need to outlive the next step")
+
+        if not self.game.scaled:
+            self.game.screen = frame  # Otherwise the layers are composed into frame below
+        self.game.draw_game(self.message, self.message_time, self.game.state.now())
+        self.game.composed_frame(frame)
+        return pygame.surfarray.pixels3d(frame)
+
+    def observe(self, pixels=None):
+        state = self.game.state
+        observation = {
+            "maze": self.maze_view,
+            "player": (state.player.x, state.player.y),
+            "objects": [{"type": obj.type, "x": obj.x, "y": obj.y, "size": obj.size,
+                         "collected": obj.collected, "unlocked": obj.unlocked}
+                        for obj in state.visible_objects(state.now())],
+            "inventory": list(state.inventory),
+            "codes": list(state.codes_found),
+            "terminals_solved": state.terminals_solved,
+            "steps": state.steps,
+        }
+        if pixels is not None:
+            observation["pixels"] = pixels
+        return observation
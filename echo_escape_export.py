@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Echo Escape - Shared Memory Exporter
+Publishes every rendered frame and a fixed-layout state record into a
+multiprocessing.shared_memory ring buffer, so analytics and AI processes can
+follow the live game without slowing it down.
+
+Layout: one header followed by SLOTS slots. Each slot holds a begin and end
+sequence number, a STATE_DTYPE record and the raw screen pixels (height x
+pitch bytes in the screen's native pixel format). The writer bumps the
+slot's begin number, fills the slot, then sets the end number and the
+header's latest number. Readers never lock: they read a slot in place and
+check afterwards that its begin number did not move (a seqlock).
+
+Watch a running game (started with run_game.py --export echo_escape):
+    python3 echo_escape_export.py echo_escape
+"""
+
+import sys
+import time
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+
+MAGIC = 0x45434845  # "ECHE"
+VERSION = 1
+SLOTS = 4
+SLOT_ALIGN = 64
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "<u4"), ("version", "<u4"), ("slots", "<u4"), ("slot_size", "<u4"),
+    ("width", "<u4"), ("height", "<u4"), ("pitch", "<u4"), ("bytes_per_pixel", "<u4"),
+    ("red_shift", "<u4"), ("green_shift", "<u4"), ("blue_shift", "<u4"), ("pad", "<u4"),
+    ("latest_seq", "<u8"),
+], align=True)
+
+SLOT_HEADER_DTYPE = np.dtype([("seq_begin", "<u8"), ("seq_end", "<u8")])
+
+# Inventory and code flag bits
+INVENTORY_FLAGS = {"small_key": 1, "document": 2, "tool": 4, "large_key": 8}
+CODE_FLAGS = {"2048": 1, "ECHO": 2, "NEURAL": 4}
+
+STATE_DTYPE = np.dtype([
+    ("frame", "<u8"),            # Game frame number; gaps mean frames were skipped
+    ("time_ms", "<f8"),
+    ("player_x", "<f4"), ("player_y", "<f4"),
+    ("echo_active", "u1"), ("echo_pings", "u1"),
+    ("inventory_flags", "u1"), ("code_flags", "u1"),
+    ("echo_center_x", "<f4"), ("echo_center_y", "<f4"),
+    ("echo_start_time", "<f8"),
+    ("terminals_solved", "u1"), ("game_over", "u1"), ("game_won", "u1"), ("pad", "u1"),
+], align=True)
+
+
+def header_size():
+    return -(-HEADER_DTYPE.itemsize // SLOT_ALIGN) * SLOT_ALIGN
+
+
+def slot_size(height, pitch):
+    size = SLOT_HEADER_DTYPE.itemsize + STATE_DTYPE.itemsize + height * pitch
+    return -(-size // SLOT_ALIGN) * SLOT_ALIGN
+
+
+def map_slots(buf, slots, size, height, pitch):
+    """numpy views of every slot's sequence numbers, state record and pixels"""
+    views = []
+    for index in range(slots):
+        offset = header_size() + index * size
+        seq = np.ndarray((), SLOT_HEADER_DTYPE, buf, offset)
+        record = np.ndarray((), STATE_DTYPE, buf, offset + SLOT_HEADER_DTYPE.itemsize)
+        pixels = np.ndarray((height, pitch), np.uint8, buf,
+                            offset + SLOT_HEADER_DTYPE.itemsize + STATE_DTYPE.itemsize)
+        views.append((seq, record, pixels))
+    return views
+
+
+class SharedFrameExporter:
+    """Writer side, owned by the game. publish() copies the screen once into
+    the next slot; when the rolling writer cost goes over budget_ms it
+    publishes only every n-th frame until the cost is back under budget."""
+    def __init__(self, name, screen, slots=SLOTS, budget_ms=2.0):
+        self.width, self.height = screen.get_size()
+        self.pitch = screen.get_pitch()
+        self.slots = slots
+        self.slot_size = slot_size(self.height, self.pitch)
+        self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                              size=header_size() + slots * self.slot_size)
+
+        self.header = np.ndarray((), HEADER_DTYPE, self.shm.buf, 0)
+        red_shift, green_shift, blue_shift, _ = screen.get_shifts()
+        self.header[()] = (MAGIC, VERSION, slots, self.slot_size, self.width, self.height,
+                           self.pitch, screen.get_bytesize(), red_shift, green_shift, blue_shift, 0, 0)
+        self.slot_views = map_slots(self.shm.buf, slots, self.slot_size, self.height, self.pitch)
+
+        self.seq = 0
+        self.frame = 0
+        self.budget_ms = budget_ms
+        self.publish_every = 1
+        self.cost_ms = 0.0  # Exponential moving average of publish() cost
+        self.max_cost_ms = 0.0
+        self.skipped = 0
+
+    def publish(self, screen, state):
+        """Export this frame's pixels and state, unless throttled"""
+        self.frame += 1
+        if self.frame % self.publish_every:
+            self.skipped += 1
+            return False
+
+        start = time.perf_counter()
+        self.seq += 1
+        seq_view, record, pixels = self.slot_views[self.seq % self.slots]
+        seq_view["seq_begin"] = self.seq
+
+        record["frame"] = self.frame
+        record["time_ms"] = state.now()
+        record["player_x"] = state.player.x
+        record["player_y"] = state.player.y
+        record["echo_active"] = state.echo_active
+        record["echo_pings"] = len(state.echo_pings)
+        record["echo_center_x"], record["echo_center_y"] = state.echo_center
+        record["echo_start_time"] = state.echo_start_time
+        record["inventory_flags"] = sum(bit for item, bit in INVENTORY_FLAGS.items() if item in state.inventory)
+        record["code_flags"] = sum(bit for code, bit in CODE_FLAGS.items() if code in state.codes_found)
+        record["terminals_solved"] = state.terminals_solved
+        record["game_over"] = state.game_over
+        record["game_won"] = state.game_won
+
+        # The buffer proxy locks the screen, so drop it before anything blits again
+        raw = screen.get_buffer()
+        np.copyto(pixels, np.frombuffer(raw, np.uint8).reshape(self.height, self.pitch))
+        del raw
+
+        seq_view["seq_end"] = self.seq
+        self.header["latest_seq"] = self.seq
+
+        cost_ms = (time.perf_counter() - start) * 1000
+        self.cost_ms = self.cost_ms * 0.95 + cost_ms * 0.05
+        self.max_cost_ms = max(self.max_cost_ms, cost_ms)
+        if self.cost_ms > self.budget_ms:
+            self.publish_every = min(self.publish_every + 1, 8)
+        elif self.publish_every > 1 and self.cost_ms < self.budget_ms * 0.5:
+            self.publish_every -= 1
+        return True
+
+    def close(self):
+        self.slot_views = None
+        self.header = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedFrame:
+    """One published slot, read in place. Check valid() after using the views:
+    the writer may have lapped the ring meanwhile."""
+    def __init__(self, reader, seq, seq_view, record, pixels):
+        self.reader = reader
+        self.seq = seq
+        self.seq_view = seq_view
+        self.state = record
+        self.raw = pixels
+
+    def valid(self):
+        return int(self.seq_view["seq_begin"]) == self.seq
+
+    def rgb(self):
+        """(height, width, 3) RGB view of the raw pixels, no copy when the byte
+        order allows it"""
+        pixels = self.raw[:, :self.reader.width * self.reader.bytes_per_pixel]
+        pixels = pixels.reshape(self.reader.height, self.reader.width, self.reader.bytes_per_pixel)
+        red, green, blue = (shift // 8 for shift in self.reader.shifts)
+        if (red, green, blue) == (2, 1, 0):
+            return pixels[:, :, 2::-1]
+        if (red, green, blue) == (0, 1, 2):
+            return pixels[:, :, :3]
+        return pixels[:, :, [red, green, blue]]
+
+
+class SharedFrameReader:
+    """Reader side for other processes. Attaching never locks or copies."""
+    def __init__(self, name):
+        self.shm = shared_memory.SharedMemory(name=name)
+        # Only the exporter owns the block; stop this process's tracker from unlinking it
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+
+        self.header = np.ndarray((), HEADER_DTYPE, self.shm.buf, 0)
+        if self.header["magic"] != MAGIC or self.header["version"] != VERSION:
+            raise ValueError(f"Shared memory block {name} is not an Echo Escape export")
+
+        self.slots = int(self.header["slots"])
+        self.width = int(self.header["width"])
+        self.height = int(self.header["height"])
+        self.bytes_per_pixel = int(self.header["bytes_per_pixel"])
+        self.shifts = (int(self.header["red_shift"]), int(self.header["green_shift"]),
+                       int(self.header["blue_shift"]))
+        self.slot_views = map_slots(self.shm.buf, self.slots, int(self.header["slot_size"]),
+                                    self.height, int(self.header["pitch"]))
+
+    def latest(self):
+        """The newest complete slot, or None before the first publish"""
+        seq = int(self.header["latest_seq"])
+        if seq == 0:
+            return None
+        seq_view, record, pixels = self.slot_views[seq % self.slots]
+        if int(seq_view["seq_end"]) != seq or int(seq_view["seq_begin"]) != seq:
+            return None  # Lapped while we looked; the caller simply tries again
+        return SharedFrame(self, seq, seq_view, record, pixels)
+
+    def close(self):
+        self.slot_views = None
+        self.header = None
+        self.shm.close()
+
+
+def watch(name):
+    """Print the exported state of a running game about once a second"""
+    reader = SharedFrameReader(name)
+    last_seq = 0
+    last_time = time.perf_counter()
+    try:
+        while True:
+            time.sleep(1)
+            frame = reader.latest()
+            if frame is None:
+                continue
+            state = frame.state.copy()
+            mean_brightness = frame.rgb().mean()
+            if not frame.valid():
+                continue
+            now = time.perf_counter()
+            rate = (frame.seq - last_seq) / (now - last_time)
+            last_seq, last_time = frame.seq, now
+            print(f"seq {frame.seq} frame {state['frame']} ({rate:.1f}/s)  "
+                  f"player ({state['player_x']:.0f}, {state['player_y']:.0f})  "
+                  f"pings {state['echo_pings']}  inventory {state['inventory_flags']:04b}  "
+                  f"brightness {mean_brightness:.1f}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    watch(sys.argv[1] if len(sys.argv) > 1 else "echo_escape")
@@ -0,0 +1,202 @@
+"""
+Echo Escape - HUD
+Retained-mode heads-up display. Each widget (info panel, controls panel,
+end-screen overlays) is composed once into a cached surface together with its
+text, and only rebuilt when the state it shows changes: inventory, codes,
+terminals solved, or the game being lost or won. Unchanged frames are one blit
+per widget. The counters record every rebuild and every font render so this
+can be checked on a running game. Below a scale of 1 every widget is shrunk
+once when it is built, so the HUD layer can be drawn at a lower resolution.
+"""
+
+import math
+import time
+
+import pygame
+
+from echo_escape_core import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, DARK_GRAY, CYAN, NEON_GREEN, NEON_BLUE, NEON_PINK, WHITE, RED)
+
+PANEL_ALPHA = 200
+INFO_PANEL = pygame.Rect(10, 10, 400, 140)
+CONTROLS_PANEL = pygame.Rect(SCREEN_WIDTH - 230, 10, 220, 160)
+INSTRUCTIONS = [
+    ("CONTROLS:", WHITE),
+    ("SPACE: Echo Ping", CYAN),
+    ("E: Interact", NEON_GREEN),
+    ("Arrow Keys: Move", NEON_BLUE),
+    ("ESC: Quit", RED),
+    ("", WHITE),
+    ("BEWARE:", NEON_PINK),
+    ("Hidden Traps!", RED)
+]
+TITLE_PULSE_LEVELS = 16  # The pulsing victory title is rendered once per level
+
+
+def scaled(surface, scale):
+    if scale == 1:
+        return surface
+    width, height = surface.get_size()
+    return pygame.transform.smoothscale(surface, (max(1, round(width * scale)), max(1, round(height * scale))))
+
+
+class Widget:
+    """A surface rebuilt by build(key) whenever key differs from the last one"""
+    def __init__(self, name, build, counters, scale=1):
+        self.name = name
+        self.build = build
+        self.counters = counters
+        self.scale = scale
+        self.key = None
+        self.surface = None
+
+    def get(self, key):
+        if self.surface is None or key != self.key:
+            self.key = key
+            self.surface = scaled(self.build(key), self.scale)
+            self.counters[self.name] = self.counters.get(self.name, 0) + 1
+        return self.surface
+
+
+class Hud:
+    """Draws the gameplay HUD from cached widgets. counters maps each widget
+    name to its rebuild count, plus "frames" drawn and "text_renders". scale is
+    the resolution of the surface drawn to, as a share of the screen's."""
+    def __init__(self, font, small_font, scale=1):
+        self.font = font
+        self.small_font = small_font
+        self.scale = scale
+        self.counters = {"frames": 0, "text_renders": 0}
+        self.info = Widget("info", self.build_info, self.counters, scale)
+        self.controls = Widget("controls", self.build_controls, self.counters, scale)
+        self.game_over = Widget("game_over", self.build_game_over, self.counters, scale)
+        self.victory = Widget("victory", self.build_victory, self.counters, scale)
+        self.victory_titles = {}
+
+    def render(self, font, text, color):
+        self.counters["text_renders"] += 1
+        return font.render(text, True, color)
+
+    def draw(self, screen, state):
+        self.counters["frames"] += 1
+        screen.blit(self.info.get((tuple(state.inventory), tuple(state.codes_found), state.terminals_solved)),
+                    self.at(INFO_PANEL.topleft))
+        screen.blit(self.controls.get(()), self.at(CONTROLS_PANEL.topleft))
+
+        if state.game_over:
+            screen.blit(self.game_over.get(state.death_message), (0, 0))
+        elif state.game_won:
+            screen.blit(self.victory.get(()), (0, 0))
+
+            # Animated victory text
+            pulse = abs(math.sin(time.time() * 3)) * 0.3 + 0.7
+            title = self.victory_title(int((pulse - 0.7) / 0.3 * (TITLE_PULSE_LEVELS - 1) + 0.5))
+            screen.blit(title, title.get_rect(center=self.at((SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 40))))
+
+    def at(self, position):
+        """A screen position on the scaled surface"""
+        return (round(position[0] * self.scale), round(position[1] * self.scale))
+
+    def report(self):
+        """Rebuild and render counts against frames drawn, for the log at exit"""
+        rebuilds = ", ".join(f"{name} {count}" for name, count in self.counters.items()
+                             if name not in ("frames", "text_renders"))
+        return (f"HUD: {self.counters['frames']} frames, {self.counters['text_renders']} text renders, "
+                f"rebuilds: {rebuilds or 'none'}")
+
+    def panel(self, rect, lines=()):
+        """Semi-transparent panel with a border and (text surface, position)
+        lines, in panel coordinates. Text running past the border is kept."""
+        width = max([rect.width] + [x + text.get_width() for text, (x, y) in lines])
+        surface = pygame.Surface((width, rect.height), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, PANEL_ALPHA), (0, 0, rect.width, rect.height))
+        pygame.draw.rect(surface, CYAN, (0, 0, rect.width, rect.height), 2)
+        surface.blits(lines, doreturn=False)
+        return surface
+
+    def build_info(self, key):
+        inventory, codes, terminals_solved = key
+        lines = []
+
+        # Inventory with word wrapping
+        y_offset = 10
+        inventory_items = ', '.join(inventory) if inventory else 'EMPTY'
+        max_chars_per_line = 45  # Adjust based on panel width
+        if len(inventory_items) > max_chars_per_line:
+            wrapped = []
+            current_line = "INVENTORY: "
+            for word in inventory:
+                if len(current_line + word + ', ') <= max_chars_per_line:
+                    if current_line == "INVENTORY: ":
+                        current_line += word
+                    else:
+                        current_line += ', ' + word
+                else:
+                    wrapped.append(current_line)
+                    current_line = '           ' + word  # Indent continuation
+            if current_line.strip():
+                wrapped.append(current_line)
+
+            for i, line in enumerate(wrapped):
+                lines.append((self.render(self.small_font, line, NEON_GREEN), (10, y_offset + i * 20)))
+            y_offset += len(wrapped) * 20
+        else:
+            lines.append((self.render(self.small_font, f"INVENTORY: {inventory_items}", NEON_GREEN),
+                          (10, y_offset)))
+            y_offset += 25
+
+        codes_text = f"CODES: {', '.join(codes) if codes else 'NONE'}"
+        lines.append((self.render(self.small_font, codes_text, CYAN), (10, y_offset)))
+        y_offset += 25
+
+        lines.append((self.render(self.small_font, f"TERMINALS: {terminals_solved}/3", NEON_PINK),
+                      (10, y_offset)))
+        y_offset += 25
+        surface = self.panel(INFO_PANEL, lines)
+
+        # Progress bar for terminals
+        progress = pygame.Rect(10, y_offset, 250, 8)
+        pygame.draw.rect(surface, DARK_GRAY, progress)
+        pygame.draw.rect(surface, WHITE, progress, 1)
+        if terminals_solved > 0:
+            pygame.draw.rect(surface, NEON_PINK,
+                             (progress.x, progress.y, int((terminals_solved / 3) * progress.width), progress.height))
+        return surface
+
+    def build_controls(self, key):
+        return self.panel(CONTROLS_PANEL, [(self.render(self.small_font, instruction, color), (20, 10 + i * 18))
+                                           for i, (instruction, color) in enumerate(INSTRUCTIONS)
+                                           if instruction])  # Skip empty lines
+
+    def build_game_over(self, death_message):
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        surface.fill((20, 0, 0, 179))
+
+        # Death message with glow effect
+        death_surface = self.render(self.font, death_message, RED)
+        glow_surface = self.render(self.font, death_message, (100, 0, 0))
+        surface.blit(glow_surface, glow_surface.get_rect(center=(SCREEN_WIDTH//2 + 2, SCREEN_HEIGHT//2 - 18)))
+        surface.blit(death_surface, death_surface.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 20)))
+
+        restart_text = self.render(self.small_font, "Press R to restart or ESC to quit", WHITE)
+        surface.blit(restart_text, restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20)))
+        return surface
+
+    def build_victory(self, key):
+        surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        surface.fill((0, 40, 0, 150))
+
+        success_text = self.render(self.small_font, "You navigated the deadly maze successfully!", WHITE)
+        surface.blit(success_text, success_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 10)))
+
+        play_again_text = self.render(self.small_font, "Press R to play again or ESC to quit", CYAN)
+        surface.blit(play_again_text, play_again_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20)))
+        return surface
+
+    def victory_title(self, level):
+        title = self.victory_titles.get(level)
+        if title is None:
+            pulse = 0.7 + 0.3 * level / (TITLE_PULSE_LEVELS - 1)
+            win_color = (int(NEON_GREEN[0] * pulse), int(NEON_GREEN[1] * pulse), int(NEON_GREEN[2] * pulse))
+            title = self.victory_titles[level] = scaled(self.render(self.font, "YOU ESCAPED!", win_color), self.scale)
+        return title
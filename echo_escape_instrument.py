@@ -0,0 +1,205 @@
+"""
+Echo Escape - Draw Instrumentation
+Counts, for every frame, the Surfaces allocated, the blits and the pixels they
+covered, the pygame.draw primitives and fills, and the font renders, and
+attributes each one to the draw_* method that made it (or to the object type,
+for object renderers and labels). Results are shown in an overlay, kept for the
+last HISTORY_FRAMES frames and exported as JSON; a tracemalloc snapshot diff
+between two points in a session is available on demand.
+
+Counting works by swapping pygame.Surface, pygame.font.Font and the
+pygame.draw functions for counting versions, so it has to be installed before
+the game creates its surfaces and fonts. Blits and fills are only seen on
+Surfaces created while it is installed; the game therefore draws off-screen
+while instrumented. It slows drawing down and is meant for diagnosis only.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+import pygame
+
+SURFACES, BLITS, DRAWS, RENDERS, PIXELS = range(5)
+COUNT_NAMES = ["surfaces", "blits", "draws", "renders", "pixels"]
+DRAW_FUNCTIONS = ["rect", "polygon", "circle", "ellipse", "arc", "line", "lines", "aaline", "aalines"]
+HISTORY_FRAMES = 600
+OVERLAY_ROWS = 14
+
+ACTIVE = None  # The installed Instrumentation, if any
+
+ORIGINAL_SURFACE = pygame.Surface
+ORIGINAL_FONT = pygame.font.Font
+ORIGINAL_DRAW = {name: getattr(pygame.draw, name) for name in DRAW_FUNCTIONS}
+
+
+class CountingSurface(ORIGINAL_SURFACE):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if ACTIVE:
+            ACTIVE.count(SURFACES)
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        rect = super().blit(source, dest, area, special_flags)
+        if ACTIVE:
+            ACTIVE.count(BLITS, rect.width * rect.height)
+        return rect
+
+    def blits(self, blit_sequence, doreturn=1):
+        rects = super().blits(blit_sequence, doreturn=1)
+        if ACTIVE:
+            ACTIVE.count(BLITS, sum(rect.width * rect.height for rect in rects), len(rects))
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None, special_flags=0):
+        if ACTIVE:
+            ACTIVE.count(DRAWS)
+        return super().fill(color, rect, special_flags)
+
+
+class CountingFont(ORIGINAL_FONT):
+    def render(self, *args, **kwargs):
+        if ACTIVE:
+            ACTIVE.count(RENDERS)
+        return super().render(*args, **kwargs)
+
+
+def counting_draw(function):
+    def draw(*args, **kwargs):
+        if ACTIVE:
+            ACTIVE.count(DRAWS)
+        return function(*args, **kwargs)
+    return draw
+
+
+def call_site(frame):
+    """The nearest draw* function up the stack. Object renderers and labels
+    (which have an obj argument) are reported by object type, other plain
+    draw methods by their class."""
+    while frame is not None:
+        name = frame.f_code.co_name
+        if name.startswith("draw"):
+            local = frame.f_locals
+            obj = local.get("obj")
+            if obj is not None and hasattr(obj, "type"):
+                return f"{'label' if name == 'draw' else 'object'}:{obj.type}"
+            if name == "draw" and "self" in local:
+                return f"{type(local['self']).__name__}.draw"
+            return name
+        frame = frame.f_back
+    return "other"
+
+
+class Instrumentation:
+    """Per-frame counters by call site. begin_frame and end_frame bracket a
+    frame; last is the finished frame as {site: [surfaces, blits, draws,
+    renders, pixels]}."""
+    def __init__(self, export_path="echo_escape_instrument.json"):
+        self.export_path = export_path
+        self.sites = {}
+        self.last = {}
+        self.history = deque(maxlen=HISTORY_FRAMES)
+        self.frame = 0
+        self.frame_start = time.perf_counter()
+        self.overlay_enabled = True
+        self.overlay_font = None
+        self.snapshot = None
+        self.memory_diff_lines = []
+
+    def install(self):
+        global ACTIVE
+        ACTIVE = self
+        pygame.Surface = CountingSurface
+        pygame.font.Font = CountingFont
+        for name in DRAW_FUNCTIONS:
+            setattr(pygame.draw, name, counting_draw(ORIGINAL_DRAW[name]))
+
+    def uninstall(self):
+        global ACTIVE
+        ACTIVE = None
+        pygame.Surface = ORIGINAL_SURFACE
+        pygame.font.Font = ORIGINAL_FONT
+        for name, function in ORIGINAL_DRAW.items():
+            setattr(pygame.draw, name, function)
+
+    def count(self, kind, pixels=0, amount=1):
+        # Frame 0 is count(), 1 the counting wrapper, 2 the caller
+        site = call_site(sys._getframe(2))
+        counts = self.sites.get(site)
+        if counts is None:
+            counts = self.sites[site] = [0, 0, 0, 0, 0]
+        counts[kind] += amount
+        counts[PIXELS] += pixels
+
+    def begin_frame(self):
+        self.sites = {}
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self, screen_name):
+        self.last = self.sites
+        self.sites = {}
+        self.history.append({"frame": self.frame, "screen": screen_name,
+                             "ms": round((time.perf_counter() - self.frame_start) * 1000, 3),
+                             "sites": {site: dict(zip(COUNT_NAMES, counts)) for site, counts in self.last.items()}})
+        self.frame += 1
+
+    def totals(self):
+        return [sum(counts[kind] for counts in self.last.values()) for kind in range(5)]
+
+    def memory_diff(self):
+        """First call starts tracemalloc; later calls print the ten lines
+        whose allocations grew the most since the call before"""
+        global ACTIVE
+        active, ACTIVE = ACTIVE, None  # The snapshot itself allocates
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.snapshot = tracemalloc.take_snapshot()
+            self.memory_diff_lines = ["tracemalloc started; diff again to compare"]
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            stats = snapshot.compare_to(self.snapshot, "lineno")[:10]
+            self.snapshot = snapshot
+            self.memory_diff_lines = [str(stat) for stat in stats]
+        for line in self.memory_diff_lines:
+            print(line)
+        ACTIVE = active
+
+    def export(self, path=None):
+        """Write the kept frames, the totals of the last one and the last
+        memory diff as JSON"""
+        path = path or self.export_path
+        with open(path, "w") as f:
+            json.dump({"frames": list(self.history),
+                       "last_totals": dict(zip(COUNT_NAMES, self.totals())),
+                       "memory_diff": self.memory_diff_lines}, f, indent=1)
+        print(f"Instrumentation for {len(self.history)} frames written to {path}")
+
+    def draw_overlay(self, screen):
+        """Counts of the last frame by site, busiest first; not counted itself"""
+        global ACTIVE
+        if not self.overlay_enabled:
+            return
+        active, ACTIVE = ACTIVE, None
+        if self.overlay_font is None:
+            self.overlay_font = ORIGINAL_FONT(None, 18)
+
+        rows = [("site", "surf", "blit", "draw", "text", "kpx"),
+                ("total", *self.totals()[:4], self.totals()[PIXELS] // 1000)]
+        busiest = sorted(self.last.items(), key=lambda item: -item[1][PIXELS] - 1000 * sum(item[1][:4]))
+        for site, counts in busiest[:OVERLAY_ROWS]:
+            rows.append((site, *counts[:4], counts[PIXELS] // 1000))
+
+        width, line_height = 420, 15
+        x, y = screen.get_width() - width - 10, screen.get_height() - line_height * len(rows) - 20
+        panel = ORIGINAL_SURFACE((width, line_height * len(rows) + 10))
+        panel.set_alpha(200)
+        screen.blit(panel, (x, y))
+        for i, row in enumerate(rows):
+            color = (255, 255, 0) if i < 2 else (0, 255, 255)
+            screen.blit(self.overlay_font.render(str(row[0]), True, color), (x + 5, y + 5 + i * line_height))
+            for column, value in enumerate(row[1:]):
+                screen.blit(self.overlay_font.render(str(value), True, color),
+                            (x + 200 + column * 44, y + 5 + i * line_height))
+        ACTIVE = active
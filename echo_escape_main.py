@@ -1,40 +1,42 @@
 import pygame
-import random
 import math
 import time
 import os
+import numpy as np
 
 # Initialize Pygame and mixer
 pygame.init()
 pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
 
-# Constants
-SCREEN_WIDTH = 1024
-SCREEN_HEIGHT = 768
-FPS = 60
+from echo_escape_core import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS,
+    DARK_GRAY, DARKER_GRAY, CYAN, NEON_GREEN, NEON_BLUE, NEON_PINK,
+    WHITE, RED, SILVER,
+    GRID_SIZE, MAZE_WIDTH, MAZE_HEIGHT, ECHO_RADIUS, ECHO_DURATION,
+    ECHO_WAVE_SPEED, DANGER_RANGE, CAUTION_RANGE, ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN,
+    ACTION_ECHO, ACTION_INTERACT, OBJECT_COLLECTED, GameState)
+import echo_escape_core
+from echo_escape_export import SharedFrameExporter
+from echo_escape_renderers import object_kind, set_glow_layers
+from echo_escape_quality import QualityGovernor
+from echo_escape_hud import Hud
+from echo_escape_instrument import Instrumentation
+from echo_escape_metrics import Metrics, MetricsServer, MetricsFileWriter
+from echo_escape_particles import ParticleSystem, AmbientDust, Fireworks, echo_ripple, trap_burst
 
-# Enhanced Colors (Tech-noir palette with more depth)
-BLACK = (0, 0, 0)
-DARK_GRAY = (15, 15, 20)
-DARKER_GRAY = (8, 8, 12)
-CYAN = (0, 255, 255)
-NEON_GREEN = (57, 255, 20)
-NEON_BLUE = (0, 191, 255)
-NEON_PINK = (255, 20, 147)
-NEON_PURPLE = (138, 43, 226)
-WHITE = (255, 255, 255)
-GRAY = (128, 128, 128)
-RED = (255, 0, 0)
-GOLD = (255, 215, 0)
-SILVER = (192, 192, 192)
-
-# Game settings
-GRID_SIZE = 32
-MAZE_WIDTH = SCREEN_WIDTH // GRID_SIZE
-MAZE_HEIGHT = SCREEN_HEIGHT // GRID_SIZE
-ECHO_RADIUS = 150
-ECHO_DURATION = 2000  # milliseconds
-PLAYER_SPEED = 4
+# Renderer settings
+PLAYER_LIGHT_RADIUS = 80  # Objects within half of this are fully lit around the player
+LIGHT_DOWNSAMPLE = 4  # Light buffer is 1/N of the screen per axis; raise on weak machines
+MEMORY_MAP_ENABLED = False  # Remember walls seen by earlier pings (toggle with M)
+MEMORY_WALL_COLOR = (0, 90, 90, 70)  # Faint RGBA for remembered walls
+HINTS_ENABLED = False  # Arrow towards the current objective (toggle with H)
+WINDOW_SIZE = None  # Window size in pixels; None keeps SCREEN_WIDTH x SCREEN_HEIGHT
+SMOOTH_WORLD = True  # Upscale the world with smoothscale (False: nearest neighbour)
+WORLD_SCALE = 1.0  # Resolution the world is drawn at, as a share of SCREEN_WIDTH x SCREEN_HEIGHT
+HUD_SCALE = 1.0  # Resolution the HUD is drawn at, likewise
+QUALITY = "auto"  # Effect quality tier name, or "auto" to follow the frame budget
+IDLE_FPS = 10  # Frame rate on the start and end screens; 0 keeps the full FPS
+INSTRUMENT = None  # JSON path to count surfaces, blits and draw calls per frame into (F3/F4/F5)
 
 class SoundManager:
     def __init__(self):
@@ -294,95 +296,16 @@ class SoundManager:
         except Exception as e:
             print(f"Error playing sound {sound_name}: {e}")
 
-class Player:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.size = 16
-        self.last_echo_time = 0
-        
-    def move(self, dx, dy, maze):
-        new_x = self.x + dx
-        new_y = self.y + dy
-        
-        # Check collision with walls
-        grid_x = int(new_x // GRID_SIZE)
-        grid_y = int(new_y // GRID_SIZE)
-        
-        if (0 <= grid_x < MAZE_WIDTH and 0 <= grid_y < MAZE_HEIGHT and 
-            maze[grid_y][grid_x] == 0):
-            self.x = new_x
-            self.y = new_y
-    
-    def emit_echo(self):
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_echo_time > 500:  # Cooldown
-            self.last_echo_time = current_time
-            return True
-        return False
-    
-    def draw(self, screen):
-        # Create layered glow effect
-        glow_layers = [
-            (self.size + 8, 30),   # Outer glow
-            (self.size + 4, 60),   # Middle glow
-            (self.size + 2, 100)   # Inner glow
-        ]
-        
-        for glow_size, alpha in glow_layers:
-            glow_surface = pygame.Surface((glow_size * 2, glow_size * 2))
-            glow_surface.set_alpha(alpha)
-            pygame.draw.circle(glow_surface, CYAN, (glow_size, glow_size), glow_size)
-            screen.blit(glow_surface, (self.x - glow_size, self.y - glow_size))
-        
-        # Main player circle with gradient effect
-        pygame.draw.circle(screen, NEON_BLUE, (int(self.x), int(self.y)), self.size)
-        pygame.draw.circle(screen, (100, 200, 255), (int(self.x), int(self.y)), self.size - 2)
-        
-        # Inner core with pulsing effect
-        pulse = abs(math.sin(time.time() * 3)) * 0.3 + 0.7
-        inner_size = int((self.size - 6) * pulse)
-        pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), inner_size)
-        pygame.draw.circle(screen, NEON_BLUE, (int(self.x), int(self.y)), inner_size - 2)
-        
-        # Outer ring with enhanced glow
-        pygame.draw.circle(screen, CYAN, (int(self.x), int(self.y)), self.size + 2, 3)
-        pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), self.size + 1, 1)
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.size = 16
-        self.last_echo_time = 0
-        
-    def move(self, dx, dy, maze):
-        new_x = self.x + dx
-        new_y = self.y + dy
-        
-        # Check collision with walls
-        grid_x = int(new_x // GRID_SIZE)
-        grid_y = int(new_y // GRID_SIZE)
-        
-        if (0 <= grid_x < MAZE_WIDTH and 0 <= grid_y < MAZE_HEIGHT and 
-            maze[grid_y][grid_x] == 0):
-            self.x = new_x
-            self.y = new_y
-    
-    def emit_echo(self):
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_echo_time > 500:  # Cooldown
-            self.last_echo_time = current_time
-            return True
-        return False
-    
-    def draw(self, screen):
-        # Create layered glow effect
+class Player(echo_escape_core.Player):
+    def draw(self, screen, glow_count=3):
+        # Create layered glow effect; glow_count keeps the innermost layers
         glow_layers = [
             (self.size + 8, 30),   # Outer glow
             (self.size + 4, 60),   # Middle glow
             (self.size + 2, 100)   # Inner glow
         ]
         
-        for glow_size, alpha in glow_layers:
+        for glow_size, alpha in glow_layers[len(glow_layers) - glow_count:]:
             glow_surface = pygame.Surface((glow_size * 2, glow_size * 2))
             glow_surface.set_alpha(alpha)
             pygame.draw.circle(glow_surface, CYAN, (glow_size, glow_size), glow_size)
@@ -402,632 +325,75 @@ class Player:
         pygame.draw.circle(screen, CYAN, (int(self.x), int(self.y)), self.size + 2, 3)
         pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), self.size + 1, 1)
 
-class GameObject:
-    def __init__(self, x, y, obj_type, color, size=12):
-        self.x = x
-        self.y = y
-        self.type = obj_type
-        self.color = color
-        self.size = size
-        self.collected = False
-        self.unlocked = False
-        self.pulse_time = 0
-        self.triggered = False  # For traps
-        
-    def get_label(self, game_inventory=None, game_codes=None):
-        if self.type == "small_key":
-            return "Small Key - Use to open first chest"
-        elif self.type == "large_key":
-            return "Large Key - Needed for Terminal 3"
-        elif self.type == "document":
-            return "Document - Needed for Terminal 2"
-        elif self.type == "tool":
-            return "Tool - Use to open third chest"
-        elif self.type == "chest":
-            return self.get_chest_label(game_inventory)
-        elif self.type == "terminal":
-            return self.get_terminal_label(game_inventory, game_codes)
-        elif self.type == "code_puzzle":
-            return "Code Puzzle - Interact to reveal terminal code"
-        elif self.type == "exit":
-            return "EXIT - Escape to victory!"
-        elif self.type.startswith("trap_") and self.triggered:
-            trap_names = {
-                "trap_spike": "Spike Trap",
-                "trap_laser": "Laser Grid", 
-                "trap_shock": "Electric Trap",
-                "trap_pit": "Pit Trap",
-                "trap_gas": "Gas Trap",
-                "trap_blade": "Blade Trap",
-                "trap_fire": "Fire Trap"
-            }
-            return trap_names.get(self.type, "Trap")
-        else:
-            return ""
+class GameObject(echo_escape_core.GameObject):
+    __slots__ = ()
     
-    def get_chest_label(self, inventory):
-        if self.unlocked:
-            return "Open Chest - Already looted"
-        else:
-            if not inventory:
-                return "Locked Chest - Need small key"
-            elif "small_key" in inventory and "document" not in inventory:
-                return "Locked Chest - Use small key to open"
-            elif "document" in inventory and "tool" not in inventory:
-                return "Locked Chest - Use document to open"
-            elif "tool" in inventory and "large_key" not in inventory:
-                return "Locked Chest - Use tool to open"
-            else:
-                return "Locked Chest - Need correct item"
-    
-    def get_terminal_label(self, inventory, codes):
-        if not codes:
-            return "Terminal - Need code from puzzle"
-        elif "2048" in codes:
-            return "Terminal - Use code 2048"
-        elif "ECHO" in codes:
-            if "document" in inventory:
-                return "Terminal - Use code ECHO + document"
-            else:
-                return "Terminal - Need code ECHO + document"
-        elif "NEURAL" in codes:
-            if "large_key" in inventory:
-                return "Terminal - Use code NEURAL + large key"
-            else:
-                return "Terminal - Need code NEURAL + large key"
-        else:
-            return "Terminal - Need correct code + items"
-        
     def draw(self, screen, visible=True, show_label=False, font=None, game_inventory=None, game_codes=None):
         if not self.collected and visible:
             # Add pulsing effect
             self.pulse_time += 0.1
             pulse = abs(math.sin(self.pulse_time)) * 0.3 + 0.7
             
-            if self.type == "small_key":
-                # Enhanced small key with green glow
-                glow_layers = [(self.size * 2, 40), (self.size * 1.5, 80)]
-                for glow_size, alpha in glow_layers:
-                    glow_surface = pygame.Surface((glow_size * 2, glow_size * 2))
-                    glow_surface.set_alpha(int(alpha * pulse))
-                    pygame.draw.circle(glow_surface, self.color, (glow_size, glow_size), glow_size)
-                    screen.blit(glow_surface, (self.x - glow_size, self.y - glow_size))
-                
-                # Key head with gradient
-                pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size)
-                pygame.draw.circle(screen, (100, 255, 100), (int(self.x), int(self.y)), self.size - 2)
-                pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), self.size, 3)
-                
-                # Key shaft with 3D effect
-                shaft_rect = pygame.Rect(self.x - 4, self.y - self.size, 8, self.size)
-                pygame.draw.rect(screen, self.color, shaft_rect)
-                pygame.draw.rect(screen, (100, 255, 100), (self.x - 3, self.y - self.size + 1, 6, self.size - 2))
-                pygame.draw.rect(screen, WHITE, shaft_rect, 2)
-                
-                # Enhanced key teeth
-                teeth_points = [
-                    (self.x + 4, self.y - self.size + 4),
-                    (self.x + 10, self.y - self.size + 4),
-                    (self.x + 10, self.y - self.size + 8),
-                    (self.x + 4, self.y - self.size + 8)
-                ]
-                pygame.draw.polygon(screen, self.color, teeth_points)
-                pygame.draw.polygon(screen, WHITE, teeth_points, 2)
-                
-            elif self.type == "large_key":
-                # Enhanced large key with golden glow
-                glow_layers = [(self.size * 2.5, 50), (self.size * 2, 100)]
-                for glow_size, alpha in glow_layers:
-                    glow_surface = pygame.Surface((glow_size * 2, glow_size * 2))
-                    glow_surface.set_alpha(int(alpha * pulse))
-                    pygame.draw.circle(glow_surface, GOLD, (glow_size, glow_size), glow_size)
-                    screen.blit(glow_surface, (self.x - glow_size, self.y - glow_size))
-                
-                # Key head with metallic gradient
-                pygame.draw.circle(screen, GOLD, (int(self.x), int(self.y)), self.size)
-                pygame.draw.circle(screen, (255, 235, 100), (int(self.x), int(self.y)), self.size - 2)
-                pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), self.size, 4)
-                pygame.draw.circle(screen, GOLD, (int(self.x), int(self.y)), self.size - 4, 3)
-                
-                # Ornate shaft
-                shaft_rect = pygame.Rect(self.x - 6, self.y - self.size, 12, self.size)
-                pygame.draw.rect(screen, GOLD, shaft_rect)
-                pygame.draw.rect(screen, (255, 235, 100), (self.x - 5, self.y - self.size + 1, 10, self.size - 2))
-                pygame.draw.rect(screen, WHITE, shaft_rect, 3)
-                
-                # Elaborate teeth with details
-                teeth_points = [
-                    (self.x + 6, self.y - self.size + 3),
-                    (self.x + 14, self.y - self.size + 3),
-                    (self.x + 14, self.y - self.size + 6),
-                    (self.x + 11, self.y - self.size + 6),
-                    (self.x + 11, self.y - self.size + 9),
-                    (self.x + 14, self.y - self.size + 9),
-                    (self.x + 14, self.y - self.size + 12),
-                    (self.x + 6, self.y - self.size + 12)
-                ]
-                pygame.draw.polygon(screen, GOLD, teeth_points)
-                pygame.draw.polygon(screen, WHITE, teeth_points, 2)
-                
-            elif self.type == "document":
-                # Enhanced document with paper texture
-                glow_size = int(self.size * 1.5 * pulse)
-                glow_surface = pygame.Surface((glow_size * 2, glow_size * 2))
-                glow_surface.set_alpha(60)
-                pygame.draw.rect(glow_surface, SILVER, (0, 0, glow_size * 2, glow_size * 2))
-                screen.blit(glow_surface, (self.x - glow_size, self.y - glow_size))
-                
-                # Main document with shadow
-                shadow_rect = pygame.Rect(self.x - self.size + 2, self.y - self.size + 2, 
-                                         self.size * 2, self.size * 2)
-                pygame.draw.rect(screen, (50, 50, 50), shadow_rect)
-                
-                doc_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                      self.size * 2, self.size * 2)
-                pygame.draw.rect(screen, self.color, doc_rect)
-                pygame.draw.rect(screen, WHITE, (self.x - self.size + 2, self.y - self.size + 2, 
-                                               self.size * 2 - 4, self.size * 2 - 4))
-                pygame.draw.rect(screen, DARK_GRAY, doc_rect, 3)
-                
-                # Enhanced text lines with varying lengths
-                line_data = [(0.8, 3), (0.6, 6), (0.9, 9), (0.4, 12)]
-                for width_factor, y_offset in line_data:
-                    line_width = int(self.size * width_factor)
-                    line_y = self.y - self.size + y_offset
-                    pygame.draw.line(screen, DARK_GRAY, 
-                                   (self.x - line_width//2, line_y), 
-                                   (self.x + line_width//2, line_y), 2)
-                
-            elif self.type == "tool":
-                # Enhanced tool with metallic finish
-                glow_size = int(self.size * 1.4 * pulse)
-                glow_surface = pygame.Surface((glow_size * 2, glow_size * 2))
-                glow_surface.set_alpha(70)
-                pygame.draw.circle(glow_surface, (200, 100, 50), (glow_size, glow_size), glow_size)
-                screen.blit(glow_surface, (self.x - glow_size, self.y - glow_size))
-                
-                # Tool handle with grip texture
-                handle_rect = pygame.Rect(self.x - 3, self.y - self.size, 6, self.size * 2)
-                pygame.draw.rect(screen, self.color, handle_rect)
-                pygame.draw.rect(screen, (200, 100, 50), (self.x - 2, self.y - self.size + 2, 4, self.size * 2 - 4))
-                
-                # Grip lines
-                for i in range(4):
-                    grip_y = self.y - self.size//2 + i * 4
-                    pygame.draw.line(screen, (100, 50, 25), (self.x - 2, grip_y), (self.x + 2, grip_y), 1)
-                
-                # Tool head with metallic shine
-                head_rect = pygame.Rect(self.x - self.size, self.y - self.size//2, 
-                                       self.size * 2, self.size)
-                pygame.draw.rect(screen, self.color, head_rect)
-                pygame.draw.rect(screen, (200, 100, 50), (self.x - self.size + 2, self.y - self.size//2 + 2, 
-                                                         self.size * 2 - 4, self.size - 4))
-                pygame.draw.rect(screen, WHITE, head_rect, 3)
-                
-                # Tool details with shine
-                pygame.draw.circle(screen, SILVER, (int(self.x - self.size//2), int(self.y)), 3)
-                pygame.draw.circle(screen, WHITE, (int(self.x - self.size//2), int(self.y)), 3, 1)
-                pygame.draw.circle(screen, SILVER, (int(self.x + self.size//2), int(self.y)), 3)
-                pygame.draw.circle(screen, WHITE, (int(self.x + self.size//2), int(self.y)), 3, 1)
-                # Enhanced key shape with glow
-                glow_size = int(self.size * 1.5 * pulse)
-                pygame.draw.circle(screen, (*self.color, 100), (int(self.x), int(self.y)), glow_size)
-                
-                # Key head (circle)
-                pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size)
-                pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), self.size, 2)
-                
-                # Key shaft
-                shaft_rect = pygame.Rect(self.x - 4, self.y - self.size, 8, self.size)
-                pygame.draw.rect(screen, self.color, shaft_rect)
-                pygame.draw.rect(screen, WHITE, shaft_rect, 2)
-                
-                # Key teeth
-                teeth_points = [
-                    (self.x + 4, self.y - self.size + 4),
-                    (self.x + 8, self.y - self.size + 4),
-                    (self.x + 8, self.y - self.size + 8),
-                    (self.x + 4, self.y - self.size + 8)
-                ]
-                pygame.draw.polygon(screen, self.color, teeth_points)
-                
-            elif self.type == "chest":
-                # Enhanced chest with 3D effect and glow
-                glow_size = int(self.size * 1.8 * pulse)
-                glow_surface = pygame.Surface((glow_size * 2, glow_size * 2))
-                glow_surface.set_alpha(50)
-                pygame.draw.rect(glow_surface, NEON_PINK, (0, 0, glow_size * 2, glow_size * 2))
-                screen.blit(glow_surface, (self.x - glow_size, self.y - glow_size))
-                
-                # Shadow
-                shadow_rect = pygame.Rect(self.x - self.size + 3, self.y - self.size + 3, 
-                                         self.size * 2, self.size * 2)
-                pygame.draw.rect(screen, (30, 30, 30), shadow_rect)
-                
-                # Main chest body with gradient
-                base_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                       self.size * 2, self.size * 2)
-                pygame.draw.rect(screen, self.color, base_rect)
-                pygame.draw.rect(screen, (255, 100, 200), (self.x - self.size + 2, self.y - self.size + 2, 
-                                                          self.size * 2 - 4, self.size * 2 - 4))
-                pygame.draw.rect(screen, WHITE, base_rect, 4)
-                
-                # Chest lid with metallic bands
-                lid_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                      self.size * 2, self.size)
-                pygame.draw.rect(screen, (255, 150, 220), lid_rect)
-                pygame.draw.rect(screen, WHITE, lid_rect, 3)
-                
-                # Metallic bands
-                for i in range(3):
-                    band_y = self.y - self.size + 2 + i * 6
-                    pygame.draw.line(screen, SILVER, (self.x - self.size + 4, band_y), 
-                                   (self.x + self.size - 4, band_y), 2)
-                
-                # Lock or keyhole with enhanced detail
-                if not self.unlocked:
-                    # Lock body
-                    pygame.draw.circle(screen, (150, 0, 0), (int(self.x), int(self.y)), 8)
-                    pygame.draw.circle(screen, RED, (int(self.x), int(self.y)), 8, 3)
-                    pygame.draw.circle(screen, (200, 50, 50), (int(self.x), int(self.y)), 6)
-                    
-                    # Keyhole with depth
-                    pygame.draw.circle(screen, BLACK, (int(self.x), int(self.y)), 4)
-                    pygame.draw.circle(screen, (50, 50, 50), (int(self.x), int(self.y)), 3)
-                    pygame.draw.rect(screen, BLACK, (self.x - 2, self.y, 4, 6))
-                    pygame.draw.rect(screen, (50, 50, 50), (self.x - 1, self.y + 1, 2, 4))
-                else:
-                    # Open chest indicator with sparkle effect
-                    pygame.draw.circle(screen, NEON_GREEN, (int(self.x), int(self.y)), 6)
-                    pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), 6, 2)
-                    
-                    # Sparkle effects
-                    for i in range(4):
-                        angle = i * 90 + time.time() * 100
-                        rad = math.radians(angle)
-                        spark_x = self.x + math.cos(rad) * 10
-                        spark_y = self.y + math.sin(rad) * 10
-                        pygame.draw.circle(screen, WHITE, (int(spark_x), int(spark_y)), 2)
-                    
-            elif self.type == "terminal":
-                # Enhanced terminal with holographic screen effect
-                glow_size = int(self.size * 1.6 * pulse)
-                glow_surface = pygame.Surface((glow_size * 2, glow_size * 2))
-                glow_surface.set_alpha(60)
-                pygame.draw.rect(glow_surface, self.color, (0, 0, glow_size * 2, glow_size * 2))
-                screen.blit(glow_surface, (self.x - glow_size, self.y - glow_size))
-                
-                # Terminal base with depth
-                shadow_rect = pygame.Rect(self.x - self.size + 2, self.y - self.size + 2, 
-                                         self.size * 2, self.size * 2)
-                pygame.draw.rect(screen, (40, 40, 40), shadow_rect)
-                
-                base_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                       self.size * 2, self.size * 2)
-                pygame.draw.rect(screen, GRAY, base_rect)
-                pygame.draw.rect(screen, (160, 160, 160), (self.x - self.size + 2, self.y - self.size + 2, 
-                                                          self.size * 2 - 4, self.size * 2 - 4))
-                pygame.draw.rect(screen, WHITE, base_rect, 4)
-                
-                # Screen with holographic effect
-                screen_rect = pygame.Rect(self.x - self.size + 6, self.y - self.size + 6, 
-                                         self.size * 2 - 12, self.size * 2 - 12)
-                pygame.draw.rect(screen, BLACK, screen_rect)
-                pygame.draw.rect(screen, self.color, screen_rect, 3)
-                
-                # Screen glow layers
-                for i in range(3):
-                    glow_rect = pygame.Rect(self.x - self.size + 4 - i, self.y - self.size + 4 - i, 
-                                           self.size * 2 - 8 + i*2, self.size * 2 - 8 + i*2)
-                    glow_surface = pygame.Surface((glow_rect.width, glow_rect.height))
-                    glow_surface.set_alpha(30 - i*10)
-                    pygame.draw.rect(glow_surface, self.color, (0, 0, glow_rect.width, glow_rect.height))
-                    screen.blit(glow_surface, (glow_rect.x, glow_rect.y))
-                
-                # Animated terminal text lines
-                for i in range(4):
-                    line_y = self.y - self.size + 10 + i * 5
-                    line_alpha = int(150 + 100 * math.sin(time.time() * 2 + i))
-                    line_color = (*self.color[:3], line_alpha) if len(self.color) == 4 else self.color
-                    
-                    # Simulate text with varying line lengths
-                    line_length = self.size - 8 - (i % 2) * 4
-                    pygame.draw.line(screen, self.color, 
-                                   (self.x - line_length//2, line_y), 
-                                   (self.x + line_length//2, line_y), 2)
-                
-                # Corner LEDs
-                led_positions = [(-self.size + 4, -self.size + 4), (self.size - 4, -self.size + 4),
-                               (-self.size + 4, self.size - 4), (self.size - 4, self.size - 4)]
-                for led_x, led_y in led_positions:
-                    pygame.draw.circle(screen, NEON_GREEN, (int(self.x + led_x), int(self.y + led_y)), 2)
-                    pygame.draw.circle(screen, WHITE, (int(self.x + led_x), int(self.y + led_y)), 2, 1)
-                
-            elif self.type == "code_puzzle":
-                # Enhanced code puzzle with holographic circuit pattern
-                glow_layers = [(self.size * 1.8, 40), (self.size * 1.4, 80)]
-                for glow_size, alpha in glow_layers:
-                    glow_surface = pygame.Surface((glow_size * 2, glow_size * 2))
-                    glow_surface.set_alpha(int(alpha * pulse))
-                    pygame.draw.circle(glow_surface, self.color, (glow_size, glow_size), glow_size)
-                    screen.blit(glow_surface, (self.x - glow_size, self.y - glow_size))
-                
-                # Main circle with depth
-                pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size)
-                pygame.draw.circle(screen, (100, 255, 255), (int(self.x), int(self.y)), self.size - 2)
-                pygame.draw.circle(screen, BLACK, (int(self.x), int(self.y)), self.size - 6)
-                pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size, 3)
-                
-                # Animated circuit pattern
-                center_x, center_y = int(self.x), int(self.y)
-                time_offset = time.time() * 50
-                
-                for angle in range(0, 360, 30):
-                    rad = math.radians(angle + time_offset)
-                    # Inner ring
-                    start_x = center_x + math.cos(rad) * 6
-                    start_y = center_y + math.sin(rad) * 6
-                    mid_x = center_x + math.cos(rad) * (self.size - 8)
-                    mid_y = center_y + math.sin(rad) * (self.size - 8)
-                    end_x = center_x + math.cos(rad) * (self.size - 4)
-                    end_y = center_y + math.sin(rad) * (self.size - 4)
-                    
-                    # Animated circuit lines
-                    line_alpha = int(150 + 100 * math.sin(time.time() * 3 + angle/30))
-                    pygame.draw.line(screen, self.color, (start_x, start_y), (mid_x, mid_y), 2)
-                    pygame.draw.line(screen, WHITE, (mid_x, mid_y), (end_x, end_y), 1)
-                    
-                    # Circuit nodes
-                    pygame.draw.circle(screen, WHITE, (int(mid_x), int(mid_y)), 2)
-                
-                # Pulsing center core
-                core_size = int(4 + 2 * math.sin(time.time() * 4))
-                pygame.draw.circle(screen, WHITE, (center_x, center_y), core_size)
-                pygame.draw.circle(screen, self.color, (center_x, center_y), core_size - 1)
-                
-            elif self.type == "exit":
-                # Enhanced exit with dramatic glow and animation
-                glow_layers = [(self.size * 2.5, 30), (self.size * 2, 60), (self.size * 1.5, 120)]
-                for glow_size, alpha in glow_layers:
-                    glow_surface = pygame.Surface((glow_size * 2, glow_size * 2))
-                    glow_surface.set_alpha(int(alpha * pulse))
-                    pygame.draw.rect(glow_surface, self.color, (0, 0, glow_size * 2, glow_size * 2))
-                    screen.blit(glow_surface, (self.x - glow_size, self.y - glow_size))
-                
-                # Main exit portal with depth
-                base_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                       self.size * 2, self.size * 2)
-                pygame.draw.rect(screen, self.color, base_rect)
-                pygame.draw.rect(screen, (100, 255, 100), (self.x - self.size + 3, self.y - self.size + 3, 
-                                                          self.size * 2 - 6, self.size * 2 - 6))
-                pygame.draw.rect(screen, WHITE, base_rect, 5)
-                
-                # Inner portal effect
-                inner_rect = pygame.Rect(self.x - self.size + 6, self.y - self.size + 6, 
-                                        self.size * 2 - 12, self.size * 2 - 12)
-                pygame.draw.rect(screen, BLACK, inner_rect)
-                pygame.draw.rect(screen, self.color, inner_rect, 3)
-                
-                # Swirling energy effect
-                for i in range(8):
-                    angle = i * 45 + time.time() * 100
-                    rad = math.radians(angle)
-                    energy_x = self.x + math.cos(rad) * (self.size - 10)
-                    energy_y = self.y + math.sin(rad) * (self.size - 10)
-                    energy_size = int(3 + 2 * math.sin(time.time() * 2 + i))
-                    pygame.draw.circle(screen, NEON_GREEN, (int(energy_x), int(energy_y)), energy_size)
-                
-                # Enhanced exit arrow with glow
-                arrow_points = [
-                    (self.x - 8, self.y),
-                    (self.x + 4, self.y - 8),
-                    (self.x + 4, self.y - 3),
-                    (self.x + 10, self.y - 3),
-                    (self.x + 10, self.y + 3),
-                    (self.x + 4, self.y + 3),
-                    (self.x + 4, self.y + 8)
-                ]
-                pygame.draw.polygon(screen, WHITE, arrow_points)
-                pygame.draw.polygon(screen, NEON_GREEN, arrow_points, 2)
-                
-            # All trap types are now completely invisible when not triggered
-            elif self.type.startswith("trap_") and not self.triggered:
-                # Traps are completely invisible - no visual hints at all
-                pass
-                
-            elif self.type == "trap_spike":
-                if self.triggered:
-                    # Visible spike trap (triggered)
-                    base_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                           self.size * 2, self.size * 2)
-                    pygame.draw.rect(screen, (100, 50, 50), base_rect)
-                    pygame.draw.rect(screen, RED, base_rect, 2)
-                    
-                    # Spikes
-                    for i in range(3):
-                        for j in range(3):
-                            spike_x = self.x - self.size + 4 + i * 8
-                            spike_y = self.y - self.size + 4 + j * 8
-                            spike_points = [
-                                (spike_x, spike_y + 6),
-                                (spike_x + 3, spike_y),
-                                (spike_x + 6, spike_y + 6)
-                            ]
-                            pygame.draw.polygon(screen, RED, spike_points)
-                else:
-                    # Hidden trap - only show subtle floor difference during echo
-                    if visible:
-                        floor_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                               self.size * 2, self.size * 2)
-                        pygame.draw.rect(screen, (40, 40, 45), floor_rect)
-                        pygame.draw.rect(screen, (60, 60, 65), floor_rect, 1)
-                        
-            elif self.type == "trap_laser":
-                if self.triggered:
-                    # Visible laser grid
-                    for i in range(3):
-                        laser_y = self.y - self.size + i * self.size // 1.5
-                        pygame.draw.line(screen, RED, 
-                                       (self.x - self.size, laser_y), 
-                                       (self.x + self.size, laser_y), 2)
-                        # Laser glow
-                        pygame.draw.line(screen, (255, 100, 100), 
-                                       (self.x - self.size, laser_y), 
-                                       (self.x + self.size, laser_y), 4)
-                else:
-                    # Hidden - show as normal floor with slight shimmer
-                    if visible:
-                        floor_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                               self.size * 2, self.size * 2)
-                        shimmer_color = (30 + int(10 * pulse), 30 + int(10 * pulse), 35 + int(10 * pulse))
-                        pygame.draw.rect(screen, shimmer_color, floor_rect)
-                        
-            elif self.type == "trap_shock":
-                if self.triggered:
-                    # Electric trap with lightning effect
-                    base_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                           self.size * 2, self.size * 2)
-                    pygame.draw.rect(screen, (50, 50, 100), base_rect)
-                    pygame.draw.rect(screen, NEON_BLUE, base_rect, 2)
-                    
-                    # Lightning bolts
-                    for i in range(4):
-                        angle = i * 90 + self.pulse_time * 50
-                        rad = math.radians(angle)
-                        end_x = self.x + math.cos(rad) * self.size
-                        end_y = self.y + math.sin(rad) * self.size
-                        pygame.draw.line(screen, CYAN, (self.x, self.y), (end_x, end_y), 2)
-                        pygame.draw.line(screen, WHITE, (self.x, self.y), (end_x, end_y), 1)
-                else:
-                    # Hidden - metallic floor panel
-                    if visible:
-                        floor_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                               self.size * 2, self.size * 2)
-                        pygame.draw.rect(screen, (60, 60, 70), floor_rect)
-                        pygame.draw.rect(screen, (80, 80, 90), floor_rect, 1)
-                        
-            elif self.type == "trap_pit":
-                if self.triggered:
-                    # Open pit trap
-                    pit_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                          self.size * 2, self.size * 2)
-                    pygame.draw.rect(screen, BLACK, pit_rect)
-                    pygame.draw.rect(screen, (100, 50, 50), pit_rect, 3)
-                    
-                    # Jagged edges
-                    for i in range(8):
-                        angle = i * 45
-                        rad = math.radians(angle)
-                        edge_x = self.x + math.cos(rad) * (self.size - 4)
-                        edge_y = self.y + math.sin(rad) * (self.size - 4)
-                        pygame.draw.circle(screen, (80, 40, 40), (int(edge_x), int(edge_y)), 3)
-                else:
-                    # Hidden pit - slightly different floor
-                    if visible:
-                        floor_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                               self.size * 2, self.size * 2)
-                        pygame.draw.rect(screen, (35, 35, 40), floor_rect)
-                        pygame.draw.rect(screen, (50, 50, 55), floor_rect, 1)
-                        
-            elif self.type == "trap_gas":
-                if self.triggered:
-                    # Visible gas cloud
-                    for i in range(5):
-                        cloud_x = self.x + random.randint(-self.size, self.size)
-                        cloud_y = self.y + random.randint(-self.size, self.size)
-                        cloud_size = random.randint(8, 16)
-                        cloud_alpha = random.randint(100, 180)
-                        
-                        cloud_surface = pygame.Surface((cloud_size * 2, cloud_size * 2))
-                        cloud_surface.set_alpha(cloud_alpha)
-                        pygame.draw.circle(cloud_surface, (100, 150, 100), 
-                                         (cloud_size, cloud_size), cloud_size)
-                        screen.blit(cloud_surface, (cloud_x - cloud_size, cloud_y - cloud_size))
-                else:
-                    # Hidden gas vent
-                    if visible:
-                        floor_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                               self.size * 2, self.size * 2)
-                        pygame.draw.rect(screen, (50, 60, 50), floor_rect)
-                        pygame.draw.rect(screen, (70, 80, 70), floor_rect, 1)
-                        
-            elif self.type == "trap_blade":
-                if self.triggered:
-                    # Spinning blades
-                    blade_angle = self.pulse_time * 200
-                    for i in range(4):
-                        angle = blade_angle + i * 90
-                        rad = math.radians(angle)
-                        blade_start_x = self.x + math.cos(rad) * 4
-                        blade_start_y = self.y + math.sin(rad) * 4
-                        blade_end_x = self.x + math.cos(rad) * (self.size - 2)
-                        blade_end_y = self.y + math.sin(rad) * (self.size - 2)
-                        
-                        pygame.draw.line(screen, (200, 200, 220), 
-                                       (blade_start_x, blade_start_y), 
-                                       (blade_end_x, blade_end_y), 3)
-                        pygame.draw.line(screen, WHITE, 
-                                       (blade_start_x, blade_start_y), 
-                                       (blade_end_x, blade_end_y), 1)
-                else:
-                    # Hidden blade mechanism
-                    if visible:
-                        floor_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                               self.size * 2, self.size * 2)
-                        pygame.draw.rect(screen, (70, 70, 80), floor_rect)
-                        pygame.draw.rect(screen, (90, 90, 100), floor_rect, 1)
-                        
-            elif self.type == "trap_fire":
-                if self.triggered:
-                    # Fire effect
-                    for i in range(6):
-                        flame_x = self.x + random.randint(-8, 8)
-                        flame_y = self.y + random.randint(-self.size, self.size//2)
-                        flame_size = random.randint(4, 12)
-                        
-                        # Fire colors
-                        fire_colors = [(255, 100, 0), (255, 150, 0), (255, 200, 50), (255, 255, 100)]
-                        fire_color = random.choice(fire_colors)
-                        
-                        pygame.draw.circle(screen, fire_color, (int(flame_x), int(flame_y)), flame_size)
-                        if flame_size > 6:
-                            pygame.draw.circle(screen, (255, 255, 150), 
-                                             (int(flame_x), int(flame_y)), flame_size - 4)
-                else:
-                    # Hidden fire trap
-                    if visible:
-                        floor_rect = pygame.Rect(self.x - self.size, self.y - self.size, 
-                                               self.size * 2, self.size * 2)
-                        pygame.draw.rect(screen, (60, 50, 50), floor_rect)
-                        pygame.draw.rect(screen, (80, 70, 70), floor_rect, 1)
-                        
+            kind = object_kind(self.store.type_code[self.index])
+            kind.renderer.draw_batch(screen, self.store, np.array([self.index]), np.array([pulse]))
+            
             # Draw label if requested
             if show_label and font:
-                label_text = self.get_label(game_inventory, game_codes)
-                if label_text:  # Only draw if there's text to show
-                    text_surface = font.render(label_text, True, WHITE)
-                    text_rect = text_surface.get_rect()
-                    
-                    # Position label above object
-                    label_x = self.x - text_rect.width // 2
-                    label_y = self.y - self.size - 25
-                    
-                    # Background for label
-                    bg_rect = pygame.Rect(label_x - 4, label_y - 2, 
-                                         text_rect.width + 8, text_rect.height + 4)
-                    
-                    # Create semi-transparent surface for background
-                    bg_surface = pygame.Surface((bg_rect.width, bg_rect.height))
-                    bg_surface.set_alpha(180)
-                    bg_surface.fill((20, 20, 30))
-                    screen.blit(bg_surface, (bg_rect.x, bg_rect.y))
-                    pygame.draw.rect(screen, CYAN, bg_rect, 1)
-                    
-                    screen.blit(text_surface, (label_x, label_y))
+                self.draw_label(screen, font, game_inventory, game_codes)
+    
+    def draw_label(self, screen, font, game_inventory=None, game_codes=None):
+        """Returns the rect the label covers, if one was drawn"""
+        if self.collected:
+            return None
+        return object_kind(self.store.type_code[self.index]).label.draw(screen, font, self, game_inventory, game_codes)
+
+def scaled_rect(rect, scale):
+    """rect on a layer drawn at scale; neighbouring rects stay neighbours"""
+    left, top = int(rect.left * scale), int(rect.top * scale)
+    return pygame.Rect(left, top, int(rect.right * scale) - left, int(rect.bottom * scale) - top)
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    def __init__(self, autoplayer=None, window_size=WINDOW_SIZE, smooth_world=SMOOTH_WORLD,
+                 quality=QUALITY, idle_fps=IDLE_FPS, instrument=INSTRUMENT,
+                 world_scale=WORLD_SCALE, hud_scale=HUD_SCALE):
+        # Drawing code works in SCREEN_WIDTH x SCREEN_HEIGHT coordinates. When the
+        # window has another size, or the world or HUD scale is below 1, the world
+        # and the HUD are drawn to off-screen layers of world_scale and hud_scale
+        # times that resolution and scaled to the window when presented: the world
+        # with the smooth_world filter, the HUD with nearest neighbour so text
+        # edges stay sharp. Full-screen passes (background, memory map, lighting)
+        # run at the layer's resolution; sprites are drawn at the internal one
+        # and shrunk rect by rect (see draw_scaled).
+        # Instrumentation replaces pygame's Surface, Font and draw functions, so it
+        # goes in first; its counts only see off-screen surfaces
+        self.instrumentation = None
+        if instrument:
+            self.instrumentation = Instrumentation(instrument)
+            self.instrumentation.install()
+        
+        if world_scale <= 0 or hud_scale <= 0:
+            raise ValueError(f"World and HUD scales must be positive, not {world_scale} and {hud_scale}")
+        window_size = tuple(window_size or (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.window = pygame.display.set_mode(window_size)
+        self.world_scale = world_scale
+        self.hud_scale = hud_scale
+        self.world_size = (round(SCREEN_WIDTH * world_scale), round(SCREEN_HEIGHT * world_scale))
+        self.scaled = window_size != (SCREEN_WIDTH, SCREEN_HEIGHT) or world_scale != 1 or hud_scale != 1
+        self.smooth_world = smooth_world
+        if self.scaled:
+            # The start screen is drawn straight to self.screen at full resolution
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.world_surface = pygame.Surface(self.world_size)
+            self.hud_layer = pygame.Surface((round(SCREEN_WIDTH * hud_scale), round(SCREEN_HEIGHT * hud_scale)),
+                                            pygame.SRCALPHA)
+            self.hud_window = pygame.Surface(window_size, pygame.SRCALPHA)
+            self.hud_frame = None  # Full-resolution HUD for composed_frame, made on first use
+            self.sprite_scratch = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        elif self.instrumentation:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = self.window
+        self.hud_drawn = False
         pygame.display.set_caption("Echo Escape")
         self.clock = pygame.time.Clock()
         self.running = True
@@ -1035,372 +401,237 @@ class Game:
         # Initialize sound manager
         self.sound_manager = SoundManager()
         
-        # Game state
-        self.game_state = "start_screen"  # start_screen, playing, game_over, victory
-        self.inventory = []
-        self.codes_found = []
-        self.terminals_solved = 0
-        self.game_won = False
-        self.game_over = False
-        self.death_message = ""
-        self.flash_message = ""
-        self.flash_message_time = 0
-        
-        # Echo system
-        self.echo_active = False
-        self.echo_start_time = 0
-        self.echo_center = (0, 0)
-        
-        # Initialize empty game objects (will be created when game starts)
-        self.player = None
-        self.objects = []
-        self.maze = []
+        # Screen shown by the front end; the rules live in the simulation core
+        self.game_state = "start_screen"  # start_screen, playing
+        self.state = GameState(clock=pygame.time.get_ticks,
+                               player_class=Player, object_class=GameObject)
+        self.labelled_objects = []
+        
+        # Fog-of-war memory of walls revealed by past pings
+        self.memory_map_enabled = MEMORY_MAP_ENABLED
+        self.hints_enabled = HINTS_ENABLED
+        self.memory_cells = pygame.Surface((MAZE_WIDTH, MAZE_HEIGHT), pygame.SRCALPHA)
+        self.memory_layer = pygame.Surface(self.world_size, pygame.SRCALPHA)
+        self.reset_memory_map()
+        
+        # Lighting: walls and objects are drawn into the world layer, which is
+        # multiplied by one light buffer per frame before it reaches the screen
+        self.world_layer = pygame.Surface(self.world_size, pygame.SRCALPHA)
+        self.light_mask = pygame.Surface(self.world_size, pygame.SRCALPHA)
+        self.light_sources = []  # Extra (x, y, radius, strength) lights
+        self.set_light_downsample(LIGHT_DOWNSAMPLE)
         
         # Font for UI
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        self.hud = Hud(self.font, self.small_font, hud_scale)
+        
+        # Optional bot (see echo_escape_bot) that plays through the normal input path
+        self.autoplayer = autoplayer
+        self.autoplay_restart_delay = 2000  # Keep end screens up this long (ms)
+        self.autoplay_end_time = None
+        
+        # Optional shared memory exporter (see echo_escape_export)
+        self.exporter = None
+        
+        # Optional health metrics (see echo_escape_metrics)
+        self.metrics = None
+        self.metrics_output = None
+        
+        # Effect tiers follow the frame time unless a tier is pinned
+        self.quality = QualityGovernor()
+        self.quality.listeners.append(lambda tier: set_glow_layers(tier.glow_layers))
+        if quality != "auto":
+            self.quality.pin(quality)
+        
+        # Menus and end screens redraw at idle_fps and otherwise sleep until
+        # input arrives; screen_usage is [cpu seconds, wall seconds] per screen
+        self.idle_fps = idle_fps
+        self.pending_events = []
+        self.screen_usage = {}
+        
+        # Particle pools: background dust, world effects and the victory overlay
+        self.dust_particles = ParticleSystem(capacity=256)
+        self.effect_particles = ParticleSystem()
+        self.overlay_particles = ParticleSystem()
+        self.dust = AmbientDust(self.dust_particles, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.fireworks = Fireworks(self.overlay_particles,
+                                   (SCREEN_WIDTH//2 - 200, SCREEN_HEIGHT//2 - 150, 400, 200))
+        
+    @property
+    def world_frame(self):
+        """Surface the world is drawn to: the screen itself at full world scale"""
+        return self.world_surface if self.world_scale != 1 else self.screen
+    
+    def draw_scaled(self, target, scale, draw, *args, rects=None):
+        """Call draw(*args), which draws to self.screen in SCREEN_WIDTH x
+        SCREEN_HEIGHT coordinates and returns the rects it touched, so that the
+        result lands on target, a layer drawn at scale. Below 1 the drawing goes
+        to a scratch frame and only the touched rects are shrunk, copied and
+        cleared again, so sprites cost about the area they cover.
+        
+        Sprites blitted with surface alpha make the scratch opaque where they
+        land, so an opaque target passes rects up front instead: those parts
+        of target are enlarged into the scratch before drawing and replaced by
+        the result afterwards."""
+        screen = self.screen
+        if scale == 1:
+            self.screen = target
+            draw(*args)
+            self.screen = screen
+            return
         
-    def generate_maze(self):
-        # Simple maze generation - create walls and open spaces
-        self.maze = [[0 for _ in range(MAZE_WIDTH)] for _ in range(MAZE_HEIGHT)]
-        
-        # Add border walls
-        for x in range(MAZE_WIDTH):
-            self.maze[0][x] = 1
-            self.maze[MAZE_HEIGHT-1][x] = 1
-        for y in range(MAZE_HEIGHT):
-            self.maze[y][0] = 1
-            self.maze[y][MAZE_WIDTH-1] = 1
-            
-        # Add some internal walls randomly (avoid starting area)
-        start_grid_x = 2
-        start_grid_y = SCREEN_HEIGHT // 2 // GRID_SIZE
-        
-        for _ in range(50):
-            x = random.randint(2, MAZE_WIDTH-3)
-            y = random.randint(2, MAZE_HEIGHT-3)
-            
-            # Don't place walls too close to starting position
-            if abs(x - start_grid_x) > 2 or abs(y - start_grid_y) > 2:
-                self.maze[y][x] = 1
-            
-        # Add some wall clusters for more interesting layout (avoid start area)
-        for _ in range(10):
-            x = random.randint(3, MAZE_WIDTH-4)
-            y = random.randint(3, MAZE_HEIGHT-4)
-            
-            # Don't place wall clusters too close to starting position
-            if abs(x - start_grid_x) > 3 or abs(y - start_grid_y) > 3:
-                for dx in range(-1, 2):
-                    for dy in range(-1, 2):
-                        if 0 <= x+dx < MAZE_WIDTH and 0 <= y+dy < MAZE_HEIGHT:
-                            self.maze[y+dy][x+dx] = 1
+        scratch = self.sprite_scratch
+        bounds = scratch.get_rect()
+        scaled_rects = [(rect, scaled_rect(rect, scale)) for rect in (rect.clip(bounds) for rect in rects or ())]
+        for rect, area in scaled_rects:
+            if area.width > 0 and area.height > 0:
+                scratch.blit(pygame.transform.scale(target.subsurface(area), rect.size), rect)
+        
+        self.screen = scratch
+        drawn = draw(*args)
+        self.screen = screen
+        if rects is None:
+            scaled_rects = [(rect, scaled_rect(rect, scale)) for rect in (rect.clip(bounds) for rect in drawn or ())]
+        
+        for rect, area in scaled_rects:
+            if area.width > 0 and area.height > 0:
+                target.blit(pygame.transform.smoothscale(scratch.subsurface(rect), area.size), area)
+            scratch.fill((0, 0, 0, 0), rect)
     
-    def place_objects(self):
-        self.objects = []
-        
-        # Find valid positions (not walls, not too close to start)
-        start_grid_x = 2  # Player starts at x = GRID_SIZE * 2
-        start_grid_y = SCREEN_HEIGHT // 2 // GRID_SIZE  # Player starts at middle height
-        
-        valid_positions = []
-        for y in range(2, MAZE_HEIGHT-2):
-            for x in range(2, MAZE_WIDTH-2):
-                if (self.maze[y][x] == 0 and 
-                    abs(x - start_grid_x) > 4 and abs(y - start_grid_y) > 3):  # Avoid start area
-                    valid_positions.append((x * GRID_SIZE + GRID_SIZE//2, 
-                                          y * GRID_SIZE + GRID_SIZE//2))
-        
-        random.shuffle(valid_positions)
-        
-        # Place objects for three-chest progression
-        if len(valid_positions) >= 12:
-            pos_index = 0
-            
-            # Only place small key as standalone object (others come from chests)
-            self.objects.append(GameObject(valid_positions[pos_index][0], valid_positions[pos_index][1], 
-                                         "small_key", NEON_GREEN, 8))
-            pos_index += 1
-            
-            # Three chests for progression (document, tool, large_key come from these)
-            for i in range(3):
-                self.objects.append(GameObject(valid_positions[pos_index][0], valid_positions[pos_index][1], 
-                                             "chest", NEON_PINK, 16))
-                pos_index += 1
-            
-            # Code puzzles (3 needed for terminals)
-            for i in range(3):
-                self.objects.append(GameObject(valid_positions[pos_index][0], valid_positions[pos_index][1], 
-                                             "code_puzzle", CYAN, 12))
-                pos_index += 1
-            
-            # Terminals (3 needed to complete game)
-            for i in range(3):
-                self.objects.append(GameObject(valid_positions[pos_index][0], valid_positions[pos_index][1], 
-                                             "terminal", WHITE, 20))
-                pos_index += 1
-            
-            # 7 deadly traps, well spaced
-            trap_types = ["trap_spike", "trap_laser", "trap_shock", "trap_pit", "trap_gas", "trap_blade", "trap_fire"]
-            trap_positions = []
-            
-            for i in range(7):
-                attempts = 0
-                while attempts < 50 and pos_index < len(valid_positions):
-                    pos = valid_positions[pos_index]
-                    
-                    # Ensure traps are well separated (at least 100 units apart)
-                    too_close = False
-                    for trap_pos in trap_positions:
-                        if math.sqrt((pos[0] - trap_pos[0])**2 + (pos[1] - trap_pos[1])**2) < 100:
-                            too_close = True
-                            break
-                    
-                    if not too_close:
-                        trap_type = trap_types[i]
-                        self.objects.append(GameObject(pos[0], pos[1], trap_type, RED, 20))
-                        trap_positions.append(pos)
-                        break
-                    
-                    pos_index += 1
-                    attempts += 1
-                
-                pos_index += 1
+    def reset_memory_map(self):
+        """Forget every remembered cell"""
+        self.memory_cells.fill((0, 0, 0, 0))
+        self.memory_layer.fill((0, 0, 0, 0))
     
-    def handle_interaction(self):
-        player_rect = pygame.Rect(self.player.x - 16, self.player.y - 16, 32, 32)
-        
-        for obj in self.objects:
-            if obj.collected:
-                continue
-                
-            obj_rect = pygame.Rect(obj.x - obj.size, obj.y - obj.size, 
-                                 obj.size * 2, obj.size * 2)
+    def remember_walls(self, newly_seen_walls):
+        """Write walls a finished ping revealed for the first time into the memory
+        layer. Only those cells are touched, so the cost does not grow with how
+        much of the maze has already been explored."""
+        if newly_seen_walls.any():
+            # surfarray is indexed [x, y]; the low-res surface has one pixel per cell
+            wall_columns = newly_seen_walls.T
+            rgb = pygame.surfarray.pixels3d(self.memory_cells)
+            rgb[wall_columns] = MEMORY_WALL_COLOR[:3]
+            del rgb
+            alpha = pygame.surfarray.pixels_alpha(self.memory_cells)
+            alpha[wall_columns] = MEMORY_WALL_COLOR[3]
+            del alpha
             
-            if player_rect.colliderect(obj_rect):
-                if obj.type == "small_key":
-                    obj.collected = True
-                    self.inventory.append("small_key")
-                    self.sound_manager.play_sound('collect')
-                    return f"Found small key!"
-                    
-                elif obj.type == "chest" and not obj.unlocked:
-                    # First chest: needs small key, gives document
-                    if "small_key" in self.inventory and "document" not in self.inventory:
-                        obj.unlocked = True
-                        self.inventory.append("document")
-                        self.sound_manager.play_sound('chest')
-                        return f"Opened chest with small key! Found document."
-                    # Second chest: needs document, gives tool
-                    elif "document" in self.inventory and "tool" not in self.inventory:
-                        obj.unlocked = True
-                        self.inventory.append("tool")
-                        self.sound_manager.play_sound('chest')
-                        return f"Opened chest with document! Found tool."
-                    # Third chest: needs tool, gives large key
-                    elif "tool" in self.inventory and "large_key" not in self.inventory:
-                        obj.unlocked = True
-                        self.inventory.append("large_key")
-                        self.sound_manager.play_sound('chest')
-                        return f"Opened chest with tool! Found large key."
-                    else:
-                        return f"Chest is locked. Need the right item to open it."
-                        
-                elif obj.type == "code_puzzle":
-                    codes = ["2048", "ECHO", "NEURAL"]
-                    code = random.choice([c for c in codes if c not in self.codes_found])
-                    if code:
-                        self.codes_found.append(code)
-                        obj.collected = True
-                        self.sound_manager.play_sound('code')
-                        return f"Found code: {code}"
-                    
-                elif obj.type == "terminal":
-                    # Terminal 1: Requires code "2048" only
-                    if "2048" in self.codes_found:
-                        obj.collected = True
-                        self.terminals_solved += 1
-                        self.codes_found.remove("2048")
-                        self.sound_manager.play_sound('terminal')
-                        
-                        if self.check_all_requirements_met():
-                            return self.spawn_exit_with_message()
-                        
-                        return f"Terminal solved with code 2048!"
-                        
-                    # Terminal 2: Requires code "ECHO" and document
-                    elif "ECHO" in self.codes_found and "document" in self.inventory:
-                        obj.collected = True
-                        self.terminals_solved += 1
-                        self.codes_found.remove("ECHO")
-                        self.sound_manager.play_sound('terminal')
-                        
-                        if self.check_all_requirements_met():
-                            return self.spawn_exit_with_message()
-                        
-                        return f"Terminal solved with code ECHO and document!"
-                        
-                    # Terminal 3: Requires code "NEURAL" and large key
-                    elif "NEURAL" in self.codes_found and "large_key" in self.inventory:
-                        obj.collected = True
-                        self.terminals_solved += 1
-                        self.codes_found.remove("NEURAL")
-                        self.sound_manager.play_sound('terminal')
-                        
-                        if self.check_all_requirements_met():
-                            return self.spawn_exit_with_message()
-                        
-                        return f"Terminal solved with code NEURAL and large key!"
-                        
-                    else:
-                        return f"Terminal needs a specific code and required items."
-                        
-                elif obj.type == "exit":
-                    self.game_won = True
-                    self.sound_manager.play_sound('victory')
-                    return f"Escaped! You win!"
-        
-        return None
+            pygame.transform.scale(self.memory_cells, self.world_size, self.memory_layer)
     
-    def check_all_requirements_met(self):
-        """Check if all requirements are met before allowing exit to spawn"""
-        # Must have solved all 3 terminals
-        if self.terminals_solved < 3:
-            return False
-        
-        # Must have collected all essential items
-        required_items = ["small_key", "document", "tool", "large_key"]
-        for item in required_items:
-            if item not in self.inventory:
-                return False
-        
-        # Must have opened all chests
-        chests_opened = 0
-        for obj in self.objects:
-            if obj.type == "chest" and obj.unlocked:
-                chests_opened += 1
-        
-        if chests_opened < 3:
-            return False
-        
-        # Must have found and used all codes
-        all_codes_used = len(self.codes_found) == 0  # All codes should be used up
-        
-        return all_codes_used
+    def draw_memory_map(self):
+        """Blit the remembered-wall layer in a single call"""
+        if self.memory_map_enabled:
+            self.world_frame.blit(self.memory_layer, (0, 0))
     
-    def spawn_exit_with_message(self):
-        # Spawn exit
-        valid_pos = self.find_valid_position()
-        if valid_pos:
-            self.objects.append(GameObject(valid_pos[0], valid_pos[1], 
-                                         "exit", NEON_GREEN, 24))
-        
-        # Set flash message
-        self.flash_message = "ALL TERMINALS SOLVED! FIND THE EXIT!"
-        self.flash_message_time = pygame.time.get_ticks()
-        
-        return f"All terminals solved! The exit has appeared - find it to escape!"
+    def draw_maze(self):
+        # Pings expire in GameState.step, which also hands their walls to the
+        # memory map; one that outlived ECHO_DURATION here lights nothing
+        current_time = self.state.now()
+        
+        if self.state.echo_pings:
+            intensity = self.state.echo_intensity(current_time)
+            wall_shading = self.quality.tier.wall_shading
+            cell = GRID_SIZE * self.world_scale
+            bevel = max(1, round(2 * self.world_scale))
+            
+            # Walls are drawn at full strength into the world layer; the
+            # lighting pass fades them with the echo in a single blend
+            lit_walls = np.nonzero(self.state.wall_mask & (intensity > 0))
+            for y, x, alpha in zip(lit_walls[0].tolist(), lit_walls[1].tolist(),
+                                   (intensity[lit_walls] * 255).astype(int).tolist()):
+                left, top = round(x * cell), round(y * cell)
+                wall_rect = pygame.Rect(left, top, round((x + 1) * cell) - left, round((y + 1) * cell) - top)
+                
+                # Wall shadow/depth, main surface and highlight
+                if wall_shading:
+                    self.world_layer.fill((0, 100, 100), wall_rect.move(bevel, bevel))
+                self.world_layer.fill(CYAN, wall_rect)
+                if wall_shading:
+                    self.world_layer.fill((85, 255, 255), wall_rect.inflate(-2 * bevel, -2 * bevel))
+                
+                # Wall border
+                if alpha > 100:
+                    pygame.draw.rect(self.world_layer, WHITE, wall_rect, 1)
     
-    def check_traps(self):
-        player_rect = pygame.Rect(self.player.x - 12, self.player.y - 12, 24, 24)
+    def draw_echo_overlays(self):
+        """Draw the echo ring and safety indicator on top of the lit scene"""
+        current_time = self.state.now()
+        if not self.state.echo_pings or current_time - self.state.echo_start_time >= ECHO_DURATION:
+            return
         
-        for obj in self.objects:
-            if obj.type.startswith("trap_") and not obj.triggered:
-                obj_rect = pygame.Rect(obj.x - obj.size//2, obj.y - obj.size//2, 
-                                     obj.size, obj.size)
-                
-                if player_rect.colliderect(obj_rect):
-                    obj.triggered = True
-                    self.game_over = True
-                    self.sound_manager.play_sound('trap')
-                    self.sound_manager.play_sound('death')
-                    
-                    trap_messages = {
-                        "trap_spike": "GAME OVER: Impaled by hidden spikes!",
-                        "trap_laser": "GAME OVER: Disintegrated by laser grid!",
-                        "trap_shock": "GAME OVER: Electrocuted by shock trap!",
-                        "trap_pit": "GAME OVER: Fell into a deadly pit!",
-                        "trap_gas": "GAME OVER: Poisoned by toxic gas!",
-                        "trap_blade": "GAME OVER: Sliced by spinning blades!",
-                        "trap_fire": "GAME OVER: Incinerated by flames!"
-                    }
-                    
-                    self.death_message = trap_messages.get(obj.type, "GAME OVER: Killed by trap!")
-                    return True
+        # Echo rings expanding towards ECHO_RADIUS
+        for ping in self.state.echo_pings:
+            ring_radius = int((current_time - ping.start_time) * ECHO_WAVE_SPEED)
+            if 0 < ring_radius <= ECHO_RADIUS:
+                pygame.draw.circle(self.screen, (0, 120, 120),
+                                   (int(ping.center[0]), int(ping.center[1])), ring_radius, 2)
+        
+        # Indicator follows the most recent ping
+        echo_x, echo_y = self.state.echo_center
         
-        return False
+        # Draw subtle trap hints during echo (now removed - traps are invisible)
+        self.draw_trap_hints(echo_x, echo_y, current_time)
+        
+        # Draw safety indicator
+        self.draw_safety_indicator(echo_x, echo_y, current_time)
     
-    def find_valid_position(self):
-        for _ in range(100):
-            x = random.randint(2, MAZE_WIDTH-3) * GRID_SIZE + GRID_SIZE//2
-            y = random.randint(2, MAZE_HEIGHT-3) * GRID_SIZE + GRID_SIZE//2
-            
-            # Check if position is free
-            grid_x, grid_y = x // GRID_SIZE, y // GRID_SIZE
-            if self.maze[grid_y][grid_x] == 0:
-                # Check distance from other objects
-                too_close = False
-                for obj in self.objects:
-                    if math.sqrt((x - obj.x)**2 + (y - obj.y)**2) < 64:
-                        too_close = True
-                        break
-                if not too_close:
-                    return (x, y)
-        return None
+    def set_light_downsample(self, factor):
+        """Resize the light buffer; larger factors are cheaper on weak machines"""
+        self.light_downsample = max(1, int(factor))
+        width = -(-SCREEN_WIDTH // self.light_downsample)
+        height = -(-SCREEN_HEIGHT // self.light_downsample)
+        
+        # Pixel centers of the buffer, shaped for broadcasting to (height, width)
+        self.light_x = (np.arange(width) * self.light_downsample + self.light_downsample / 2)[np.newaxis, :]
+        self.light_y = (np.arange(height) * self.light_downsample + self.light_downsample / 2)[:, np.newaxis]
+        self.light_cell_x = np.minimum(self.light_x // GRID_SIZE, MAZE_WIDTH - 1).astype(int)
+        self.light_cell_y = np.minimum(self.light_y // GRID_SIZE, MAZE_HEIGHT - 1).astype(int)
+        self.light_buffer = pygame.Surface((width, height), pygame.SRCALPHA)
     
-    def draw_maze(self):
-        current_time = pygame.time.get_ticks()
-        echo_visible = (self.echo_active and 
-                       current_time - self.echo_start_time < ECHO_DURATION)
-        
-        if echo_visible:
-            # Draw enhanced walls within echo radius
-            echo_x, echo_y = self.echo_center
-            for y in range(MAZE_HEIGHT):
-                for x in range(MAZE_WIDTH):
-                    if self.maze[y][x] == 1:
-                        wall_x = x * GRID_SIZE + GRID_SIZE // 2
-                        wall_y = y * GRID_SIZE + GRID_SIZE // 2
-                        distance = math.sqrt((wall_x - echo_x)**2 + (wall_y - echo_y)**2)
-                        
-                        if distance <= ECHO_RADIUS:
-                            # Enhanced fade effect with multiple layers
-                            time_factor = 1 - (current_time - self.echo_start_time) / ECHO_DURATION
-                            distance_factor = 1 - (distance / ECHO_RADIUS)
-                            alpha = int(255 * time_factor * distance_factor)
-                            
-                            # Main wall with depth
-                            wall_rect = pygame.Rect(x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-                            
-                            # Wall shadow/depth
-                            shadow_surface = pygame.Surface((GRID_SIZE, GRID_SIZE))
-                            shadow_surface.set_alpha(alpha // 2)
-                            shadow_surface.fill((0, 100, 100))
-                            self.screen.blit(shadow_surface, (x * GRID_SIZE + 2, y * GRID_SIZE + 2))
-                            
-                            # Main wall surface
-                            wall_surface = pygame.Surface((GRID_SIZE, GRID_SIZE))
-                            wall_surface.set_alpha(alpha)
-                            wall_surface.fill(CYAN)
-                            self.screen.blit(wall_surface, (x * GRID_SIZE, y * GRID_SIZE))
-                            
-                            # Wall highlight
-                            highlight_surface = pygame.Surface((GRID_SIZE - 4, GRID_SIZE - 4))
-                            highlight_surface.set_alpha(alpha // 3)
-                            highlight_surface.fill(WHITE)
-                            self.screen.blit(highlight_surface, (x * GRID_SIZE + 2, y * GRID_SIZE + 2))
-                            
-                            # Wall border
-                            if alpha > 100:
-                                pygame.draw.rect(self.screen, WHITE, wall_rect, 1)
-            
-            # Draw subtle trap hints during echo (now removed - traps are invisible)
-            self.draw_trap_hints(echo_x, echo_y, current_time)
-            
-            # Draw safety indicator
-            self.draw_safety_indicator(echo_x, echo_y, current_time)
+    def compute_light(self, current_time):
+        """Light intensity (0..1) for every buffer pixel from the echo, the player
+        glow and any extra light sources"""
+        light = np.zeros((self.light_y.shape[0], self.light_x.shape[1]), dtype=np.float32)
+        
+        if self.state.echo_pings:
+            intensity = self.state.echo_intensity(current_time)
+            light = intensity[self.light_cell_y, self.light_cell_x].astype(np.float32)
+        
+        sources = list(self.light_sources)
+        if self.state.player and not self.state.game_over:
+            sources.append((self.state.player.x, self.state.player.y, PLAYER_LIGHT_RADIUS, 1.0))
+        
+        for source_x, source_y, radius, strength in sources:
+            # Full strength inside half the radius, linear falloff to the edge
+            distance = np.hypot(self.light_x - source_x, self.light_y - source_y)
+            falloff = np.clip(2 - 2 * distance / radius, 0.0, 1.0) * strength
+            np.maximum(light, falloff, out=light)
+        
+        return light
+    
+    def draw_lighting(self):
+        """Multiply the world layer by this frame's light buffer and composite it"""
+        light = self.compute_light(self.state.now())
+        
+        # surfarray is indexed [x, y]; RGB and alpha all carry the intensity
+        level = (light.T * 255).astype(np.uint8)
+        rgb = pygame.surfarray.pixels3d(self.light_buffer)
+        rgb[...] = level[:, :, np.newaxis]
+        del rgb
+        alpha = pygame.surfarray.pixels_alpha(self.light_buffer)
+        alpha[...] = level
+        del alpha
+        
+        if self.light_buffer.get_size() != self.world_size:
+            pygame.transform.smoothscale(self.light_buffer, self.world_size, self.light_mask)
+            mask = self.light_mask
         else:
-            self.echo_active = False
+            mask = self.light_buffer
+        
+        self.world_layer.blit(mask, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        self.world_frame.blit(self.world_layer, (0, 0))
     
     def draw_start_screen(self):
         """Draw the start game screen"""
@@ -1512,86 +743,52 @@ class Game:
     
     def draw_background(self):
         """Draw enhanced background with gradient and subtle effects"""
-        # Create gradient background
-        for y in range(SCREEN_HEIGHT):
-            color_factor = y / SCREEN_HEIGHT
-            r = int(DARKER_GRAY[0] + (DARK_GRAY[0] - DARKER_GRAY[0]) * color_factor)
-            g = int(DARKER_GRAY[1] + (DARK_GRAY[1] - DARKER_GRAY[1]) * color_factor)
-            b = int(DARKER_GRAY[2] + (DARK_GRAY[2] - DARKER_GRAY[2]) * color_factor)
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (SCREEN_WIDTH, y))
-        
-        # Add subtle grid pattern
-        grid_alpha = 15
-        grid_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        grid_surface.set_alpha(grid_alpha)
+        world = self.world_frame
+        width, height = self.world_size
+        scale = self.world_scale
         
-        for x in range(0, SCREEN_WIDTH, GRID_SIZE):
-            pygame.draw.line(grid_surface, CYAN, (x, 0), (x, SCREEN_HEIGHT))
-        for y in range(0, SCREEN_HEIGHT, GRID_SIZE):
-            pygame.draw.line(grid_surface, CYAN, (0, y), (SCREEN_WIDTH, y))
-            
-        self.screen.blit(grid_surface, (0, 0))
-        
-        # Add ambient particles
-        current_time = pygame.time.get_ticks()
-        for i in range(20):
-            particle_x = (i * 137 + current_time * 0.01) % SCREEN_WIDTH
-            particle_y = (i * 211 + current_time * 0.005) % SCREEN_HEIGHT
-            particle_alpha = int(30 + 20 * math.sin(current_time * 0.001 + i))
-            
-            particle_surface = pygame.Surface((2, 2))
-            particle_surface.set_alpha(particle_alpha)
-            particle_surface.fill(CYAN)
-            self.screen.blit(particle_surface, (particle_x, particle_y))
-        """Draw enhanced background with gradient and subtle effects"""
         # Create gradient background
-        for y in range(SCREEN_HEIGHT):
-            color_factor = y / SCREEN_HEIGHT
+        for y in range(height):
+            color_factor = y / height
             r = int(DARKER_GRAY[0] + (DARK_GRAY[0] - DARKER_GRAY[0]) * color_factor)
             g = int(DARKER_GRAY[1] + (DARK_GRAY[1] - DARKER_GRAY[1]) * color_factor)
             b = int(DARKER_GRAY[2] + (DARK_GRAY[2] - DARKER_GRAY[2]) * color_factor)
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (SCREEN_WIDTH, y))
+            pygame.draw.line(world, (r, g, b), (0, y), (width, y))
         
         # Add subtle grid pattern
-        grid_alpha = 15
-        grid_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        grid_alpha = 29
+        grid_surface = pygame.Surface((width, height))
         grid_surface.set_alpha(grid_alpha)
         
         for x in range(0, SCREEN_WIDTH, GRID_SIZE):
-            pygame.draw.line(grid_surface, CYAN, (x, 0), (x, SCREEN_HEIGHT))
+            pygame.draw.line(grid_surface, CYAN, (round(x * scale), 0), (round(x * scale), height))
         for y in range(0, SCREEN_HEIGHT, GRID_SIZE):
-            pygame.draw.line(grid_surface, CYAN, (0, y), (SCREEN_WIDTH, y))
+            pygame.draw.line(grid_surface, CYAN, (0, round(y * scale)), (width, round(y * scale)))
             
-        self.screen.blit(grid_surface, (0, 0))
+        world.blit(grid_surface, (0, 0))
         
         # Add ambient particles
-        current_time = pygame.time.get_ticks()
-        for i in range(20):
-            particle_x = (i * 137 + current_time * 0.01) % SCREEN_WIDTH
-            particle_y = (i * 211 + current_time * 0.005) % SCREEN_HEIGHT
-            particle_alpha = int(30 + 20 * math.sin(current_time * 0.001 + i))
-            
-            particle_surface = pygame.Surface((2, 2))
-            particle_surface.set_alpha(particle_alpha)
-            particle_surface.fill(CYAN)
-            self.screen.blit(particle_surface, (particle_x, particle_y))
+        self.dust.update(self.quality.tier.ambient_particles)
+        self.dust_particles.update(pygame.time.get_ticks())
+        self.dust_particles.draw(world, self.world_scale)
     
     def draw_safety_indicator(self, echo_x, echo_y, current_time):
         """Draw safety indicator during echo ping"""
-        time_factor = 1 - (current_time - self.echo_start_time) / ECHO_DURATION
-        
-        # Check for nearby traps
-        nearby_traps = []
-        immediate_danger = False
-        
-        for obj in self.objects:
-            if obj.type.startswith("trap_") and not obj.triggered:
-                distance = math.sqrt((obj.x - self.player.x)**2 + (obj.y - self.player.y)**2)
-                
-                if distance <= 60:  # Immediate danger zone
-                    immediate_danger = True
-                elif distance <= 120:  # Nearby danger zone
-                    nearby_traps.append(obj)
+        time_factor = 1 - (current_time - self.state.echo_start_time) / ECHO_DURATION
+        
+        # Check the traps around the player's cell that the ping revealed
+        objects = self.state.objects
+        player_x, player_y = self.state.player.x, self.state.player.y
+        candidates = self.state.danger.traps_near(player_x, player_y)
+        candidates = candidates[self.state.echo_visibility[objects.y[candidates] // GRID_SIZE,
+                                                           objects.x[candidates] // GRID_SIZE]]
+        trap_dx = objects.x[candidates] - player_x
+        trap_dy = objects.y[candidates] - player_y
+        distances = np.hypot(trap_dx, trap_dy)
+        
+        immediate_danger = bool((distances <= DANGER_RANGE).any())  # Immediate danger zone
+        nearby = (distances > DANGER_RANGE) & (distances <= CAUTION_RANGE)  # Nearby danger zone
+        nearby_traps = list(zip(trap_dx[nearby].tolist(), trap_dy[nearby].tolist(), distances[nearby].tolist()))
         
         # Determine safety status
         if immediate_danger:
@@ -1612,14 +809,14 @@ class Game:
         ring_surface = pygame.Surface((120, 120))
         ring_surface.set_alpha(alpha)
         pygame.draw.circle(ring_surface, ring_color, (60, 60), 60, 4)
-        self.screen.blit(ring_surface, (self.player.x - 60, self.player.y - 60))
+        self.screen.blit(ring_surface, (self.state.player.x - 60, self.state.player.y - 60))
         
         # Draw inner safety circle
         inner_alpha = int(50 * time_factor)
         inner_surface = pygame.Surface((80, 80))
         inner_surface.set_alpha(inner_alpha)
         pygame.draw.circle(inner_surface, ring_color, (40, 40), 40)
-        self.screen.blit(inner_surface, (self.player.x - 40, self.player.y - 40))
+        self.screen.blit(inner_surface, (self.state.player.x - 40, self.state.player.y - 40))
         
         # Draw status text above player
         font_alpha = int(255 * time_factor)
@@ -1631,20 +828,15 @@ class Game:
         bg_surface.set_alpha(int(180 * time_factor))
         bg_surface.fill((0, 0, 0))
         
-        text_x = self.player.x - text_rect.width // 2
-        text_y = self.player.y - 50
+        text_x = self.state.player.x - text_rect.width // 2
+        text_y = self.state.player.y - 50
         
         self.screen.blit(bg_surface, (text_x - 4, text_y - 2))
         self.screen.blit(text_surface, (text_x, text_y))
         
         # Draw directional indicators for nearby traps (CAUTION mode)
         if nearby_traps and not immediate_danger:
-            for obj in nearby_traps:
-                # Calculate direction to trap
-                dx = obj.x - self.player.x
-                dy = obj.y - self.player.y
-                distance = math.sqrt(dx*dx + dy*dy)
-                
+            for dx, dy, distance in nearby_traps:
                 if distance > 0:
                     # Normalize direction
                     dx /= distance
@@ -1652,8 +844,8 @@ class Game:
                     
                     # Draw directional arrow
                     arrow_distance = 35
-                    arrow_x = self.player.x + dx * arrow_distance
-                    arrow_y = self.player.y + dy * arrow_distance
+                    arrow_x = self.state.player.x + dx * arrow_distance
+                    arrow_y = self.state.player.y + dy * arrow_distance
                     
                     # Arrow points
                     arrow_size = 8
@@ -1674,258 +866,318 @@ class Game:
                     
                     self.screen.blit(arrow_surface, (arrow_x - 25, arrow_y - 25))
     
+    def draw_objective_hint(self):
+        """Arrow next to the player along the shortest path to the current objective"""
+        player = self.state.player
+        if self.state.game_over or not player:
+            return
+        field = self.state.navigation.objective_field()
+        cell = (int(player.x // GRID_SIZE), int(player.y // GRID_SIZE))
+        next_cell = field.next_cell(cell)
+        if next_cell is None:
+            return
+        
+        # Neighbouring cells, so this is a unit step along one axis
+        dx = next_cell[0] - cell[0]
+        dy = next_cell[1] - cell[1]
+        
+        arrow_x = player.x + dx * 28
+        arrow_y = player.y + dy * 28
+        arrow_size = 7
+        arrow_points = [
+            (arrow_x + dx * arrow_size, arrow_y + dy * arrow_size),
+            (arrow_x - dx * arrow_size + dy * arrow_size/2, arrow_y - dy * arrow_size - dx * arrow_size/2),
+            (arrow_x - dx * arrow_size - dy * arrow_size/2, arrow_y - dy * arrow_size + dx * arrow_size/2)
+        ]
+        pygame.draw.polygon(self.screen, NEON_GREEN, arrow_points)
+    
     def draw_trap_hints(self, echo_x, echo_y, current_time):
         """Traps are now completely invisible - no hints provided"""
         pass
     
     def draw_objects(self):
-        current_time = pygame.time.get_ticks()
-        echo_visible = (self.echo_active and 
-                       current_time - self.echo_start_time < ECHO_DURATION)
-        
-        if echo_visible:
-            echo_x, echo_y = self.echo_center
-            for obj in self.objects:
-                distance = math.sqrt((obj.x - echo_x)**2 + (obj.y - echo_y)**2)
-                if distance <= ECHO_RADIUS:
-                    # Check if player is close enough for label
-                    player_distance = math.sqrt((obj.x - self.player.x)**2 + (obj.y - self.player.y)**2)
-                    show_label = player_distance <= 60
-                    obj.draw(self.screen, True, show_label, self.small_font, self.inventory, self.codes_found)
-        
-        # Always draw objects very close to player
-        for obj in self.objects:
-            distance = math.sqrt((obj.x - self.player.x)**2 + (obj.y - self.player.y)**2)
-            if distance <= 40:  # Very close proximity
-                show_label = distance <= 60
-                obj.draw(self.screen, True, show_label, self.small_font, self.inventory, self.codes_found)
+        objects = self.state.objects
+        distances = objects.distances(self.state.player.x, self.state.player.y)
+        indices = self.state.visible_object_indices(self.state.now(), distances)
+        indices = indices[(objects.flags[indices] & OBJECT_COLLECTED) == 0]
+        
+        # Pulse every visible object at once, then draw each type in one pass
+        objects.pulse_time[indices] += 0.1
+        pulses = np.abs(np.sin(objects.pulse_time[indices])) * 0.3 + 0.7
+        self.draw_scaled(self.world_layer, self.world_scale, self.draw_object_sprites, indices, pulses)
+        
+        # Labels go on the HUD after lighting so they stay readable
+        self.labelled_objects = [objects[index] for index in indices[distances[indices] <= 60].tolist()]
+    
+    def draw_object_sprites(self, indices, pulses):
+        """Draw each type in one pass; returns a rect around each object that
+        covers its glow"""
+        objects = self.state.objects
+        type_codes = objects.type_code[indices]
+        for type_code in np.unique(type_codes):
+            of_type = type_codes == type_code
+            object_kind(type_code).renderer.draw_batch(self.screen, objects, indices[of_type], pulses[of_type])
+        reach = 3 * objects.size[indices].astype(int) + 8
+        return [pygame.Rect(x - r, y - r, 2 * r, 2 * r) for x, y, r in
+                zip(objects.x[indices].tolist(), objects.y[indices].tolist(), reach.tolist())]
+    
+    def draw_object_labels(self):
+        rects = [obj.draw_label(self.screen, self.small_font, self.state.inventory, self.state.codes_found)
+                 for obj in self.labelled_objects]
+        return [rect for rect in rects if rect]
     
     def draw_ui(self):
-        # Enhanced UI with better styling
-        ui_alpha = 200
-        
-        # Create semi-transparent panels for UI elements
-        def draw_ui_panel(x, y, width, height, color=(0, 0, 0)):
-            panel_surface = pygame.Surface((width, height))
-            panel_surface.set_alpha(ui_alpha)
-            panel_surface.fill(color)
-            self.screen.blit(panel_surface, (x, y))
-            pygame.draw.rect(self.screen, CYAN, (x, y, width, height), 2)
-        
-        # Left panel for game info - make it larger to accommodate inventory
-        panel_width = 400
-        panel_height = 140
-        draw_ui_panel(10, 10, panel_width, panel_height)
-        
-        # Inventory with enhanced styling and word wrapping
-        y_offset = 20
-        inventory_items = ', '.join(self.inventory) if self.inventory else 'EMPTY'
-        
-        # Handle long inventory text by wrapping it
-        max_chars_per_line = 45  # Adjust based on panel width
-        if len(inventory_items) > max_chars_per_line:
-            # Split long inventory into multiple lines
-            words = inventory_items.split(', ')
-            lines = []
-            current_line = "INVENTORY: "
-            
-            for word in words:
-                if len(current_line + word + ', ') <= max_chars_per_line:
-                    if current_line == "INVENTORY: ":
-                        current_line += word
-                    else:
-                        current_line += ', ' + word
-                else:
-                    lines.append(current_line)
-                    current_line = '           ' + word  # Indent continuation
-            
-            if current_line.strip():
-                lines.append(current_line)
-            
-            # Draw each line
-            for i, line in enumerate(lines):
-                text_surface = self.small_font.render(line, True, NEON_GREEN)
-                self.screen.blit(text_surface, (20, y_offset + i * 20))
-            
-            y_offset += len(lines) * 20
-        else:
-            inventory_text = f"INVENTORY: {inventory_items}"
-            text_surface = self.small_font.render(inventory_text, True, NEON_GREEN)
-            self.screen.blit(text_surface, (20, y_offset))
-            y_offset += 25
-        
-        # Codes found
-        codes_text = f"CODES: {', '.join(self.codes_found) if self.codes_found else 'NONE'}"
-        text_surface = self.small_font.render(codes_text, True, CYAN)
-        self.screen.blit(text_surface, (20, y_offset))
-        y_offset += 25
-        
-        # Terminals solved with progress bar
-        terminals_text = f"TERMINALS: {self.terminals_solved}/3"
-        text_surface = self.small_font.render(terminals_text, True, NEON_PINK)
-        self.screen.blit(text_surface, (20, y_offset))
-        y_offset += 25
-        
-        # Progress bar for terminals
-        progress_width = 250
-        progress_height = 8
-        progress_x = 20
-        progress_y = y_offset
-        
-        # Progress background
-        pygame.draw.rect(self.screen, DARK_GRAY, (progress_x, progress_y, progress_width, progress_height))
-        pygame.draw.rect(self.screen, WHITE, (progress_x, progress_y, progress_width, progress_height), 1)
-        
-        # Progress fill
-        if self.terminals_solved > 0:
-            fill_width = int((self.terminals_solved / 3) * progress_width)
-            pygame.draw.rect(self.screen, NEON_PINK, (progress_x, progress_y, fill_width, progress_height))
-        
-        # Right panel for instructions
-        instruction_panel_width = 220
-        instruction_panel_height = 160
-        draw_ui_panel(SCREEN_WIDTH - instruction_panel_width - 10, 10, 
-                     instruction_panel_width, instruction_panel_height)
-        
-        # Enhanced instructions
-        instructions = [
-            ("CONTROLS:", WHITE),
-            ("SPACE: Echo Ping", CYAN),
-            ("E: Interact", NEON_GREEN),
-            ("Arrow Keys: Move", NEON_BLUE),
-            ("ESC: Quit", RED),
-            ("", WHITE),
-            ("BEWARE:", NEON_PINK),
-            ("Hidden Traps!", RED)
-        ]
+        """Blit the cached HUD widgets, then the victory fireworks"""
+        self.hud.draw(self.screen, self.state)
         
-        for i, (instruction, color) in enumerate(instructions):
-            if instruction:  # Skip empty lines
-                text_surface = self.small_font.render(instruction, True, color)
-                self.screen.blit(text_surface, (SCREEN_WIDTH - instruction_panel_width + 10, 20 + i * 18))
-        
-        # Game over screen with enhanced styling
-        if self.game_over:
-            # Dark overlay with gradient
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            for y in range(SCREEN_HEIGHT):
-                alpha = int(180 * (y / SCREEN_HEIGHT))
-                overlay.set_alpha(alpha)
-                pygame.draw.line(overlay, (20, 0, 0), (0, y), (SCREEN_WIDTH, y))
-            self.screen.blit(overlay, (0, 0))
-            
-            # Death message with glow effect
-            death_surface = self.font.render(self.death_message, True, RED)
-            glow_surface = self.font.render(self.death_message, True, (100, 0, 0))
-            
-            text_rect = death_surface.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 20))
-            glow_rect = glow_surface.get_rect(center=(SCREEN_WIDTH//2 + 2, SCREEN_HEIGHT//2 - 18))
-            
-            self.screen.blit(glow_surface, glow_rect)
-            self.screen.blit(death_surface, text_rect)
-            
-            restart_text = self.small_font.render("Press R to restart or ESC to quit", True, WHITE)
-            restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20))
-            self.screen.blit(restart_text, restart_rect)
-        
-        # Win screen with celebration effects
-        elif self.game_won:
-            # Victory overlay with green tint
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.set_alpha(150)
-            overlay.fill((0, 40, 0))
-            self.screen.blit(overlay, (0, 0))
-            
-            # Animated victory text
-            pulse = abs(math.sin(time.time() * 3)) * 0.3 + 0.7
-            win_color = (int(NEON_GREEN[0] * pulse), int(NEON_GREEN[1] * pulse), int(NEON_GREEN[2] * pulse))
-            
-            win_text = self.font.render("YOU ESCAPED!", True, win_color)
-            text_rect = win_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 40))
-            self.screen.blit(win_text, text_rect)
-            
-            success_text = self.small_font.render("You navigated the deadly maze successfully!", True, WHITE)
-            success_rect = success_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 10))
-            self.screen.blit(success_text, success_rect)
-            
-            # Play again option
-            play_again_text = self.small_font.render("Press R to play again or ESC to quit", True, CYAN)
-            play_again_rect = play_again_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20))
-            self.screen.blit(play_again_text, play_again_rect)
-            
-            # Victory sparkles
-            for i in range(10):
-                sparkle_x = SCREEN_WIDTH//2 + random.randint(-100, 100)
-                sparkle_y = SCREEN_HEIGHT//2 + random.randint(-50, 50)
-                sparkle_size = random.randint(2, 6)
-                sparkle_alpha = int(255 * random.random())
-                
-                sparkle_surface = pygame.Surface((sparkle_size, sparkle_size))
-                sparkle_surface.set_alpha(sparkle_alpha)
-                sparkle_surface.fill(NEON_GREEN)
-                self.screen.blit(sparkle_surface, (sparkle_x, sparkle_y))
+        if self.state.game_won:
+            # Victory fireworks
+            current_time = pygame.time.get_ticks()
+            self.fireworks.update(current_time, self.quality.tier.victory_sparkles * 8)
+            self.overlay_particles.update(current_time)
+            self.overlay_particles.draw(self.screen, self.hud_scale)
     
-    def start_new_game(self):
+    def start_new_game(self, seed=None):
         """Initialize a new game"""
+        build_start = time.perf_counter()
         self.game_state = "playing"
-        self.inventory = []
-        self.codes_found = []
-        self.terminals_solved = 0
-        self.game_won = False
-        self.game_over = False
-        self.death_message = ""
-        self.flash_message = ""
-        self.flash_message_time = 0
-        
-        # Reset echo system
-        self.echo_active = False
-        self.echo_start_time = 0
-        self.echo_center = (0, 0)
-        
-        # Generate maze and objects
-        self.generate_maze()
-        self.place_objects()
-        
-        # Create player at middle left position
-        start_x = GRID_SIZE * 2  # Left side of screen
-        start_y = SCREEN_HEIGHT // 2  # Middle height
-        self.player = Player(start_x, start_y)
+        self.state.reset(seed)
+        self.reset_memory_map()
+        self.effect_particles.clear()
+        self.overlay_particles.clear()
+        if self.metrics:
+            self.metrics.restarted(time.perf_counter() - build_start)
     
     def restart_game(self):
         """Reset game state for restart"""
-        self.game_state = "playing"
-        self.inventory = []
-        self.codes_found = []
-        self.terminals_solved = 0
-        self.game_won = False
-        self.game_over = False
-        self.death_message = ""
-        self.flash_message = ""
-        self.flash_message_time = 0
-        
-        # Reset echo system
-        self.echo_active = False
-        self.echo_start_time = 0
-        self.echo_center = (0, 0)
-        
-        # Regenerate maze and objects
-        self.generate_maze()
-        self.place_objects()
-        
-        # Reset player position to middle left
-        start_x = GRID_SIZE * 2  # Left side of screen
-        start_y = SCREEN_HEIGHT // 2  # Middle height
-        self.player = Player(start_x, start_y)
+        self.start_new_game()
+    
+    def handle_state_events(self):
+        """Play sounds and update render caches for what the last step did"""
+        for kind, payload in self.state.events:
+            if kind == "sound":
+                self.sound_manager.play_sound(payload)
+                if payload == "echo":
+                    echo_ripple(self.effect_particles, *self.state.echo_center)
+            elif kind == "remember":
+                self.remember_walls(payload)
+            elif kind == "trap":
+                trap_burst(self.effect_particles, self.state.player.x, self.state.player.y, payload)
+    
+    def draw_game(self, message="", message_time=0, current_time=0):
+        """Render one frame of gameplay to the screen"""
+        self.draw_background()
+        self.draw_memory_map()
+        self.world_layer.fill((0, 0, 0, 0))
+        self.draw_maze()
+        self.draw_objects()
+        self.draw_lighting()
+        self.draw_scaled(self.world_frame, self.world_scale, self.draw_world_overlays,
+                         rects=self.world_overlay_rects())
+        
+        self.effect_particles.update(pygame.time.get_ticks())
+        self.effect_particles.draw(self.world_frame, self.world_scale)
+        
+        # Draw UI, on its own layer when the frame is scaled to the window
+        if self.scaled:
+            frame = self.screen
+            self.hud_layer.fill((0, 0, 0, 0))
+            self.screen = self.hud_layer
+            self.hud_drawn = True
+        self.draw_scaled(self.screen, self.hud_scale, self.draw_object_labels)
+        self.draw_ui()
+        self.draw_scaled(self.screen, self.hud_scale, self.draw_messages, message, message_time, current_time)
+        
+        if self.scaled:
+            self.screen = frame
+    
+    def draw_world_overlays(self):
+        """Echo rings, safety indicator, objective hint and the player on top of
+        the lit scene"""
+        self.draw_echo_overlays()
+        if self.hints_enabled:
+            self.draw_objective_hint()
+        
+        # Draw player (always visible if alive)
+        if not self.state.game_over and self.state.player:
+            self.state.player.draw(self.screen, self.quality.tier.glow_layers)
+    
+    def world_overlay_rects(self):
+        """Rects draw_world_overlays can reach"""
+        player = self.state.player
+        rects = [pygame.Rect(ping.center[0] - ECHO_RADIUS - 2, ping.center[1] - ECHO_RADIUS - 2,
+                             2 * ECHO_RADIUS + 4, 2 * ECHO_RADIUS + 4) for ping in self.state.echo_pings]
+        if player:
+            # Safety rings, status text and trap arrows stay within 80 pixels
+            rects.append(pygame.Rect(player.x - 80, player.y - 80, 160, 160))
+        return rects
+    
+    def draw_messages(self, message, message_time, current_time):
+        """Draw the latest message and any flash message; returns their rects"""
+        rects = []
+        
+        # Draw message
+        if message and current_time - message_time < 4000:
+            text_surface = self.font.render(message, True, NEON_GREEN)
+            text_rect = text_surface.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 50))
+            rects.append(self.screen.blit(text_surface, text_rect))
+        
+        # Draw flash message (priority over regular message)
+        if self.state.flash_message and current_time - self.state.flash_message_time < 5000:
+            # Flashing effect
+            flash_alpha = int(255 * (0.5 + 0.5 * math.sin(current_time * 0.01)))
+            flash_color = (255, flash_alpha, 0)  # Orange flashing
+            
+            flash_surface = self.font.render(self.state.flash_message, True, flash_color)
+            flash_rect = flash_surface.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 100))
+            
+            # Background for flash message
+            bg_surface = pygame.Surface((flash_rect.width + 20, flash_rect.height + 10))
+            bg_surface.set_alpha(150)
+            bg_surface.fill((50, 25, 0))
+            rects.append(self.screen.blit(bg_surface, (flash_rect.x - 10, flash_rect.y - 5)))
+            
+            self.screen.blit(flash_surface, flash_rect)
+        return rects
+    
+    def present(self):
+        """Scale this frame's world and HUD to the window"""
+        if not self.scaled:
+            if self.screen is not self.window:
+                self.window.blit(self.screen, (0, 0))
+            return
+        window_size = self.window.get_size()
+        if not self.hud_drawn:
+            # Screens that are all text (start screen) scale like the HUD
+            pygame.transform.scale(self.screen, window_size, self.window)
+            return
+        
+        world = self.world_frame
+        if world.get_size() == window_size:
+            self.window.blit(world, (0, 0))
+        elif self.smooth_world:
+            pygame.transform.smoothscale(world, window_size, self.window)
+        else:
+            pygame.transform.scale(world, window_size, self.window)
+        if self.hud_layer.get_size() == window_size:
+            self.window.blit(self.hud_layer, (0, 0))
+        else:
+            pygame.transform.scale(self.hud_layer, window_size, self.hud_window)
+            self.window.blit(self.hud_window, (0, 0))
+        self.hud_drawn = False
+    
+    def screen_name(self):
+        if self.game_state == "start_screen":
+            return "start_screen"
+        if self.state.game_won:
+            return "victory"
+        if self.state.game_over:
+            return "game_over"
+        return "playing"
+    
+    def idle_wait(self, frame_start):
+        """Sleep until the next idle frame is due or an event arrives. The event
+        is kept for the next frame, which is drawn right away."""
+        remaining = 1000 / self.idle_fps - (time.perf_counter() - frame_start) * 1000
+        if remaining >= 1:
+            event = pygame.event.wait(int(remaining))
+            if event.type != pygame.NOEVENT:
+                self.pending_events.append(event)
+        self.clock.tick()
+    
+    def screen_usage_report(self):
+        """CPU use per screen as a share of one core, for the log at exit"""
+        return "CPU per screen: " + ", ".join(
+            f"{name} {cpu / wall:.0%} of a core over {wall:.0f}s"
+            for name, (cpu, wall) in self.screen_usage.items() if wall > 0)
+    
+    def start_export(self, name):
+        """Publish every gameplay frame and its state to shared memory block name"""
+        self.exporter = SharedFrameExporter(name, self.screen)
+        self.export_frame = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) if self.scaled else None
+    
+    def composed_frame(self, frame):
+        """The last gameplay frame with its HUD. When scaled, the world and HUD
+        layers are brought to frame's full resolution and blended into it;
+        otherwise the screen already has both."""
+        if not (self.scaled and self.hud_drawn):
+            return self.screen
+        size = frame.get_size()
+        world = self.world_frame
+        if world.get_size() != size:
+            pygame.transform.smoothscale(world, size, frame)
+        elif frame is not world:
+            frame.blit(world, (0, 0))
+        if self.hud_layer.get_size() != size:
+            if self.hud_frame is None:
+                self.hud_frame = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.transform.scale(self.hud_layer, size, self.hud_frame)
+            frame.blit(self.hud_frame, (0, 0))
+        else:
+            frame.blit(self.hud_layer, (0, 0))
+        return frame
+    
+    def start_metrics(self, port=None, path=None):
+        """Serve health metrics on a local HTTP port, or rewrite them to path"""
+        self.metrics = Metrics()
+        if port is not None:
+            self.metrics_output = MetricsServer(self.metrics, port)
+        else:
+            self.metrics_output = MetricsFileWriter(self.metrics, path)
+    
+    def sound_voices(self):
+        """Channels playing; pygame.mixer is only safe to ask from the main loop"""
+        if not self.sound_manager.sound_enabled or not pygame.mixer.get_init():
+            return 0
+        return sum(pygame.mixer.Channel(i).get_busy() for i in range(pygame.mixer.get_num_channels()))
+    
+    def autoplay_input(self, current_time):
+        """Turn the autoplayer's choice into input: one-shot keys are posted as
+        KEYDOWN events for the event loop below, held arrows are returned as
+        movement bits in place of pygame.key.get_pressed"""
+        keys = []
+        held = ACTION_NONE
+        
+        if self.game_state == "start_screen":
+            keys.append(pygame.K_RETURN)
+        elif self.state.game_over or self.state.game_won:
+            if self.autoplay_end_time is None:
+                self.autoplay_end_time = current_time
+            elif current_time - self.autoplay_end_time >= self.autoplay_restart_delay:
+                keys.append(pygame.K_r)
+                self.autoplay_end_time = None
+        else:
+            action = self.autoplayer.act(self.state)
+            if action & ACTION_ECHO:
+                keys.append(pygame.K_SPACE)
+            if action & ACTION_INTERACT:
+                keys.append(pygame.K_e)
+            held = action & (ACTION_LEFT | ACTION_RIGHT | ACTION_UP | ACTION_DOWN)
+        
+        for key in keys:
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0))
+        return held
     
     def run(self):
         message = ""
         message_time = 0
         
         while self.running:
+            frame_start = time.perf_counter()
+            frame_cpu = time.process_time()
+            screen = self.screen_name()
+            if self.instrumentation:
+                self.instrumentation.begin_frame()
             current_time = pygame.time.get_ticks()
+            action = ACTION_NONE
+            autoplay_held = ACTION_NONE
+            if self.autoplayer:
+                autoplay_held = self.autoplay_input(current_time)
             
-            # Handle events
-            for event in pygame.event.get():
+            # Handle events, starting with one that woke an idle wait
+            events = self.pending_events + pygame.event.get()
+            self.pending_events = []
+            for event in events:
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.KEYDOWN:
@@ -1935,6 +1187,14 @@ class Game:
                         else:
                             self.game_state = "start_screen"
                     
+                    # Instrumentation: overlay, memory diff, export
+                    elif self.instrumentation and event.key == pygame.K_F3:
+                        self.instrumentation.overlay_enabled = not self.instrumentation.overlay_enabled
+                    elif self.instrumentation and event.key == pygame.K_F4:
+                        self.instrumentation.memory_diff()
+                    elif self.instrumentation and event.key == pygame.K_F5:
+                        self.instrumentation.export()
+                    
                     # Start screen controls
                     elif self.game_state == "start_screen":
                         if event.key == pygame.K_RETURN:
@@ -1944,88 +1204,78 @@ class Game:
                     
                     # Playing game controls
                     elif self.game_state == "playing":
-                        if event.key == pygame.K_r and (self.game_over or self.game_won):
+                        if event.key == pygame.K_r and (self.state.game_over or self.state.game_won):
                             self.restart_game()
                             message = "New game started! Find the small key to begin..."
                             message_time = current_time
-                        elif event.key == pygame.K_SPACE and not self.game_over and not self.game_won:
-                            if self.player and self.player.emit_echo():
-                                self.echo_active = True
-                                self.echo_start_time = current_time
-                                self.echo_center = (self.player.x, self.player.y)
-                                self.sound_manager.play_sound('echo')
-                        elif event.key == pygame.K_e and not self.game_over and not self.game_won:
-                            if self.player:
-                                interaction_result = self.handle_interaction()
-                                if interaction_result:
-                                    message = interaction_result
-                                    message_time = current_time
+                        elif event.key == pygame.K_SPACE:
+                            action |= ACTION_ECHO
+                        elif event.key == pygame.K_m:
+                            self.memory_map_enabled = not self.memory_map_enabled
+                        elif event.key == pygame.K_h:
+                            self.hints_enabled = not self.hints_enabled
+                        elif event.key == pygame.K_e:
+                            action |= ACTION_INTERACT
             
-            # Handle continuous key presses (only during gameplay)
-            if self.game_state == "playing" and self.player and not self.game_over and not self.game_won:
+            # Advance the simulation with continuous key presses (only during gameplay)
+            if self.game_state == "playing":
                 keys = pygame.key.get_pressed()
-                dx = dy = 0
                 if keys[pygame.K_LEFT]:
-                    dx = -PLAYER_SPEED
+                    action |= ACTION_LEFT
                 if keys[pygame.K_RIGHT]:
-                    dx = PLAYER_SPEED
+                    action |= ACTION_RIGHT
                 if keys[pygame.K_UP]:
-                    dy = -PLAYER_SPEED
+                    action |= ACTION_UP
                 if keys[pygame.K_DOWN]:
-                    dy = PLAYER_SPEED
-                
-                self.player.move(dx, dy, self.maze)
+                    action |= ACTION_DOWN
+                action |= autoplay_held
                 
-                # Check for traps
-                if self.check_traps():
-                    message = self.death_message
+                step_message = self.state.step(action)
+                if step_message:
+                    message = step_message
                     message_time = current_time
+                self.handle_state_events()
             
             # Render based on game state
             if self.game_state == "start_screen":
                 self.draw_start_screen()
             
             elif self.game_state == "playing":
-                # Draw game
-                self.draw_background()
-                self.draw_maze()
-                self.draw_objects()
-                
-                # Draw player (always visible if alive)
-                if not self.game_over and self.player:
-                    self.player.draw(self.screen)
-                
-                # Draw UI
-                self.draw_ui()
-                
-                # Draw message
-                if message and current_time - message_time < 4000:
-                    text_surface = self.font.render(message, True, NEON_GREEN)
-                    text_rect = text_surface.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 50))
-                    self.screen.blit(text_surface, text_rect)
-                
-                # Draw flash message (priority over regular message)
-                if self.flash_message and current_time - self.flash_message_time < 5000:
-                    # Flashing effect
-                    flash_alpha = int(255 * (0.5 + 0.5 * math.sin(current_time * 0.01)))
-                    flash_color = (255, flash_alpha, 0)  # Orange flashing
-                    
-                    flash_surface = self.font.render(self.flash_message, True, flash_color)
-                    flash_rect = flash_surface.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 100))
-                    
-                    # Background for flash message
-                    bg_surface = pygame.Surface((flash_rect.width + 20, flash_rect.height + 10))
-                    bg_surface.set_alpha(150)
-                    bg_surface.fill((50, 25, 0))
-                    self.screen.blit(bg_surface, (flash_rect.x - 10, flash_rect.y - 5))
-                    
-                    self.screen.blit(flash_surface, flash_rect)
-                elif self.flash_message and current_time - self.flash_message_time >= 5000:
-                    self.flash_message = ""  # Clear flash message after 5 seconds
+                self.draw_game(message, message_time, current_time)
+                if self.exporter:
+                    self.exporter.publish(self.composed_frame(self.export_frame), self.state)
             
+            self.present()
+            if self.instrumentation:
+                self.instrumentation.end_frame(screen)
+                self.instrumentation.draw_overlay(self.window)
             pygame.display.flip()
-            self.clock.tick(FPS)
-        
+            if not self.instrumentation:  # Counting slows frames down; keep the tier steady
+                self.quality.record((time.perf_counter() - frame_start) * 1000)
+            if self.idle_fps and screen != "playing" and self.screen_name() == screen:
+                self.idle_wait(frame_start)
+            else:
+                self.clock.tick(FPS)
+            
+            if self.metrics:
+                self.metrics.frame(screen, time.perf_counter() - frame_start, self.sound_voices())
+            if self.metrics and screen == "playing" and self.screen_name() != "playing":
+                self.metrics.finished({"victory": "won", "game_over": "lost"}.get(self.screen_name(), "abandoned"))
+            
+            usage = self.screen_usage.setdefault(screen, [0.0, 0.0])
+            usage[0] += time.process_time() - frame_cpu
+            usage[1] += time.perf_counter() - frame_start
+        
+        print(self.quality.report())
+        print(self.screen_usage_report())
+        print(self.hud.report())
+        if self.instrumentation:
+            self.instrumentation.export()
+            self.instrumentation.uninstall()
+        if self.exporter:
+            self.exporter.close()
+        if self.metrics_output:
+            self.metrics_output.close()
         pygame.quit()
 
 if __name__ == "__main__":
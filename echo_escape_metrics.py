@@ -0,0 +1,210 @@
+"""
+Echo Escape - Metrics
+Health metrics for unattended cabinets in the Prometheus text format: frame
+time histograms per screen, FPS, restart latency, sound voices in use,
+resident memory and session counts. The game loop only appends numbers under a
+short lock; rendering the text happens on a background thread, either serving
+GET /metrics on a local HTTP port or rewriting a file every few seconds, so a
+scrape never holds up a frame.
+
+Scrape a running game (started with run_game.py --metrics-port 9464):
+    curl http://127.0.0.1:9464/metrics
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Frame time histogram bucket upper bounds in seconds (+Inf is implied)
+FRAME_BUCKETS = [0.004, 0.008, 0.012, 0.0167, 0.020, 0.025, 0.033, 0.050, 0.100, 0.250]
+OUTCOMES = ["won", "lost", "abandoned"]
+
+
+def resident_memory_bytes():
+    """Current RSS from /proc on Linux, else the peak RSS from resource"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class FrameHistogram:
+    def __init__(self):
+        self.buckets = [0] * (len(FRAME_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(FRAME_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+class Metrics:
+    """Numbers recorded by the game loop. gauges maps a metric name to (help,
+    function); the functions are called on the serving thread at scrape time,
+    so they must not touch pygame. Anything read from pygame is passed in by
+    the game loop instead, like the sound voices given to frame()."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start_time = time.time()
+        self.frames = {}  # Screen name -> FrameHistogram
+        self.frame_times = deque(maxlen=240)  # perf_counter of recent frames, for FPS
+        self.restart_sum = 0.0
+        self.restart_count = 0
+        self.restart_last = 0.0
+        self.games_started = 0
+        self.games_finished = {outcome: 0 for outcome in OUTCOMES}
+        self.sound_voices = None
+        self.gauges = {}
+
+    def frame(self, screen, seconds, sound_voices=None):
+        with self.lock:
+            if sound_voices is not None:
+                self.sound_voices = sound_voices
+            histogram = self.frames.get(screen)
+            if histogram is None:
+                histogram = self.frames[screen] = FrameHistogram()
+            histogram.observe(seconds)
+            self.frame_times.append(time.perf_counter())
+
+    def restarted(self, seconds):
+        with self.lock:
+            self.restart_sum += seconds
+            self.restart_count += 1
+            self.restart_last = seconds
+            self.games_started += 1
+
+    def finished(self, outcome):
+        with self.lock:
+            self.games_finished[outcome] += 1
+
+    def render(self):
+        """The Prometheus text exposition of everything recorded so far"""
+        with self.lock:
+            frames = {screen: (list(h.buckets), h.sum, h.count) for screen, h in self.frames.items()}
+            now = time.perf_counter()
+            fps = sum(1 for t in self.frame_times if now - t <= 1.0)
+            restart = (self.restart_sum, self.restart_count, self.restart_last)
+            started = self.games_started
+            finished = dict(self.games_finished)
+            sound_voices = self.sound_voices
+
+        lines = ["# HELP echo_escape_frame_seconds Frame time including the wait for the next tick.",
+                 "# TYPE echo_escape_frame_seconds histogram"]
+        for screen, (buckets, total, count) in sorted(frames.items()):
+            cumulative = 0
+            for bound, bucket in zip(FRAME_BUCKETS + ["+Inf"], buckets):
+                cumulative += bucket
+                lines.append(f'echo_escape_frame_seconds_bucket{{screen="{screen}",le="{bound}"}} {cumulative}')
+            lines.append(f'echo_escape_frame_seconds_sum{{screen="{screen}"}} {total:.6f}')
+            lines.append(f'echo_escape_frame_seconds_count{{screen="{screen}"}} {count}')
+
+        lines += ["# HELP echo_escape_fps Frames drawn in the last second.",
+                  "# TYPE echo_escape_fps gauge",
+                  f"echo_escape_fps {fps}",
+                  "# HELP echo_escape_restart_seconds Time to build a new game.",
+                  "# TYPE echo_escape_restart_seconds summary",
+                  f"echo_escape_restart_seconds_sum {restart[0]:.6f}",
+                  f"echo_escape_restart_seconds_count {restart[1]}",
+                  "# HELP echo_escape_restart_last_seconds Time the latest game took to build.",
+                  "# TYPE echo_escape_restart_last_seconds gauge",
+                  f"echo_escape_restart_last_seconds {restart[2]:.6f}",
+                  "# HELP echo_escape_games_started_total Games started.",
+                  "# TYPE echo_escape_games_started_total counter",
+                  f"echo_escape_games_started_total {started}",
+                  "# HELP echo_escape_games_finished_total Games ended, by outcome.",
+                  "# TYPE echo_escape_games_finished_total counter"]
+        for outcome in OUTCOMES:
+            lines.append(f'echo_escape_games_finished_total{{outcome="{outcome}"}} {finished[outcome]}')
+
+        gauges = [("echo_escape_uptime_seconds", "Seconds since the game started.",
+                   time.time() - self.start_time),
+                  ("echo_escape_resident_memory_bytes", "Resident memory of the game process.",
+                   resident_memory_bytes()),
+                  ("echo_escape_sound_voices", "Sound channels playing.", sound_voices)]
+        for name, (help_text, function) in self.gauges.items():
+            try:
+                gauges.append((name, help_text, function()))
+            except Exception as e:
+                print(f"Metric {name} failed: {e}")
+        for name, help_text, value in gauges:
+            if value is not None:
+                value = value if isinstance(value, int) else f"{value:.3f}"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves metrics.render() at http://host:port/metrics from a daemon thread"""
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True)
+        self.thread.start()
+        print(f"Metrics at http://{host}:{self.server.server_port}/metrics")
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MetricsFileWriter:
+    """Rewrites path with metrics.render() every interval seconds from a daemon
+    thread. The file is replaced in one step, so readers never see half of it."""
+    def __init__(self, metrics, path, interval=5.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.loop, name="metrics", daemon=True)
+        self.thread.start()
+        print(f"Metrics written to {path} every {interval:g}s")
+
+    def loop(self):
+        while True:
+            self.write()
+            if self.stopped.wait(self.interval):
+                return
+
+    def write(self):
+        temporary = self.path + ".tmp"
+        try:
+            with open(temporary, "w") as f:
+                f.write(self.metrics.render())
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"Writing metrics to {self.path} failed: {e}")
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join()
+        self.write()
@@ -0,0 +1,182 @@
+"""
+Echo Escape - Particles
+Pooled particle system. Position, velocity, age, lifetime, color, size and
+alpha of every particle live in preallocated NumPy arrays that are stepped
+together each frame; dead slots are reused by the next emit. Particles are
+drawn with one Surface.blits call from a cache of small square sprites keyed
+by color, size and alpha level, so thousands of them stay cheap.
+"""
+
+import math
+import random
+
+import numpy as np
+import pygame
+
+from echo_escape_core import CYAN, NEON_GREEN, NEON_BLUE, NEON_PINK, RED, GOLD, ECHO_RADIUS, ECHO_WAVE_SPEED
+
+ALPHA_LEVELS = 16  # Alpha is drawn in this many steps, one sprite per step
+MAX_STEP = 0.1  # Longest simulated step in seconds, so a stalled frame does not teleport particles
+
+
+class ParticleSystem:
+    """A fixed pool of capacity particles. Emits past capacity are dropped."""
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.gravity = np.zeros(capacity, dtype=np.float32)  # Pixels per second squared, downwards
+        self.drag = np.zeros(capacity, dtype=np.float32)  # Share of velocity lost per second
+        self.age = np.zeros(capacity, dtype=np.float32)
+        self.life = np.ones(capacity, dtype=np.float32)
+        self.fade_in = np.zeros(capacity, dtype=np.float32)  # Share of life spent fading in
+        self.alpha = np.zeros(capacity, dtype=np.float32)  # Peak alpha, 0-255
+        self.sprite = np.zeros(capacity, dtype=np.int32)  # Palette index * 8 + size - 1
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.palette = []
+        self.sprites = {}  # sprite * ALPHA_LEVELS + level -> Surface
+        self.last_time = None
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def sprite_code(self, color, size):
+        if color not in self.palette:
+            self.palette.append(color)
+        return self.palette.index(color) * 8 + min(max(int(size), 1), 8) - 1
+
+    def emit(self, x, y, vx, vy, life, color, size=2, alpha=255, gravity=0.0, drag=0.0, fade_in=0.0):
+        """Start particles in free slots. x, y, vx, vy and life may be scalars
+        or arrays of one value per particle; their broadcast length is the
+        number emitted. Returns how many fit."""
+        x, y, vx, vy, life = np.broadcast_arrays(*(np.atleast_1d(np.asarray(value, dtype=np.float32))
+                                                   for value in (x, y, vx, vy, life)))
+        slots = np.flatnonzero(~self.alive)[:len(x)]
+        count = len(slots)
+        self.x[slots] = x[:count]
+        self.y[slots] = y[:count]
+        self.vx[slots] = vx[:count]
+        self.vy[slots] = vy[:count]
+        self.life[slots] = np.maximum(life[:count], 1e-3)
+        self.age[slots] = 0
+        self.gravity[slots] = gravity
+        self.drag[slots] = drag
+        self.fade_in[slots] = fade_in
+        self.alpha[slots] = alpha
+        self.sprite[slots] = self.sprite_code(color, size)
+        self.alive[slots] = True
+        return count
+
+    def update(self, now):
+        """Advance every live particle to now (milliseconds)"""
+        dt = 0.0 if self.last_time is None else min(max(now - self.last_time, 0) / 1000, MAX_STEP)
+        self.last_time = now
+        live = np.flatnonzero(self.alive)
+        if not len(live) or not dt:
+            return
+        self.vy[live] += self.gravity[live] * dt
+        damping = np.maximum(1 - self.drag[live] * dt, 0)
+        self.vx[live] *= damping
+        self.vy[live] *= damping
+        self.x[live] += self.vx[live] * dt
+        self.y[live] += self.vy[live] * dt
+        self.age[live] += dt
+        self.alive[live] = self.age[live] < self.life[live]
+
+    def draw(self, screen, scale=1):
+        """Blit every live particle in one call, at positions times scale for
+        a layer drawn below full resolution"""
+        live = np.flatnonzero(self.alive)
+        if not len(live):
+            return
+        progress = self.age[live] / self.life[live]
+        fade_in = np.maximum(self.fade_in[live], 1e-3)
+        strength = np.clip(np.minimum(progress / fade_in, (1 - progress) / (1 - fade_in)), 0, 1)
+        levels = (self.alpha[live] * strength * (ALPHA_LEVELS / 256)).astype(np.int32)
+        keys = self.sprite[live] * ALPHA_LEVELS + levels
+        for key in np.unique(keys).tolist():
+            if key not in self.sprites:
+                self.sprites[key] = self.build_sprite(key)
+        sprites = self.sprites
+        screen.blits([(sprites[key], (x, y)) for key, x, y in
+                      zip(keys.tolist(), (self.x[live] * scale).astype(np.int32).tolist(),
+                          (self.y[live] * scale).astype(np.int32).tolist())], doreturn=False)
+
+    def build_sprite(self, key):
+        sprite, level = divmod(key, ALPHA_LEVELS)
+        color_index, size = divmod(sprite, 8)
+        surface = pygame.Surface((size + 1, size + 1))
+        surface.fill(self.palette[color_index])
+        surface.set_alpha(level * 256 // ALPHA_LEVELS + 256 // ALPHA_LEVELS // 2)
+        return surface
+
+    def clear(self):
+        self.alive[:] = False
+
+
+class AmbientDust:
+    """Keeps about target faint motes drifting across the area"""
+    def __init__(self, system, width, height, color=CYAN):
+        self.system = system
+        self.width = width
+        self.height = height
+        self.color = color
+
+    def update(self, target):
+        missing = target - len(self.system)
+        if missing <= 0:
+            return
+        self.system.emit(np.random.uniform(0, self.width, missing), np.random.uniform(0, self.height, missing),
+                         np.random.uniform(5, 15, missing), np.random.uniform(2, 8, missing),
+                         np.random.uniform(4, 8, missing), self.color, size=2, alpha=50, fade_in=0.3)
+
+
+def echo_ripple(system, x, y, count=64, color=CYAN):
+    """A ring of motes travelling outwards with the echo wave"""
+    angles = np.linspace(0, 2 * math.pi, count, endpoint=False) + random.random()
+    speed = ECHO_WAVE_SPEED * 1000
+    system.emit(x, y, np.cos(angles) * speed, np.sin(angles) * speed,
+                ECHO_RADIUS / speed, color, size=2, alpha=160)
+
+
+TRAP_BURST_COLORS = {
+    "trap_laser": RED,
+    "trap_shock": NEON_BLUE,
+    "trap_gas": (100, 150, 100),
+    "trap_fire": (255, 120, 0),
+    "trap_pit": (60, 60, 60),
+}
+
+
+def trap_burst(system, x, y, trap_type, count=120):
+    """Debris thrown out where a trap went off"""
+    angles = np.random.uniform(0, 2 * math.pi, count)
+    speeds = np.random.uniform(40, 220, count)
+    system.emit(x, y, np.cos(angles) * speeds, np.sin(angles) * speeds,
+                np.random.uniform(0.4, 1.2, count), TRAP_BURST_COLORS.get(trap_type, RED),
+                size=3, alpha=255, gravity=200, drag=1.5)
+
+
+FIREWORK_COLORS = [NEON_GREEN, CYAN, NEON_PINK, GOLD]
+
+
+class Fireworks:
+    """Bursts at random points of a box every interval milliseconds"""
+    def __init__(self, system, box, interval=400):
+        self.system = system
+        self.box = box
+        self.interval = interval
+        self.next_time = 0
+
+    def update(self, now, count):
+        if count <= 0 or now < self.next_time:
+            return
+        self.next_time = now + self.interval
+        left, top, width, height = self.box
+        angles = np.random.uniform(0, 2 * math.pi, count)
+        speeds = np.random.uniform(30, 160, count)
+        self.system.emit(left + random.random() * width, top + random.random() * height,
+                         np.cos(angles) * speeds, np.sin(angles) * speeds, np.random.uniform(0.8, 1.6, count),
+                         random.choice(FIREWORK_COLORS), size=random.randint(2, 4), gravity=80, drag=1.0)
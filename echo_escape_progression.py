@@ -0,0 +1,194 @@
+"""
+Echo Escape - Progression Rules
+Puzzle progression as data: what interacting with each object type needs, what
+it gives, what it uses up and which counters it advances. Rules are compiled
+into bit masks once, and held items, codes and counters are updated as they
+change, so every requirement check is a few integer operations no matter how
+many chests and terminals a level has.
+"""
+
+import json
+
+# Rule fields (all optional):
+#   requires, lacks     tokens that must / must not be held
+#   gives, consumes     tokens added to / removed from what is held
+#   gives_one_of        a random token among these that is not held yet
+#   counters            {"name": minimum} counter requirements
+#   counts              counter advanced when the rule fires
+#   marks               object flag set when the rule fires ("collected" or "unlocked")
+#   sound, message      feedback; "{given}" in the message is the token given
+#   check_exit          spawn the exit if the exit rule is met afterwards
+#   wins                the game is won
+DEFAULT_RULES = {
+    "items": ["small_key", "document", "tool", "large_key"],
+    "codes": ["2048", "ECHO", "NEURAL"],
+    "objects": {
+        "small_key": {
+            "rules": [
+                {"gives": ["small_key"], "marks": "collected", "sound": "collect",
+                 "message": "Found small key!"},
+            ],
+        },
+        "chest": {
+            "rules": [
+                {"requires": ["small_key"], "lacks": ["document"], "gives": ["document"],
+                 "marks": "unlocked", "counts": "chests", "sound": "chest",
+                 "message": "Opened chest with small key! Found document."},
+                {"requires": ["document"], "lacks": ["tool"], "gives": ["tool"],
+                 "marks": "unlocked", "counts": "chests", "sound": "chest",
+                 "message": "Opened chest with document! Found tool."},
+                {"requires": ["tool"], "lacks": ["large_key"], "gives": ["large_key"],
+                 "marks": "unlocked", "counts": "chests", "sound": "chest",
+                 "message": "Opened chest with tool! Found large key."},
+            ],
+            "otherwise": "Chest is locked. Need the right item to open it.",
+        },
+        "code_puzzle": {
+            "rules": [
+                {"gives_one_of": ["2048", "ECHO", "NEURAL"], "marks": "collected", "sound": "code",
+                 "message": "Found code: {given}"},
+            ],
+        },
+        "terminal": {
+            "rules": [
+                {"requires": ["2048"], "consumes": ["2048"], "marks": "collected",
+                 "counts": "terminals", "sound": "terminal", "check_exit": True,
+                 "message": "Terminal solved with code 2048!"},
+                {"requires": ["ECHO", "document"], "consumes": ["ECHO"], "marks": "collected",
+                 "counts": "terminals", "sound": "terminal", "check_exit": True,
+                 "message": "Terminal solved with code ECHO and document!"},
+                {"requires": ["NEURAL", "large_key"], "consumes": ["NEURAL"], "marks": "collected",
+                 "counts": "terminals", "sound": "terminal", "check_exit": True,
+                 "message": "Terminal solved with code NEURAL and large key!"},
+            ],
+            "otherwise": "Terminal needs a specific code and required items.",
+        },
+        "exit": {
+            "rules": [
+                {"wins": True, "sound": "victory", "message": "Escaped! You win!"},
+            ],
+        },
+    },
+    # All terminals solved, all items collected, all chests opened, all codes used
+    "exit": {
+        "requires": ["small_key", "document", "tool", "large_key"],
+        "lacks": ["2048", "ECHO", "NEURAL"],
+        "counters": {"terminals": 3, "chests": 3},
+    },
+}
+
+
+class Rule:
+    """One compiled rule; token lists become bit masks"""
+    def __init__(self, data, rules):
+        self.requires = rules.mask(data.get("requires", ()))
+        self.lacks = rules.mask(data.get("lacks", ()))
+        self.gives = [rules.token(name) for name in data.get("gives", ())]
+        self.consumes = [rules.token(name) for name in data.get("consumes", ())]
+        self.one_of = [rules.token(name) for name in data.get("gives_one_of", ())]
+        self.one_of_mask = rules.mask(data.get("gives_one_of", ()))
+        self.counters = list(data.get("counters", {}).items())
+        self.counts = data.get("counts")
+        self.marks = data.get("marks")
+        self.sound = data.get("sound")
+        self.message = data.get("message", "")
+        self.check_exit = data.get("check_exit", False)
+        self.wins = data.get("wins", False)
+
+        if self.marks not in (None, "collected", "unlocked"):
+            raise ValueError(f"Rule marks unknown object flag {self.marks}")
+
+
+class ObjectRules:
+    """The rules of one object type, tried in order; otherwise is the message
+    when none of them applies"""
+    def __init__(self, data, rules):
+        self.rules = [Rule(rule, rules) for rule in data.get("rules", ())]
+        self.otherwise = data.get("otherwise")
+
+
+class ProgressionRules:
+    """Compiled progression data. Items and codes share one bit space."""
+    def __init__(self, data):
+        self.tokens = {}  # Name -> (bit, "items" or "codes")
+        for kind in ("items", "codes"):
+            for name in data.get(kind, ()):
+                if name in self.tokens:
+                    raise ValueError(f"Progression token {name} is declared twice")
+                self.tokens[name] = (1 << len(self.tokens), kind)
+
+        self.objects = {obj_type: ObjectRules(object_data, self)
+                        for obj_type, object_data in data.get("objects", {}).items()}
+        self.exit = Rule(data.get("exit", {}), self)
+        self.counter_names = sorted({rule.counts for object_rules in self.objects.values()
+                                     for rule in object_rules.rules if rule.counts} |
+                                    {name for name, count in self.exit.counters})
+
+    def token(self, name):
+        if name not in self.tokens:
+            raise ValueError(f"Unknown progression token {name}")
+        return name, self.tokens[name][0]
+
+    def mask(self, names):
+        bits = 0
+        for name in names:
+            bits |= self.token(name)[1]
+        return bits
+
+
+def load_rules(path):
+    """Compile progression rules from a JSON file laid out like DEFAULT_RULES"""
+    with open(path) as f:
+        return ProgressionRules(json.load(f))
+
+
+class Progression:
+    """What one player holds and has done. held is the bitset used for checks;
+    inventory and codes keep the same tokens in the order they were found."""
+    def __init__(self, rules):
+        self.rules = rules
+        self.held = 0
+        self.inventory = []
+        self.codes = []
+        self.counters = {name: 0 for name in rules.counter_names}
+
+    def allows(self, rule):
+        if self.held & rule.requires != rule.requires or self.held & rule.lacks:
+            return False
+        if rule.one_of and not rule.one_of_mask & ~self.held:
+            return False
+        for name, count in rule.counters:
+            if self.counters[name] < count:
+                return False
+        return True
+
+    def give(self, name, bit):
+        if not self.held & bit:
+            self.held |= bit
+            self.held_list(name).append(name)
+
+    def consume(self, name, bit):
+        if self.held & bit:
+            self.held &= ~bit
+            self.held_list(name).remove(name)
+
+    def held_list(self, name):
+        return self.inventory if self.rules.tokens[name][1] == "items" else self.codes
+
+    def apply(self, rule, rng):
+        """Fire a rule that allows() accepted. Returns the gives_one_of token
+        picked, if any."""
+        given = None
+        if rule.one_of:
+            given = rng.choice([name for name, bit in rule.one_of if not self.held & bit])
+            self.give(*self.rules.token(given))
+        for name, bit in rule.gives:
+            self.give(name, bit)
+        for name, bit in rule.consumes:
+            self.consume(name, bit)
+        if rule.counts:
+            self.counters[rule.counts] += 1
+        return given
+
+
+DEFAULT_PROGRESSION = ProgressionRules(DEFAULT_RULES)
@@ -0,0 +1,112 @@
+"""
+Echo Escape - Quality Governor
+Watches how long each frame takes to draw and steps the effect quality down
+when the rolling average goes over the frame budget, and back up when there is
+headroom again. Separate thresholds for lowering and raising plus a hold time
+after every change keep it from flapping between two tiers.
+"""
+
+import time
+from collections import deque
+
+from echo_escape_core import FPS
+
+
+class QualityTier:
+    """How much of each optional effect to draw"""
+    def __init__(self, name, glow_layers, ambient_particles, wall_shading, victory_sparkles):
+        self.name = name
+        self.glow_layers = glow_layers  # Innermost glow layers per player/object
+        self.ambient_particles = ambient_particles  # Background particles
+        self.wall_shading = wall_shading  # Wall shadow and highlight passes
+        self.victory_sparkles = victory_sparkles  # Victory firework size (x8 sparks per burst)
+
+
+# Lowest to highest; the game starts at the highest
+QUALITY_TIERS = [
+    QualityTier("minimal", glow_layers=0, ambient_particles=0, wall_shading=False, victory_sparkles=0),
+    QualityTier("low", glow_layers=1, ambient_particles=5, wall_shading=False, victory_sparkles=3),
+    QualityTier("medium", glow_layers=2, ambient_particles=10, wall_shading=True, victory_sparkles=6),
+    QualityTier("high", glow_layers=3, ambient_particles=20, wall_shading=True, victory_sparkles=10),
+]
+
+
+def quality_tier(name):
+    for tier in QUALITY_TIERS:
+        if tier.name == name:
+            return tier
+    raise ValueError(f"Unknown quality tier {name}")
+
+
+class QualityGovernor:
+    """Feed record() the time spent on each frame, excluding the wait for the
+    next tick. Once window frames have been seen since the last change, the
+    tier drops when their mean exceeds lower_at x budget and rises when it is
+    under raise_at x budget. Every change is logged."""
+    def __init__(self, fps=FPS, tiers=QUALITY_TIERS, window=60, lower_at=1.0, raise_at=0.7,
+                 hold_frames=120, log=print):
+        self.budget_ms = 1000 / fps
+        self.tiers = tiers
+        self.index = len(tiers) - 1
+        self.samples = deque(maxlen=window)
+        self.total_ms = 0.0
+        self.lower_at = lower_at
+        self.raise_at = raise_at
+        self.hold_frames = hold_frames
+        self.frames_since_change = 0
+        self.frames_per_tier = [0] * len(tiers)
+        self.log = log
+        self.listeners = []
+        self.start_time = time.time()
+
+    @property
+    def tier(self):
+        return self.tiers[self.index]
+
+    def record(self, frame_ms):
+        """Add one frame time; returns True when the tier changed"""
+        if len(self.samples) == self.samples.maxlen:
+            self.total_ms -= self.samples[0]
+        self.samples.append(frame_ms)
+        self.total_ms += frame_ms
+        self.frames_per_tier[self.index] += 1
+        self.frames_since_change += 1
+
+        if len(self.samples) < self.samples.maxlen or self.frames_since_change < self.hold_frames:
+            return False
+
+        mean_ms = self.total_ms / len(self.samples)
+        if mean_ms > self.budget_ms * self.lower_at and self.index > 0:
+            self.set_index(self.index - 1, mean_ms)
+            return True
+        if mean_ms < self.budget_ms * self.raise_at and self.index < len(self.tiers) - 1:
+            self.set_index(self.index + 1, mean_ms)
+            return True
+        return False
+
+    def set_index(self, index, mean_ms=None):
+        old = self.tier
+        self.index = index
+        self.samples.clear()
+        self.total_ms = 0.0
+        self.frames_since_change = 0
+        if mean_ms is not None:
+            self.log(f"Quality {old.name} -> {self.tier.name} "
+                     f"(mean frame {mean_ms:.1f} ms, budget {self.budget_ms:.1f} ms, "
+                     f"after {time.time() - self.start_time:.0f}s)")
+        for listener in self.listeners:
+            listener(self.tier)
+
+    def pin(self, name):
+        """Stay at one tier; record() still counts frames but never changes it"""
+        self.set_index(self.tiers.index(quality_tier(name)))
+        self.hold_frames = float("inf")
+
+    def report(self):
+        """Share of frames drawn at each tier, for the log at exit"""
+        total = sum(self.frames_per_tier)
+        if not total:
+            return "Quality tiers used: none recorded (instrumented frames are ignored)"
+        shares = ", ".join(f"{tier.name} {frames / total:.0%}"
+                           for tier, frames in zip(self.tiers, self.frames_per_tier) if frames)
+        return f"Quality tiers used: {shares}"
@@ -0,0 +1,560 @@
+"""
+Echo Escape - Object Renderers
+Registry mapping object type codes to a renderer and a label renderer. Each
+renderer draws all visible objects of its kind in one batch and keeps its own
+cache of glow surfaces; each label renderer caches its rendered text. New
+object kinds are added with register_object_kind without touching existing ones.
+"""
+
+import pygame
+import random
+import math
+import time
+
+from echo_escape_core import (
+    BLACK, DARK_GRAY, CYAN, NEON_GREEN, NEON_BLUE, NEON_PINK, WHITE, GRAY, RED, GOLD, SILVER,
+    OBJECT_TYPE_CODES)
+
+
+class ObjectRenderer:
+    """Draws one kind of object. draw_batch shares the per-frame setup (the
+    animation clock) across every object of the kind; draw_one does the rest.
+    glow_layers is how many glow layers each object may draw, innermost first;
+    the quality governor lowers it when frames run long."""
+    def __init__(self):
+        self.glow_cache = {}
+        self.glow_layers = 3
+        self.now = time.time()
+
+    def draw_batch(self, screen, objects, indices, pulses):
+        self.now = time.time()
+        for index, pulse in zip(indices.tolist(), pulses.tolist()):
+            self.draw_one(screen, objects[index], pulse)
+
+    def draw_one(self, screen, obj, pulse):
+        pass
+
+    def glow(self, screen, shape, glow_size, color, alpha, x, y):
+        """Blit a translucent square or disc of half-width glow_size centered on
+        (x, y). The surface is built once per shape, size and color."""
+        key = (shape, glow_size, color)
+        surface = self.glow_cache.get(key)
+        if surface is None:
+            surface = pygame.Surface((glow_size * 2, glow_size * 2))
+            if shape == "circle":
+                pygame.draw.circle(surface, color, (glow_size, glow_size), glow_size)
+            else:
+                pygame.draw.rect(surface, color, (0, 0, glow_size * 2, glow_size * 2))
+            self.glow_cache[key] = surface
+        surface.set_alpha(alpha)
+        screen.blit(surface, (x - glow_size, y - glow_size))
+
+    def glows(self, screen, shape, layers, color, x, y):
+        """Draw (glow_size, alpha) layers listed outermost first, keeping only
+        the innermost glow_layers of them"""
+        if self.glow_layers <= 0:
+            return
+        for glow_size, alpha in layers[-self.glow_layers:]:
+            self.glow(screen, shape, glow_size, color, alpha, x, y)
+
+
+class SmallKeyRenderer(ObjectRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size, color = obj.x, obj.y, obj.size, obj.color
+
+        # Enhanced small key with green glow
+        self.glows(screen, "circle", [(size * 2, int(40 * pulse)), (size * 1.5, int(80 * pulse))], color, x, y)
+
+        # Key head with gradient
+        pygame.draw.circle(screen, color, (int(x), int(y)), size)
+        pygame.draw.circle(screen, (100, 255, 100), (int(x), int(y)), size - 2)
+        pygame.draw.circle(screen, WHITE, (int(x), int(y)), size, 3)
+
+        # Key shaft with 3D effect
+        shaft_rect = pygame.Rect(x - 4, y - size, 8, size)
+        pygame.draw.rect(screen, color, shaft_rect)
+        pygame.draw.rect(screen, (100, 255, 100), (x - 3, y - size + 1, 6, size - 2))
+        pygame.draw.rect(screen, WHITE, shaft_rect, 2)
+
+        # Enhanced key teeth
+        teeth_points = [
+            (x + 4, y - size + 4),
+            (x + 10, y - size + 4),
+            (x + 10, y - size + 8),
+            (x + 4, y - size + 8)
+        ]
+        pygame.draw.polygon(screen, color, teeth_points)
+        pygame.draw.polygon(screen, WHITE, teeth_points, 2)
+
+
+class LargeKeyRenderer(ObjectRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size = obj.x, obj.y, obj.size
+
+        # Enhanced large key with golden glow
+        self.glows(screen, "circle", [(size * 2.5, int(50 * pulse)), (size * 2, int(100 * pulse))], GOLD, x, y)
+
+        # Key head with metallic gradient
+        pygame.draw.circle(screen, GOLD, (int(x), int(y)), size)
+        pygame.draw.circle(screen, (255, 235, 100), (int(x), int(y)), size - 2)
+        pygame.draw.circle(screen, WHITE, (int(x), int(y)), size, 4)
+        pygame.draw.circle(screen, GOLD, (int(x), int(y)), size - 4, 3)
+
+        # Ornate shaft
+        shaft_rect = pygame.Rect(x - 6, y - size, 12, size)
+        pygame.draw.rect(screen, GOLD, shaft_rect)
+        pygame.draw.rect(screen, (255, 235, 100), (x - 5, y - size + 1, 10, size - 2))
+        pygame.draw.rect(screen, WHITE, shaft_rect, 3)
+
+        # Elaborate teeth with details
+        teeth_points = [
+            (x + 6, y - size + 3),
+            (x + 14, y - size + 3),
+            (x + 14, y - size + 6),
+            (x + 11, y - size + 6),
+            (x + 11, y - size + 9),
+            (x + 14, y - size + 9),
+            (x + 14, y - size + 12),
+            (x + 6, y - size + 12)
+        ]
+        pygame.draw.polygon(screen, GOLD, teeth_points)
+        pygame.draw.polygon(screen, WHITE, teeth_points, 2)
+
+
+class DocumentRenderer(ObjectRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size, color = obj.x, obj.y, obj.size, obj.color
+
+        # Enhanced document with paper texture
+        self.glows(screen, "rect", [(int(size * 1.5 * pulse), 60)], SILVER, x, y)
+
+        # Main document with shadow
+        shadow_rect = pygame.Rect(x - size + 2, y - size + 2, size * 2, size * 2)
+        pygame.draw.rect(screen, (50, 50, 50), shadow_rect)
+
+        doc_rect = pygame.Rect(x - size, y - size, size * 2, size * 2)
+        pygame.draw.rect(screen, color, doc_rect)
+        pygame.draw.rect(screen, WHITE, (x - size + 2, y - size + 2, size * 2 - 4, size * 2 - 4))
+        pygame.draw.rect(screen, DARK_GRAY, doc_rect, 3)
+
+        # Enhanced text lines with varying lengths
+        line_data = [(0.8, 3), (0.6, 6), (0.9, 9), (0.4, 12)]
+        for width_factor, y_offset in line_data:
+            line_width = int(size * width_factor)
+            line_y = y - size + y_offset
+            pygame.draw.line(screen, DARK_GRAY,
+                             (x - line_width//2, line_y),
+                             (x + line_width//2, line_y), 2)
+
+
+class ToolRenderer(ObjectRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size, color = obj.x, obj.y, obj.size, obj.color
+
+        # Enhanced tool with metallic finish
+        self.glows(screen, "circle", [(int(size * 1.4 * pulse), 70)], (200, 100, 50), x, y)
+
+        # Tool handle with grip texture
+        handle_rect = pygame.Rect(x - 3, y - size, 6, size * 2)
+        pygame.draw.rect(screen, color, handle_rect)
+        pygame.draw.rect(screen, (200, 100, 50), (x - 2, y - size + 2, 4, size * 2 - 4))
+
+        # Grip lines
+        for i in range(4):
+            grip_y = y - size//2 + i * 4
+            pygame.draw.line(screen, (100, 50, 25), (x - 2, grip_y), (x + 2, grip_y), 1)
+
+        # Tool head with metallic shine
+        head_rect = pygame.Rect(x - size, y - size//2, size * 2, size)
+        pygame.draw.rect(screen, color, head_rect)
+        pygame.draw.rect(screen, (200, 100, 50), (x - size + 2, y - size//2 + 2, size * 2 - 4, size - 4))
+        pygame.draw.rect(screen, WHITE, head_rect, 3)
+
+        # Tool details with shine
+        pygame.draw.circle(screen, SILVER, (int(x - size//2), int(y)), 3)
+        pygame.draw.circle(screen, WHITE, (int(x - size//2), int(y)), 3, 1)
+        pygame.draw.circle(screen, SILVER, (int(x + size//2), int(y)), 3)
+        pygame.draw.circle(screen, WHITE, (int(x + size//2), int(y)), 3, 1)
+        # Enhanced key shape with glow
+        glow_size = int(size * 1.5 * pulse)
+        pygame.draw.circle(screen, (*color, 100), (int(x), int(y)), glow_size)
+
+        # Key head (circle)
+        pygame.draw.circle(screen, color, (int(x), int(y)), size)
+        pygame.draw.circle(screen, WHITE, (int(x), int(y)), size, 2)
+
+        # Key shaft
+        shaft_rect = pygame.Rect(x - 4, y - size, 8, size)
+        pygame.draw.rect(screen, color, shaft_rect)
+        pygame.draw.rect(screen, WHITE, shaft_rect, 2)
+
+        # Key teeth
+        teeth_points = [
+            (x + 4, y - size + 4),
+            (x + 8, y - size + 4),
+            (x + 8, y - size + 8),
+            (x + 4, y - size + 8)
+        ]
+        pygame.draw.polygon(screen, color, teeth_points)
+
+
+class ChestRenderer(ObjectRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size, color = obj.x, obj.y, obj.size, obj.color
+
+        # Enhanced chest with 3D effect and glow
+        self.glows(screen, "rect", [(int(size * 1.8 * pulse), 50)], NEON_PINK, x, y)
+
+        # Shadow
+        shadow_rect = pygame.Rect(x - size + 3, y - size + 3, size * 2, size * 2)
+        pygame.draw.rect(screen, (30, 30, 30), shadow_rect)
+
+        # Main chest body with gradient
+        base_rect = pygame.Rect(x - size, y - size, size * 2, size * 2)
+        pygame.draw.rect(screen, color, base_rect)
+        pygame.draw.rect(screen, (255, 100, 200), (x - size + 2, y - size + 2, size * 2 - 4, size * 2 - 4))
+        pygame.draw.rect(screen, WHITE, base_rect, 4)
+
+        # Chest lid with metallic bands
+        lid_rect = pygame.Rect(x - size, y - size, size * 2, size)
+        pygame.draw.rect(screen, (255, 150, 220), lid_rect)
+        pygame.draw.rect(screen, WHITE, lid_rect, 3)
+
+        # Metallic bands
+        for i in range(3):
+            band_y = y - size + 2 + i * 6
+            pygame.draw.line(screen, SILVER, (x - size + 4, band_y), (x + size - 4, band_y), 2)
+
+        # Lock or keyhole with enhanced detail
+        if not obj.unlocked:
+            # Lock body
+            pygame.draw.circle(screen, (150, 0, 0), (int(x), int(y)), 8)
+            pygame.draw.circle(screen, RED, (int(x), int(y)), 8, 3)
+            pygame.draw.circle(screen, (200, 50, 50), (int(x), int(y)), 6)
+
+            # Keyhole with depth
+            pygame.draw.circle(screen, BLACK, (int(x), int(y)), 4)
+            pygame.draw.circle(screen, (50, 50, 50), (int(x), int(y)), 3)
+            pygame.draw.rect(screen, BLACK, (x - 2, y, 4, 6))
+            pygame.draw.rect(screen, (50, 50, 50), (x - 1, y + 1, 2, 4))
+        else:
+            # Open chest indicator with sparkle effect
+            pygame.draw.circle(screen, NEON_GREEN, (int(x), int(y)), 6)
+            pygame.draw.circle(screen, WHITE, (int(x), int(y)), 6, 2)
+
+            # Sparkle effects
+            for i in range(4):
+                rad = math.radians(i * 90 + self.now * 100)
+                spark_x = x + math.cos(rad) * 10
+                spark_y = y + math.sin(rad) * 10
+                pygame.draw.circle(screen, WHITE, (int(spark_x), int(spark_y)), 2)
+
+
+class TerminalRenderer(ObjectRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size, color = obj.x, obj.y, obj.size, obj.color
+
+        # Enhanced terminal with holographic screen effect
+        self.glows(screen, "rect", [(int(size * 1.6 * pulse), 60)], color, x, y)
+
+        # Terminal base with depth
+        shadow_rect = pygame.Rect(x - size + 2, y - size + 2, size * 2, size * 2)
+        pygame.draw.rect(screen, (40, 40, 40), shadow_rect)
+
+        base_rect = pygame.Rect(x - size, y - size, size * 2, size * 2)
+        pygame.draw.rect(screen, GRAY, base_rect)
+        pygame.draw.rect(screen, (160, 160, 160), (x - size + 2, y - size + 2, size * 2 - 4, size * 2 - 4))
+        pygame.draw.rect(screen, WHITE, base_rect, 4)
+
+        # Screen with holographic effect
+        screen_rect = pygame.Rect(x - size + 6, y - size + 6, size * 2 - 12, size * 2 - 12)
+        pygame.draw.rect(screen, BLACK, screen_rect)
+        pygame.draw.rect(screen, color, screen_rect, 3)
+
+        # Screen glow layers
+        self.glows(screen, "rect", [(size - 4 + i, 30 - i*10) for i in range(3)], color, x, y)
+
+        # Animated terminal text lines
+        for i in range(4):
+            line_y = y - size + 10 + i * 5
+
+            # Simulate text with varying line lengths
+            line_length = size - 8 - (i % 2) * 4
+            pygame.draw.line(screen, color,
+                             (x - line_length//2, line_y),
+                             (x + line_length//2, line_y), 2)
+
+        # Corner LEDs
+        led_positions = [(-size + 4, -size + 4), (size - 4, -size + 4),
+                         (-size + 4, size - 4), (size - 4, size - 4)]
+        for led_x, led_y in led_positions:
+            pygame.draw.circle(screen, NEON_GREEN, (int(x + led_x), int(y + led_y)), 2)
+            pygame.draw.circle(screen, WHITE, (int(x + led_x), int(y + led_y)), 2, 1)
+
+
+class CodePuzzleRenderer(ObjectRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size, color = obj.x, obj.y, obj.size, obj.color
+
+        # Enhanced code puzzle with holographic circuit pattern
+        self.glows(screen, "circle", [(size * 1.8, int(40 * pulse)), (size * 1.4, int(80 * pulse))], color, x, y)
+
+        # Main circle with depth
+        pygame.draw.circle(screen, color, (int(x), int(y)), size)
+        pygame.draw.circle(screen, (100, 255, 255), (int(x), int(y)), size - 2)
+        pygame.draw.circle(screen, BLACK, (int(x), int(y)), size - 6)
+        pygame.draw.circle(screen, color, (int(x), int(y)), size, 3)
+
+        # Animated circuit pattern
+        center_x, center_y = int(x), int(y)
+        time_offset = self.now * 50
+
+        for angle in range(0, 360, 30):
+            rad = math.radians(angle + time_offset)
+            # Inner ring
+            start_x = center_x + math.cos(rad) * 6
+            start_y = center_y + math.sin(rad) * 6
+            mid_x = center_x + math.cos(rad) * (size - 8)
+            mid_y = center_y + math.sin(rad) * (size - 8)
+            end_x = center_x + math.cos(rad) * (size - 4)
+            end_y = center_y + math.sin(rad) * (size - 4)
+
+            # Animated circuit lines
+            pygame.draw.line(screen, color, (start_x, start_y), (mid_x, mid_y), 2)
+            pygame.draw.line(screen, WHITE, (mid_x, mid_y), (end_x, end_y), 1)
+
+            # Circuit nodes
+            pygame.draw.circle(screen, WHITE, (int(mid_x), int(mid_y)), 2)
+
+        # Pulsing center core
+        core_size = int(4 + 2 * math.sin(self.now * 4))
+        pygame.draw.circle(screen, WHITE, (center_x, center_y), core_size)
+        pygame.draw.circle(screen, color, (center_x, center_y), core_size - 1)
+
+
+class ExitRenderer(ObjectRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size, color = obj.x, obj.y, obj.size, obj.color
+
+        # Enhanced exit with dramatic glow and animation
+        self.glows(screen, "rect", [(size * 2.5, int(30 * pulse)), (size * 2, int(60 * pulse)),
+                                    (size * 1.5, int(120 * pulse))], color, x, y)
+
+        # Main exit portal with depth
+        base_rect = pygame.Rect(x - size, y - size, size * 2, size * 2)
+        pygame.draw.rect(screen, color, base_rect)
+        pygame.draw.rect(screen, (100, 255, 100), (x - size + 3, y - size + 3, size * 2 - 6, size * 2 - 6))
+        pygame.draw.rect(screen, WHITE, base_rect, 5)
+
+        # Inner portal effect
+        inner_rect = pygame.Rect(x - size + 6, y - size + 6, size * 2 - 12, size * 2 - 12)
+        pygame.draw.rect(screen, BLACK, inner_rect)
+        pygame.draw.rect(screen, color, inner_rect, 3)
+
+        # Swirling energy effect
+        for i in range(8):
+            rad = math.radians(i * 45 + self.now * 100)
+            energy_x = x + math.cos(rad) * (size - 10)
+            energy_y = y + math.sin(rad) * (size - 10)
+            energy_size = int(3 + 2 * math.sin(self.now * 2 + i))
+            pygame.draw.circle(screen, NEON_GREEN, (int(energy_x), int(energy_y)), energy_size)
+
+        # Enhanced exit arrow with glow
+        arrow_points = [
+            (x - 8, y),
+            (x + 4, y - 8),
+            (x + 4, y - 3),
+            (x + 10, y - 3),
+            (x + 10, y + 3),
+            (x + 4, y + 3),
+            (x + 4, y + 8)
+        ]
+        pygame.draw.polygon(screen, WHITE, arrow_points)
+        pygame.draw.polygon(screen, NEON_GREEN, arrow_points, 2)
+
+
+class TrapRenderer(ObjectRenderer):
+    """Traps stay completely invisible until they have gone off"""
+    def draw_batch(self, screen, objects, indices, pulses):
+        triggered = [index for index in indices.tolist() if objects[index].triggered]
+        if triggered:
+            self.now = time.time()
+            for index in triggered:
+                self.draw_one(screen, objects[index], 1.0)
+
+
+class SpikeTrapRenderer(TrapRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size = obj.x, obj.y, obj.size
+        base_rect = pygame.Rect(x - size, y - size, size * 2, size * 2)
+        pygame.draw.rect(screen, (100, 50, 50), base_rect)
+        pygame.draw.rect(screen, RED, base_rect, 2)
+
+        # Spikes
+        for i in range(3):
+            for j in range(3):
+                spike_x = x - size + 4 + i * 8
+                spike_y = y - size + 4 + j * 8
+                spike_points = [
+                    (spike_x, spike_y + 6),
+                    (spike_x + 3, spike_y),
+                    (spike_x + 6, spike_y + 6)
+                ]
+                pygame.draw.polygon(screen, RED, spike_points)
+
+
+class LaserTrapRenderer(TrapRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size = obj.x, obj.y, obj.size
+        for i in range(3):
+            laser_y = y - size + i * size // 1.5
+            pygame.draw.line(screen, RED, (x - size, laser_y), (x + size, laser_y), 2)
+            # Laser glow
+            pygame.draw.line(screen, (255, 100, 100), (x - size, laser_y), (x + size, laser_y), 4)
+
+
+class ShockTrapRenderer(TrapRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size = obj.x, obj.y, obj.size
+        base_rect = pygame.Rect(x - size, y - size, size * 2, size * 2)
+        pygame.draw.rect(screen, (50, 50, 100), base_rect)
+        pygame.draw.rect(screen, NEON_BLUE, base_rect, 2)
+
+        # Lightning bolts
+        for i in range(4):
+            rad = math.radians(i * 90 + obj.pulse_time * 50)
+            end_x = x + math.cos(rad) * size
+            end_y = y + math.sin(rad) * size
+            pygame.draw.line(screen, CYAN, (x, y), (end_x, end_y), 2)
+            pygame.draw.line(screen, WHITE, (x, y), (end_x, end_y), 1)
+
+
+class PitTrapRenderer(TrapRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size = obj.x, obj.y, obj.size
+        pit_rect = pygame.Rect(x - size, y - size, size * 2, size * 2)
+        pygame.draw.rect(screen, BLACK, pit_rect)
+        pygame.draw.rect(screen, (100, 50, 50), pit_rect, 3)
+
+        # Jagged edges
+        for i in range(8):
+            rad = math.radians(i * 45)
+            edge_x = x + math.cos(rad) * (size - 4)
+            edge_y = y + math.sin(rad) * (size - 4)
+            pygame.draw.circle(screen, (80, 40, 40), (int(edge_x), int(edge_y)), 3)
+
+
+class GasTrapRenderer(TrapRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size = obj.x, obj.y, obj.size
+        for i in range(5):
+            cloud_x = x + random.randint(-size, size)
+            cloud_y = y + random.randint(-size, size)
+            cloud_size = random.randint(8, 16)
+            self.glow(screen, "circle", cloud_size, (100, 150, 100), random.randint(100, 180), cloud_x, cloud_y)
+
+
+class BladeTrapRenderer(TrapRenderer):
+    def draw_one(self, screen, obj, pulse):
+        x, y, size = obj.x, obj.y, obj.size
+        blade_angle = obj.pulse_time * 200
+        for i in range(4):
+            rad = math.radians(blade_angle + i * 90)
+            blade_start_x = x + math.cos(rad) * 4
+            blade_start_y = y + math.sin(rad) * 4
+            blade_end_x = x + math.cos(rad) * (size - 2)
+            blade_end_y = y + math.sin(rad) * (size - 2)
+
+            pygame.draw.line(screen, (200, 200, 220),
+                             (blade_start_x, blade_start_y), (blade_end_x, blade_end_y), 3)
+            pygame.draw.line(screen, WHITE,
+                             (blade_start_x, blade_start_y), (blade_end_x, blade_end_y), 1)
+
+
+class FireTrapRenderer(TrapRenderer):
+    FIRE_COLORS = [(255, 100, 0), (255, 150, 0), (255, 200, 50), (255, 255, 100)]
+
+    def draw_one(self, screen, obj, pulse):
+        x, y, size = obj.x, obj.y, obj.size
+        for i in range(6):
+            flame_x = x + random.randint(-8, 8)
+            flame_y = y + random.randint(-size, size//2)
+            flame_size = random.randint(4, 12)
+            fire_color = random.choice(self.FIRE_COLORS)
+
+            pygame.draw.circle(screen, fire_color, (int(flame_x), int(flame_y)), flame_size)
+            if flame_size > 6:
+                pygame.draw.circle(screen, (255, 255, 150), (int(flame_x), int(flame_y)), flame_size - 4)
+
+
+class LabelRenderer:
+    """Draws an object's label text on a dark backdrop above it. The text and
+    backdrop surfaces are cached per label text and font."""
+    def __init__(self):
+        self.cache = {}
+
+    def draw(self, screen, font, obj, inventory, codes):
+        """Returns the rect covered by the backdrop, or None without a label"""
+        label_text = obj.get_label(inventory, codes)
+        if not label_text:  # Only draw if there's text to show
+            return None
+
+        cached = self.cache.get((label_text, font))
+        if cached is None:
+            text_surface = font.render(label_text, True, WHITE)
+            bg_surface = pygame.Surface((text_surface.get_width() + 8, text_surface.get_height() + 4))
+            bg_surface.set_alpha(180)
+            bg_surface.fill((20, 20, 30))
+            cached = self.cache[(label_text, font)] = (text_surface, bg_surface)
+        text_surface, bg_surface = cached
+
+        # Position label above object
+        label_x = obj.x - text_surface.get_width() // 2
+        label_y = obj.y - obj.size - 25
+
+        backdrop = pygame.Rect(label_x - 4, label_y - 2, bg_surface.get_width(), bg_surface.get_height())
+        screen.blit(bg_surface, backdrop)
+        pygame.draw.rect(screen, CYAN, backdrop, 1)
+        screen.blit(text_surface, (label_x, label_y))
+        return backdrop
+
+
+class ObjectKind:
+    """Registry entry: how one object type is drawn and labelled"""
+    def __init__(self, renderer, label):
+        self.renderer = renderer
+        self.label = label
+
+
+OBJECT_KINDS = {}  # Type code -> ObjectKind
+
+
+def register_object_kind(type_name, renderer, label=None):
+    OBJECT_KINDS[OBJECT_TYPE_CODES[type_name]] = ObjectKind(renderer, label or LabelRenderer())
+
+
+def object_kind(type_code):
+    return OBJECT_KINDS[type_code]
+
+
+def set_glow_layers(layers):
+    """Limit the glow layers every registered renderer draws"""
+    for kind in OBJECT_KINDS.values():
+        kind.renderer.glow_layers = layers
+
+
+register_object_kind("small_key", SmallKeyRenderer())
+register_object_kind("large_key", LargeKeyRenderer())
+register_object_kind("document", DocumentRenderer())
+register_object_kind("tool", ToolRenderer())
+register_object_kind("chest", ChestRenderer())
+register_object_kind("terminal", TerminalRenderer())
+register_object_kind("code_puzzle", CodePuzzleRenderer())
+register_object_kind("exit", ExitRenderer())
+register_object_kind("trap_spike", SpikeTrapRenderer())
+register_object_kind("trap_laser", LaserTrapRenderer())
+register_object_kind("trap_shock", ShockTrapRenderer())
+register_object_kind("trap_pit", PitTrapRenderer())
+register_object_kind("trap_gas", GasTrapRenderer())
+register_object_kind("trap_blade", BladeTrapRenderer())
+register_object_kind("trap_fire", FireTrapRenderer())
@@ -4,6 +4,7 @@ Echo Escape - Game Launcher
 Simple launcher script for the Echo Escape game.
 """
 
+import argparse
 import sys
 import os
 
@@ -12,14 +13,49 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from echo_escape_main import Game
+    from echo_escape_bot import EscapeBot
     
     if __name__ == "__main__":
+        parser = argparse.ArgumentParser(description="Echo Escape")
+        parser.add_argument("--autoplay", action="store_true",
+                            help="let the built-in bot play, restarting after every game (soak testing)")
+        parser.add_argument("--export", metavar="NAME",
+                            help="publish frames and state to this shared memory block")
+        parser.add_argument("--window", metavar="WIDTHxHEIGHT",
+                            help="window size; the game is laid out at 1024x768 and scaled to fit")
+        parser.add_argument("--world-scale", type=float, default=1.0, metavar="SCALE",
+                            help="draw the world at this share of 1024x768 (e.g. 0.5) and upscale it")
+        parser.add_argument("--hud-scale", type=float, default=1.0, metavar="SCALE",
+                            help="draw the HUD at this share of 1024x768, independently of the world")
+        parser.add_argument("--pixelated", action="store_true",
+                            help="scale the world with nearest neighbour instead of smoothscale")
+        parser.add_argument("--quality", default="auto", choices=["auto", "minimal", "low", "medium", "high"],
+                            help="effect quality tier; auto lowers and raises it to hold the frame rate")
+        parser.add_argument("--idle-fps", type=int, default=10,
+                            help="frame rate on the start and end screens; 0 keeps the full frame rate")
+        parser.add_argument("--instrument", nargs="?", const="echo_escape_instrument.json", metavar="PATH",
+                            help="count surfaces, blits and draw calls per frame and write them to PATH on exit")
+        parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                            help="serve Prometheus metrics at http://127.0.0.1:PORT/metrics")
+        parser.add_argument("--metrics-file", metavar="PATH",
+                            help="rewrite Prometheus metrics to PATH every few seconds")
+        args = parser.parse_args()
+        window_size = tuple(int(side) for side in args.window.lower().split("x")) if args.window else None
+        
         print("Starting Echo Escape...")
         print("Make sure you have pygame and numpy installed!")
         print("pip install pygame numpy")
         print("-" * 50)
         
-        game = Game()
+        game = Game(autoplayer=EscapeBot() if args.autoplay else None,
+                    window_size=window_size, smooth_world=not args.pixelated,
+                    quality=args.quality, idle_fps=args.idle_fps,
+                    instrument=args.instrument, world_scale=args.world_scale,
+                    hud_scale=args.hud_scale)
+        if args.export:
+            game.start_export(args.export)
+        if args.metrics_port is not None or args.metrics_file:
+            game.start_metrics(port=args.metrics_port, path=args.metrics_file)
         game.run()
         
 except ImportError as e:
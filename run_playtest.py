@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Echo Escape - Playtest Runner
+Plays seeded headless sessions across all CPU cores and aggregates the results:
+completion rate, deaths per trap type, steps to exit, how often no exit could
+be spawned and how long each level's shortest objective route is. Episodes are
+written to a JSON Lines file as they finish, so long runs use constant memory.
+
+Examples:
+    python3 run_playtest.py --episodes 10000 --policy random
+    python3 run_playtest.py --episodes 500 --policy script --script moves.txt
+    python3 run_playtest.py --episodes 2000 --policy bot
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from echo_escape_core import (
+    FPS, GRID_SIZE, ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN,
+    ACTION_ECHO, ACTION_INTERACT, GameState)
+from echo_escape_bot import EscapeBot
+
+ACTION_NAMES = {
+    "none": ACTION_NONE,
+    "left": ACTION_LEFT,
+    "right": ACTION_RIGHT,
+    "up": ACTION_UP,
+    "down": ACTION_DOWN,
+    "echo": ACTION_ECHO,
+    "interact": ACTION_INTERACT,
+}
+
+# Steps-to-exit histogram buckets, ten seconds of play each
+STEP_BUCKET = FPS * 10
+
+
+class RandomPolicy:
+    """Wanders in one direction at a time, changing course now and then, while
+    pinging and pressing E at random"""
+    def __init__(self, turn_chance=0.05, echo_chance=0.02, interact_chance=0.1):
+        self.turn_chance = turn_chance
+        self.echo_chance = echo_chance
+        self.interact_chance = interact_chance
+
+    def reset(self, state, rng):
+        self.rng = rng
+        self.direction = ACTION_NONE
+
+    def act(self, state):
+        if self.direction == ACTION_NONE or self.rng.random() < self.turn_chance:
+            self.direction = self.rng.choice([ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN,
+                                              ACTION_LEFT | ACTION_UP, ACTION_LEFT | ACTION_DOWN,
+                                              ACTION_RIGHT | ACTION_UP, ACTION_RIGHT | ACTION_DOWN])
+        action = self.direction
+        if self.rng.random() < self.echo_chance:
+            action |= ACTION_ECHO
+        if self.rng.random() < self.interact_chance:
+            action |= ACTION_INTERACT
+        return action
+
+
+class ScriptedPolicy:
+    """Replays a fixed action script in a loop. Each script line is a set of
+    action names joined by '+' and an optional repeat count, e.g. 'right+echo 30'."""
+    def __init__(self, script_path):
+        self.actions = []
+        with open(script_path) as f:
+            for line in f:
+                line = line.split("#")[0].strip()
+                if not line:
+                    continue
+                parts = line.split()
+                action = ACTION_NONE
+                for name in parts[0].lower().split("+"):
+                    action |= ACTION_NAMES[name]
+                repeat = int(parts[1]) if len(parts) > 1 else 1
+                self.actions.extend([action] * repeat)
+        if not self.actions:
+            raise ValueError(f"Action script {script_path} is empty")
+
+    def reset(self, state, rng):
+        self.index = 0
+
+    def act(self, state):
+        action = self.actions[self.index % len(self.actions)]
+        self.index += 1
+        return action
+
+
+POLICIES = {
+    "random": RandomPolicy,
+    "script": ScriptedPolicy,
+    "bot": EscapeBot,
+}
+
+
+def make_policy(name, script=None):
+    if name == "script":
+        return ScriptedPolicy(script)
+    return POLICIES[name]()
+
+
+def route_cells(state):
+    """Level difficulty: cells walked from the start through the key, every
+    chest, every code puzzle and every terminal, nearest first, ignoring traps"""
+    stages = [[(obj.x // GRID_SIZE, obj.y // GRID_SIZE) for obj in state.objects if obj.type == obj_type]
+              for obj_type in ("small_key", "chest", "code_puzzle", "terminal")]
+    start = (int(state.player.x // GRID_SIZE), int(state.player.y // GRID_SIZE))
+    return state.navigation.route_length(start, stages)
+
+
+def play_episode(seed, policy, max_steps):
+    """Play one seeded session to a win, a death or the step limit"""
+    state = GameState(seed=seed)
+    state.reset()
+    route = route_cells(state)
+    policy.reset(state, random.Random(seed))
+
+    trap = None
+    exit_spawned = False
+    exit_missing = False
+    while state.steps < max_steps and not state.game_over and not state.game_won:
+        state.step(policy.act(state))
+        for kind, payload in state.events:
+            if kind == "trap":
+                trap = payload
+            elif kind == "exit":
+                exit_spawned = payload is not None
+                exit_missing = payload is None
+
+    if state.game_won:
+        outcome = "won"
+    elif state.game_over:
+        outcome = "dead"
+    else:
+        outcome = "timeout"
+
+    return {
+        "seed": seed,
+        "outcome": outcome,
+        "steps": state.steps,
+        "trap": trap,
+        "exit_spawned": exit_spawned,
+        "exit_missing": exit_missing,
+        "objects_placed": len(state.objects) > 0,
+        "terminals_solved": state.terminals_solved,
+        "items": len(state.inventory),
+        "route_cells": route,
+    }
+
+
+def play_block(first_seed, count, policy_name, script, max_steps):
+    """Worker task: play count consecutive seeds with a fresh policy"""
+    policy = make_policy(policy_name, script)
+    return [play_episode(seed, policy, max_steps) for seed in range(first_seed, first_seed + count)]
+
+
+class PlaytestStats:
+    """Running totals over all finished episodes; size does not grow with the run"""
+    def __init__(self):
+        self.episodes = 0
+        self.outcomes = Counter()
+        self.deaths_by_trap = Counter()
+        self.exit_spawned = 0
+        self.exit_missing = 0
+        self.no_objects = 0
+        self.steps_to_exit_total = 0
+        self.steps_to_exit_min = None
+        self.steps_to_exit_max = None
+        self.steps_to_exit_buckets = Counter()
+        self.route_cells_total = 0
+        self.routes = 0
+        self.unreachable = 0
+
+    def add(self, result):
+        self.episodes += 1
+        self.outcomes[result["outcome"]] += 1
+        if result["trap"]:
+            self.deaths_by_trap[result["trap"]] += 1
+        self.exit_spawned += result["exit_spawned"]
+        self.exit_missing += result["exit_missing"]
+        self.no_objects += not result["objects_placed"]
+        if result["route_cells"] is None:
+            self.unreachable += 1
+        else:
+            self.route_cells_total += result["route_cells"]
+            self.routes += 1
+
+        if result["outcome"] == "won":
+            steps = result["steps"]
+            self.steps_to_exit_total += steps
+            self.steps_to_exit_min = steps if self.steps_to_exit_min is None else min(self.steps_to_exit_min, steps)
+            self.steps_to_exit_max = steps if self.steps_to_exit_max is None else max(self.steps_to_exit_max, steps)
+            self.steps_to_exit_buckets[steps // STEP_BUCKET * STEP_BUCKET] += 1
+
+    def summary(self):
+        won = self.outcomes["won"]
+        return {
+            "episodes": self.episodes,
+            "completion_rate": won / self.episodes if self.episodes else 0.0,
+            "outcomes": dict(self.outcomes),
+            "deaths_by_trap": dict(self.deaths_by_trap),
+            "exit_spawned": self.exit_spawned,
+            "exit_missing": self.exit_missing,
+            "no_objects_placed": self.no_objects,
+            "route_cells": {
+                "mean": self.route_cells_total / self.routes if self.routes else None,
+                "unreachable": self.unreachable,
+            },
+            "steps_to_exit": {
+                "mean": self.steps_to_exit_total / won if won else None,
+                "min": self.steps_to_exit_min,
+                "max": self.steps_to_exit_max,
+                "histogram": {str(bucket): count for bucket, count in sorted(self.steps_to_exit_buckets.items())},
+            },
+        }
+
+
+def print_summary(summary, elapsed):
+    episodes = summary["episodes"]
+    print(f"{episodes} episodes in {elapsed:.1f}s ({episodes / max(elapsed, 1e-9):.1f}/s)")
+    print(f"  Completion rate: {summary['completion_rate']:.2%}  {summary['outcomes']}")
+    if summary["deaths_by_trap"]:
+        deaths = ", ".join(f"{trap}: {count}" for trap, count in sorted(summary["deaths_by_trap"].items()))
+        print(f"  Deaths by trap: {deaths}")
+    print(f"  Exit spawned: {summary['exit_spawned']}  no valid exit position: {summary['exit_missing']}")
+    if summary["steps_to_exit"]["mean"] is not None:
+        steps = summary["steps_to_exit"]
+        print(f"  Steps to exit: mean {steps['mean']:.0f}, min {steps['min']}, max {steps['max']}")
+    if summary["route_cells"]["mean"] is not None:
+        route = summary["route_cells"]
+        print(f"  Objective route: mean {route['mean']:.0f} cells, unreachable levels: {route['unreachable']}")
+
+
+def run_playtest(episodes, policy_name="random", script=None, max_steps=FPS * 300, workers=None,
+                 block_size=20, first_seed=0, output=None, summary_path=None, report_every=1000):
+    """Spread episodes over a process pool, streaming results into the stats and
+    the output file. Only a bounded number of blocks are in flight at a time."""
+    workers = workers or os.cpu_count() or 1
+    make_policy(policy_name, script)  # Fail fast on a bad policy or script
+
+    stats = PlaytestStats()
+    output_file = open(output, "w") if output else None
+    start_time = time.perf_counter()
+    next_report = report_every
+
+    def blocks():
+        for offset in range(0, episodes, block_size):
+            yield first_seed + offset, min(block_size, episodes - offset)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            block_iter = blocks()
+            while True:
+                for first, count in block_iter:
+                    pending.add(pool.submit(play_block, first, count, policy_name, script, max_steps))
+                    if len(pending) >= workers * 2:
+                        break
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for result in future.result():
+                        stats.add(result)
+                        if output_file:
+                            output_file.write(json.dumps(result) + "\n")
+                if output_file:
+                    output_file.flush()
+
+                if report_every and stats.episodes >= next_report:
+                    print_summary(stats.summary(), time.perf_counter() - start_time)
+                    next_report += report_every
+    finally:
+        if output_file:
+            output_file.close()
+
+    summary = stats.summary()
+    if summary_path:
+        with open(summary_path, "w") as f:
+            json.dump(summary, f, indent=2)
+    return summary, time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless Echo Escape playtests across CPU cores")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--script", help="action script for the script policy")
+    parser.add_argument("--max-steps", type=int, default=FPS * 300, help="step limit per episode")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--block-size", type=int, default=20, help="episodes per worker task")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first episode")
+    parser.add_argument("--output", help="JSON Lines file receiving one record per episode")
+    parser.add_argument("--summary", help="JSON file receiving the final summary")
+    parser.add_argument("--report-every", type=int, default=1000, help="print a summary every N episodes")
+    args = parser.parse_args()
+
+    if args.policy == "script" and not args.script:
+        parser.error("--policy script needs --script")
+
+    summary, elapsed = run_playtest(args.episodes, args.policy, args.script, args.max_steps, args.workers,
+                                    args.block_size, args.seed, args.output, args.summary, args.report_every)
+    print("-" * 50)
+    print_summary(summary, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from echo_escape_batch import (
+    STATUS_PLAYING, STATUS_WON, EXIT_SLOT, FLAG_ACTIVE, BatchedEscapeEnv, compare_with_states, random_actions)
+from echo_escape_bot import EscapeBot
+from echo_escape_core import GameState
+
+
+@pytest.mark.parametrize("omniscient", [False, True])
+def test_bot_games_match_game_state(omniscient):
+    assert compare_with_states(list(range(20)), EscapeBot(omniscient=omniscient)) == []
+
+
+def test_bot_games_match_game_state_at_large_steps():
+    assert compare_with_states(list(range(10)), EscapeBot(omniscient=True), step_ms=100) == []
+
+
+def test_exit_appears_where_game_state_spawns_it():
+    bot = EscapeBot(omniscient=True)
+    for seed in range(5):
+        state = GameState(seed=seed)
+        state.reset()
+        bot.reset(state)
+        env = BatchedEscapeEnv(1)
+        env.reset(seeds=[seed])
+        exit_position = None
+        while not state.game_won:
+            action = bot.act(state)
+            state.step(action)
+            env.step([action])
+            for kind, payload in state.events:
+                if kind == "exit":
+                    exit_position = payload
+            # The exit slot stays empty until the terminals spawn it
+            assert bool(env.obj_flags[0, EXIT_SLOT] & FLAG_ACTIVE) == (exit_position is not None)
+        assert (env.obj_x[0, EXIT_SLOT], env.obj_y[0, EXIT_SLOT]) == exit_position
+        assert env.status[0] == STATUS_WON
+
+
+def test_random_actions_match_game_state():
+    seeds = list(range(50))
+    actions = random_actions(np.random.default_rng(0), len(seeds), 300)
+    env = BatchedEscapeEnv(len(seeds))
+    env.reset(seeds=seeds)
+    states = []
+    for seed in seeds:
+        state = GameState(seed=seed)
+        state.reset()
+        states.append(state)
+    for tick_actions in actions.tolist():
+        env.step(tick_actions)
+        for env_id, (state, action) in enumerate(zip(states, tick_actions)):
+            state.step(action)
+            assert (env.player_x[env_id], env.player_y[env_id]) == (state.player.x, state.player.y)
+            assert (env.status[env_id] != STATUS_PLAYING) == (state.game_over or state.game_won)
@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from echo_escape_core import (
+    FPS, GRID_SIZE, MAZE_WIDTH, MAZE_HEIGHT, PLAYER_HALF_EXTENT, ECHO_DURATION, ECHO_COOLDOWN,
+    ACTION_NONE, ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN, ACTION_ECHO,
+    GameState, Player)
+
+
+def play(seed, actions, step_ms=1000 / FPS):
+    state = GameState(seed=seed, step_ms=step_ms)
+    state.reset()
+    trace = []
+    for action in actions:
+        message = state.step(action)
+        trace.append((state.player.x, state.player.y, message, state.game_over,
+                      [(kind, payload if kind != "remember" else payload.tolist())
+                       for kind, payload in state.events]))
+    return state, trace
+
+
+def box_hits_wall(state):
+    """Whether the player's collision box overlaps a wall tile or leaves the grid"""
+    x, y = state.player.x, state.player.y
+    left, right = int((x - PLAYER_HALF_EXTENT) // GRID_SIZE), int(-(-(x + PLAYER_HALF_EXTENT) // GRID_SIZE)) - 1
+    top, bottom = int((y - PLAYER_HALF_EXTENT) // GRID_SIZE), int(-(-(y + PLAYER_HALF_EXTENT) // GRID_SIZE)) - 1
+    if left < 0 or top < 0 or right >= MAZE_WIDTH or bottom >= MAZE_HEIGHT:
+        return True
+    return bool(state.wall_mask[top:bottom + 1, left:right + 1].any())
+
+
+def test_seed_reproduces_level():
+    first = GameState(seed=7)
+    first.reset()
+    second = GameState(seed=7)
+    second.reset()
+    assert first.maze == second.maze
+    assert [(obj.type, obj.x, obj.y) for obj in first.objects] == \
+        [(obj.type, obj.x, obj.y) for obj in second.objects]
+
+
+def test_seeded_step_sequence_is_deterministic():
+    rng = np.random.default_rng(3)
+    actions = rng.integers(0, 64, size=400).tolist()
+    assert play(11, actions)[1] == play(11, actions)[1]
+
+
+def test_expired_echo_is_remembered():
+    state = GameState(seed=5)
+    state.reset()
+    while state.now() <= ECHO_COOLDOWN:
+        state.step(ACTION_NONE)
+    start_time = state.now()
+    state.step(ACTION_ECHO)
+    assert state.events == [("sound", "echo")]
+    ping = state.echo_pings[0]
+    assert ping.start_time == start_time
+
+    remembered = []
+    for _ in range(int(ECHO_DURATION / state.step_ms) + 2):
+        assert state.memory_last_seen.max() < 0 or remembered
+        state.step(ACTION_NONE)
+        remembered += [(state.now() - state.step_ms, payload)
+                       for kind, payload in state.events if kind == "remember"]
+
+    # Handed over once, on the step whose time reaches ECHO_DURATION
+    assert len(remembered) == 1
+    step_time, walls = remembered[0]
+    assert step_time - start_time >= ECHO_DURATION > step_time - state.step_ms - start_time
+    assert not state.echo_pings
+    assert walls.any()
+    assert np.array_equal(walls, ping.visibility & state.wall_mask)
+    assert np.array_equal(state.memory_last_seen >= 0, ping.visibility)
+    assert (state.memory_last_seen[ping.visibility] == int(start_time)).all()
+
+
+def test_remembered_walls_are_reported_once():
+    state = GameState(seed=5)
+    state.reset()
+    events = []
+    for _ in range(int((ECHO_COOLDOWN + ECHO_DURATION) * FPS / 1000) * 2):
+        state.step(ACTION_ECHO)
+        events += [payload for kind, payload in state.events if kind == "remember"]
+
+    # The player never moved, so every later ping sees the same walls as the first
+    assert len(events) == 1
+    assert state.memory_last_seen.max() > 0
+
+
+@pytest.mark.parametrize("direction", [ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN])
+@pytest.mark.parametrize("step_ms", [1000 / FPS, 250, 1000])
+def test_large_steps_never_enter_walls(direction, step_ms):
+    for seed in range(10):
+        state = GameState(seed=seed, step_ms=step_ms)
+        state.reset()
+        state.objects.size[:len(state.objects)] = 0  # No traps in the way
+        rng = np.random.default_rng(seed)
+        for action in [direction] * 20 + rng.integers(0, 16, size=100).tolist():
+            state.step(action)
+            assert not box_hits_wall(state), (seed, state.player.x, state.player.y)
+
+
+def test_large_step_stops_at_wall():
+    maze = [[0] * MAZE_WIDTH for _ in range(MAZE_HEIGHT)]
+    for row in maze:
+        row[10] = 1
+    player = Player(2 * GRID_SIZE + GRID_SIZE // 2, 5 * GRID_SIZE + GRID_SIZE // 2)
+    player.move(20 * GRID_SIZE, 0, maze)
+    assert player.x == 10 * GRID_SIZE - PLAYER_HALF_EXTENT
+    player.move(-20 * GRID_SIZE, 0, maze)
+    assert player.x == PLAYER_HALF_EXTENT
+
+
+def test_large_step_moves_as_far_as_small_steps():
+    maze = [[0] * MAZE_WIDTH for _ in range(MAZE_HEIGHT)]
+    coarse = GameState(seed=1, step_ms=1000)
+    fine = GameState(seed=1)
+    for state in (coarse, fine):
+        state.reset()
+        state.maze = maze
+        state.objects.size[:len(state.objects)] = 0
+    start = coarse.player.x
+    coarse.step(ACTION_RIGHT)
+    for _ in range(FPS):
+        fine.step(ACTION_RIGHT)
+    assert coarse.player.x == pytest.approx(fine.player.x)
+    assert coarse.player.x - start == pytest.approx(4 * FPS)
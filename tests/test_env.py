@@ -0,0 +1,24 @@
+import numpy as np
+
+from echo_escape_core import ECHO_COOLDOWN, ECHO_DURATION, ACTION_NONE, ACTION_ECHO
+from echo_escape_env import EscapeEnv
+
+
+def test_drawn_pings_still_reach_the_memory_map():
+    env = EscapeEnv(pixels=True)
+    env.reset(seed=5)
+    state = env.game.state
+    while state.now() <= ECHO_COOLDOWN:
+        env.step(ACTION_NONE)
+    env.step(ACTION_ECHO)
+    ping = state.echo_pings[0]
+
+    # Frames are drawn every step; the ping must still expire in step() and
+    # hand its walls over instead of being dropped while drawing
+    remembered = []
+    for _ in range(int(ECHO_DURATION / state.step_ms) + 2):
+        observation, reward, done, info = env.step(ACTION_NONE)
+        remembered += [payload for kind, payload in info["events"] if kind == "remember"]
+    assert len(remembered) == 1
+    assert np.array_equal(remembered[0], ping.visibility & state.wall_mask)
+    assert np.array_equal(state.memory_last_seen >= 0, ping.visibility)
@@ -0,0 +1,95 @@
+import random
+
+import pytest
+
+from echo_escape_progression import DEFAULT_RULES, DEFAULT_PROGRESSION, Progression, ProgressionRules
+
+
+def bit(name):
+    return DEFAULT_PROGRESSION.tokens[name][0]
+
+
+def rule(obj_type, index=0):
+    return DEFAULT_PROGRESSION.objects[obj_type].rules[index]
+
+
+def test_tokens_share_one_bit_space():
+    bits = [bit for bit, kind in DEFAULT_PROGRESSION.tokens.values()]
+    assert sorted(bits) == [1 << i for i in range(7)]
+    assert DEFAULT_PROGRESSION.tokens["small_key"] == (1, "items")
+    assert DEFAULT_PROGRESSION.tokens["2048"] == (16, "codes")
+
+
+def test_rule_masks():
+    chest = rule("chest", 1)
+    assert chest.requires == bit("document")
+    assert chest.lacks == bit("tool")
+    assert chest.gives == [("tool", bit("tool"))]
+    terminal = rule("terminal", 2)
+    assert terminal.requires == bit("NEURAL") | bit("large_key")
+    assert terminal.consumes == [("NEURAL", bit("NEURAL"))]
+    assert rule("code_puzzle").one_of_mask == bit("2048") | bit("ECHO") | bit("NEURAL")
+    exit_rule = DEFAULT_PROGRESSION.exit
+    assert exit_rule.requires == DEFAULT_PROGRESSION.mask(["small_key", "document", "tool", "large_key"])
+    assert exit_rule.lacks == DEFAULT_PROGRESSION.mask(["2048", "ECHO", "NEURAL"])
+    assert sorted(exit_rule.counters) == [("chests", 3), ("terminals", 3)]
+    assert DEFAULT_PROGRESSION.counter_names == ["chests", "terminals"]
+
+
+def test_chests_open_in_order():
+    progression = Progression(DEFAULT_PROGRESSION)
+    chests = DEFAULT_PROGRESSION.objects["chest"].rules
+    assert not any(progression.allows(chest) for chest in chests)
+
+    progression.apply(rule("small_key"), random.Random(0))
+    for expected in ("document", "tool", "large_key"):
+        allowed = [chest for chest in chests if progression.allows(chest)]
+        assert len(allowed) == 1
+        progression.apply(allowed[0], random.Random(0))
+        assert progression.inventory[-1] == expected
+    assert progression.counters["chests"] == 3
+    assert not any(progression.allows(chest) for chest in chests)
+
+
+def test_code_puzzles_give_each_code_once():
+    progression = Progression(DEFAULT_PROGRESSION)
+    puzzle = rule("code_puzzle")
+    rng = random.Random(4)
+    given = [progression.apply(puzzle, rng) for _ in range(3)]
+    assert sorted(given) == ["2048", "ECHO", "NEURAL"]
+    assert progression.codes == given
+    assert not progression.allows(puzzle)
+
+
+def test_terminal_consumes_its_code():
+    progression = Progression(DEFAULT_PROGRESSION)
+    progression.give(*DEFAULT_PROGRESSION.token("ECHO"))
+    assert not progression.allows(rule("terminal", 1))
+    progression.give(*DEFAULT_PROGRESSION.token("document"))
+    assert progression.allows(rule("terminal", 1))
+    progression.apply(rule("terminal", 1), random.Random(0))
+    assert progression.held == bit("document")
+    assert progression.codes == []
+    assert progression.counters["terminals"] == 1
+
+
+def test_exit_needs_counters_and_no_codes():
+    progression = Progression(DEFAULT_PROGRESSION)
+    for name in ("small_key", "document", "tool", "large_key"):
+        progression.give(*DEFAULT_PROGRESSION.token(name))
+    progression.counters.update(chests=3, terminals=2)
+    assert not progression.allows(DEFAULT_PROGRESSION.exit)
+    progression.counters["terminals"] = 3
+    assert progression.allows(DEFAULT_PROGRESSION.exit)
+    progression.give(*DEFAULT_PROGRESSION.token("2048"))
+    assert not progression.allows(DEFAULT_PROGRESSION.exit)
+
+
+def test_bad_rules_are_rejected():
+    with pytest.raises(ValueError):
+        ProgressionRules({"items": ["key"], "codes": ["key"]})
+    with pytest.raises(ValueError):
+        ProgressionRules({"items": ["key"], "objects": {"door": {"rules": [{"requires": ["card"]}]}}})
+    with pytest.raises(ValueError):
+        ProgressionRules({"objects": {"door": {"rules": [{"marks": "opened"}]}}})
+    assert ProgressionRules(DEFAULT_RULES).tokens == DEFAULT_PROGRESSION.tokens